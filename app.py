@@ -1,33 +1,43 @@
 import os
+import logging
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
 from extensions import db
 from models import User, VocabEntry, QuizRound, QuizAnswer, Card, UserCard
 from routes.vocab import vocab_bp
 from routes.quiz import quiz_bp
+from routes.sorting import sorting_bp
 from routes.cards import cards_bp
+from routes.stats import stats_bp
+from lexicon import build_lexicon_command
+from query_plans import check_query_plans_command
+from stats import rebuild_stats_command
+from archive import archive_answers_command
+import assets
+import classifier
+import db_profiles
+import metrics
+import migrations
+
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"),
+                    format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger(__name__)
 
 
 
 def create_app():
     app = Flask(__name__)
 
-    db_url = os.getenv('DATABASE_URL')  # Neon/Render!
-    if db_url and 'neon.tech' in db_url:
-        # Neon SSL + Format
-        uri = db_url.replace('postgresql://', 'postgresql://')  # Schon OK
-        app.config["SQLALCHEMY_DATABASE_URI"] = uri
-        print(f"✅ Neon Postgres: {uri.split('@')[1].split('/')[0]}")
-    else:
-        app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///latin_vocab.db"
-
+    # URI, pool/timeout settings per database + optional read replica (db_profiles.py)
+    db_profiles.configure(app)
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
     db.init_app(app)
+    db_profiles.init_app(app)
     # CORS für ALLE API + Frontend
     CORS(app, resources={
         r"/*": {
@@ -40,27 +50,35 @@ def create_app():
     # adds blueprints whose routes map directly to common operations on SQLite tables
     app.register_blueprint(vocab_bp, url_prefix="/api/vocab")
     app.register_blueprint(quiz_bp, url_prefix="/api/quiz")
+    app.register_blueprint(sorting_bp, url_prefix="/api/quiz")
     app.register_blueprint(cards_bp, url_prefix="/api/cards")
+    app.register_blueprint(stats_bp, url_prefix="/api/stats")
+
+    app.cli.add_command(build_lexicon_command)
+    app.cli.add_command(migrations.init_db_command)
+    app.cli.add_command(migrations.upgrade_command)
+    app.cli.add_command(migrations.status_command)
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(rebuild_stats_command)
+    app.cli.add_command(archive_answers_command)
+
+    # request timing, SQL counts, frag-caesar.de fetches -> /metrics (+ slow-request log)
+    metrics.init_app(app)
+
+    # "/" + fingerprinted, precompressed assets (flask build-assets)
+    assets.init_app(app)
+
+    # background classification pool, started per worker on its first request
+    @app.before_request
+    def start_classifier():
+        classifier.ensure_started(app)
 
-    with app.app_context():
-        # ORM definitions turned into real SQLite tables before any API logic runs
-        try:
-            db.create_all()
-            # ✅ Merge statt add() - updated existierenden User oder insert mit Defaults
-            demo_user = User(id=1, username='demo', password_hash='demo_hash')
-            db.session.merge(demo_user)
-            db.session.commit()
-            print("✅ Demo User 1 merged")
-        except Exception as e:
-            db.session.rollback()
-            print(f"❌ DB Error: {e}")
     return app
 
+# no DB access at import: gunicorn can preload this and fork (schema: `flask init-db`)
 app = create_app()
 
-@app.route("/")
-def index():
-    return send_from_directory("static", "index.html")
-
 if __name__ == "__main__":
+    with app.app_context():
+        migrations.bootstrap()
     app.run(debug=True)
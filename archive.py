@@ -0,0 +1,153 @@
+import os
+import gzip
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import Date, bindparam, delete, func, select, text, update
+
+import stats
+from extensions import db
+from models import QuizAnswer, QuizQuestion, QuizRound, RoundAsked, RoundState, VocabEntry
+
+"""
+Compaction of the quiz history. Rounds that finished (or, unfinished, were
+started) more than ANSWER_ARCHIVE_DAYS ago are archived in batches: their
+quiz_answer rows are folded into archived_answer_stats (per vocab x day)
+and deleted together with the round's draw state (round_asked,
+quiz_question, round_state), and the round gets archived_at. Each batch is
+one transaction that first claims its rounds with a conditional UPDATE, so
+an interrupted run simply continues with the next unarchived rounds and two
+runs never archive a round twice.
+
+Nothing the app reads per request depends on old answers: the per-entry
+counters live on vocab_entry, reviews in review_schedule, and the stats
+rollups (stats.py) already contain every answer; `flask rebuild-stats`
+adds archived_answer_stats back in.
+
+    flask archive-answers [--older-than-days 90] [--export-dir archive/]
+
+With --export-dir the raw rows of every batch are written to
+quiz_answers-<first round>-<last round>.ndjson.gz before the batch commits;
+if the commit fails, the next run exports those rows again.
+"""
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ANSWER_ARCHIVE_DAYS", 90))
+ROUNDS_PER_BATCH = int(os.getenv("ANSWER_ARCHIVE_BATCH", 200))
+
+_UPSERT_ARCHIVED = text(
+    "INSERT INTO archived_answer_stats (vocab_entry_id, day, user_id, word_type, answers, correct) "
+    "VALUES (:vocab_entry_id, :day, :user_id, :word_type, :answers, :correct) "
+    "ON CONFLICT (vocab_entry_id, day) DO UPDATE SET "
+    "answers = archived_answer_stats.answers + excluded.answers, "
+    "correct = archived_answer_stats.correct + excluded.correct"
+).bindparams(bindparam("day", type_=Date))
+
+
+def eligible_rounds_query(cutoff: datetime, limit: int):
+    return (
+        select(QuizRound.id)
+        .where(QuizRound.archived_at.is_(None),
+               func.coalesce(QuizRound.finished_at, QuizRound.started_at) < cutoff)
+        .order_by(QuizRound.id)
+        .limit(limit)
+    )
+
+
+def eligible_rounds(conn, cutoff: datetime, limit: int):
+    """Ids of unarchived rounds whose last activity is before `cutoff`, oldest first."""
+    return conn.execute(eligible_rounds_query(cutoff, limit)).scalars().all()
+
+
+def _export(export_dir, round_ids, rows):
+    os.makedirs(export_dir, exist_ok=True)
+    path = os.path.join(export_dir, f"quiz_answers-{round_ids[0]:09d}-{round_ids[-1]:09d}.ndjson.gz")
+    with gzip.open(path + ".tmp", "wt", encoding="utf-8") as fh:
+        for row in rows:
+            fh.write(json.dumps({
+                "id": row.id,
+                "quiz_round_id": row.quiz_round_id,
+                "user_id": row.user_id,
+                "vocab_entry_id": row.vocab_entry_id,
+                "was_correct": bool(row.was_correct),
+                "answered_at": row.answered_at.isoformat() if row.answered_at else None,
+            }, ensure_ascii=False) + "\n")
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def archive_rounds(conn, round_ids, export_dir=None):
+    """Archive the given rounds (those not archived meanwhile); returns (rounds, answers)."""
+    claimed = sorted(conn.execute(
+        update(QuizRound)
+        .where(QuizRound.id.in_(round_ids), QuizRound.archived_at.is_(None))
+        .values(archived_at=datetime.utcnow())
+        .returning(QuizRound.id)
+    ).scalars().all())
+    if not claimed:
+        return 0, 0
+
+    rows = conn.execute(
+        select(QuizAnswer.id, QuizAnswer.quiz_round_id, QuizRound.user_id, QuizAnswer.vocab_entry_id,
+               VocabEntry.word_type, QuizAnswer.was_correct, QuizAnswer.answered_at)
+        .join(QuizRound, QuizRound.id == QuizAnswer.quiz_round_id)
+        .outerjoin(VocabEntry, VocabEntry.id == QuizAnswer.vocab_entry_id)
+        .where(QuizAnswer.quiz_round_id.in_(claimed))
+        .order_by(QuizAnswer.id)
+    ).all()
+    if export_dir and rows:
+        _export(export_dir, claimed, rows)
+
+    # same attribution as stats.compute, so a rebuild after archiving gives the same rollups
+    totals = defaultdict(lambda: [0, 0])
+    owners = {}
+    for row in rows:
+        day = (row.answered_at or datetime(1970, 1, 1)).date()
+        counts = totals[(row.vocab_entry_id, day)]
+        counts[0] += 1
+        counts[1] += int(bool(row.was_correct))
+        owners[row.vocab_entry_id] = (row.user_id, row.word_type or stats.UNKNOWN_TYPE)
+    if totals:
+        conn.execute(_UPSERT_ARCHIVED, [
+            {"vocab_entry_id": v, "day": d, "user_id": owners[v][0], "word_type": owners[v][1],
+             "answers": n, "correct": k}
+            for (v, d), (n, k) in sorted(totals.items())])
+
+    for model in (QuizAnswer, RoundAsked, QuizQuestion, RoundState):
+        conn.execute(delete(model).where(model.quiz_round_id.in_(claimed)))
+    return len(claimed), len(rows)
+
+
+def compact(older_than_days=ARCHIVE_AFTER_DAYS, batch_rounds=ROUNDS_PER_BATCH, export_dir=None,
+            max_batches=None, progress=None):
+    """Archive all eligible rounds in batches of `batch_rounds`; returns (rounds, answers)."""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    total_rounds = total_answers = batches = 0
+    while max_batches is None or batches < max_batches:
+        with db.engine.begin() as conn:
+            round_ids = eligible_rounds(conn, cutoff, batch_rounds)
+            if not round_ids:
+                break
+            rounds, answers = archive_rounds(conn, round_ids, export_dir)
+        total_rounds += rounds
+        total_answers += answers
+        batches += 1
+        if progress:
+            progress(total_rounds, total_answers)
+    return total_rounds, total_answers
+
+
+@click.command("archive-answers")
+@click.option("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS, show_default=True)
+@click.option("--batch-rounds", type=int, default=ROUNDS_PER_BATCH, show_default=True)
+@click.option("--export-dir", type=click.Path(file_okay=False), default=None,
+              help="Also write the archived rows as NDJSON.gz files here.")
+@click.option("--max-batches", type=int, default=None, help="Stop after this many batches (resume later).")
+@with_appcontext
+def archive_answers_command(older_than_days, batch_rounds, export_dir, max_batches):
+    """Compact the answers of old quiz rounds into per-vocab/per-day totals."""
+    rounds, answers = compact(older_than_days, batch_rounds, export_dir, max_batches,
+                              progress=lambda r, a: click.echo(f"  {r} rounds, {a} answers archived"))
+    click.echo(f"✅ Archived {rounds} rounds with {answers} answers")
@@ -0,0 +1,161 @@
+import os
+import re
+import gzip
+import json
+import hashlib
+import mimetypes
+
+import click
+from flask import abort, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # optional, gzip only
+    brotli = None
+
+"""
+Fingerprinted, precompressed static assets.
+
+`flask build-assets` copies every file that static/index.html references
+to static/dist/ under a content-hashed name (script.3f2a9c1b.js), writes
+.gz (and .br with the brotli package) next to it and a rewritten
+index.html. Hashed files never change, so they go out with
+Cache-Control: immutable and browsers/CDNs stop asking the workers for
+them; index.html itself is revalidated on every load. Without a build
+the app serves static/ as before.
+"""
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST = "manifest.json"
+URL_PREFIX = "/assets/"
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+_REF_RE = re.compile(r'(href|src)="/static/([^"?#]+)"')
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+_manifest_cache = {}  # manifest mtime -> set of servable names
+
+
+def _fingerprint(name, data):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:8]}{ext}"
+
+
+def _write(path, data):
+    with open(path, "wb") as fh:
+        fh.write(data)
+    with open(path + ".gz", "wb") as fh:
+        fh.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + ".br", "wb") as fh:
+            fh.write(brotli.compress(data, quality=11))
+
+
+def build(static_dir=STATIC_DIR, dist_dir=DIST_DIR) -> dict:
+    """Build dist/ from index.html and the assets it references; returns the manifest."""
+    os.makedirs(dist_dir, exist_ok=True)
+    with open(os.path.join(static_dir, "index.html"), encoding="utf-8") as fh:
+        html = fh.read()
+
+    manifest = {}
+    for name in sorted({m.group(2) for m in _REF_RE.finditer(html)}):
+        source = os.path.join(static_dir, name)
+        if not os.path.isfile(source):
+            continue
+        with open(source, "rb") as fh:
+            data = fh.read()
+        hashed = _fingerprint(os.path.basename(name), data)
+        _write(os.path.join(dist_dir, hashed), data)
+        manifest[name] = hashed
+
+    html = _REF_RE.sub(
+        lambda m: f'{m.group(1)}="{URL_PREFIX}{manifest[m.group(2)]}"' if m.group(2) in manifest else m.group(0),
+        html)
+    _write(os.path.join(dist_dir, "index.html"), html.encode("utf-8"))
+
+    # stale fingerprints of earlier builds
+    keep = set(manifest.values()) | {"index.html", MANIFEST}
+    for name in os.listdir(dist_dir):
+        base = name[:-3] if name.endswith((".gz", ".br")) else name
+        if base not in keep:
+            os.remove(os.path.join(dist_dir, name))
+
+    with open(os.path.join(dist_dir, MANIFEST), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+    return manifest
+
+
+def _servable():
+    """Hashed names of the current build (None without a build)."""
+    path = os.path.join(DIST_DIR, MANIFEST)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if mtime not in _manifest_cache:
+        with open(path, encoding="utf-8") as fh:
+            _manifest_cache.clear()
+            _manifest_cache[mtime] = set(json.load(fh).values())
+    return _manifest_cache[mtime]
+
+
+def _send_best(name, cache_control):
+    """Send dist/<name>, precompressed if the client accepts it."""
+    mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    filename, encoding = name, None
+    for enc, suffix in _ENCODINGS:
+        if request.accept_encodings[enc] and os.path.isfile(os.path.join(DIST_DIR, name + suffix)):
+            filename, encoding = name + suffix, enc
+            break
+
+    response = send_from_directory(DIST_DIR, filename, mimetype=mimetype, conditional=True)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    cache_control(response)
+    return response
+
+
+def _immutable(response):
+    response.cache_control.no_cache = None  # send_file's default
+    response.cache_control.public = True
+    response.cache_control.max_age = IMMUTABLE_MAX_AGE
+    response.cache_control.immutable = True
+
+
+def _revalidate(response):
+    response.cache_control.no_cache = True
+
+
+def index():
+    """index.html of the current build (revalidated on every load), else static/index.html."""
+    if _servable() is None:
+        return send_from_directory(STATIC_DIR, "index.html")
+    return _send_best("index.html", _revalidate)
+
+
+def asset(name):
+    servable = _servable()
+    if not servable or name not in servable:
+        abort(404)
+    return _send_best(name, _immutable)
+
+
+def init_app(app):
+    app.add_url_rule("/", "index", index)
+    app.add_url_rule(URL_PREFIX + "<name>", "asset", asset)
+    app.cli.add_command(build_assets_command)
+
+
+@click.command("build-assets")
+def build_assets_command():
+    """Fingerprint + precompress the frontend assets into static/dist/."""
+    manifest = build()
+    for source, hashed in manifest.items():
+        click.echo(f"  {source} -> {URL_PREFIX}{hashed}")
+    click.echo(f"✅ {len(manifest)} assets built{' (gzip + brotli)' if brotli else ' (gzip)'} in {DIST_DIR}")
+
+
+if __name__ == "__main__":
+    build_assets_command()
@@ -0,0 +1,161 @@
+"""
+Head-of-line blocking under slow dictionary lookups: gunicorn (gunicorn.conf.py)
+serves a seeded throwaway SQLite database while frag_caesar_crawl4ai talks to
+the local stub of bench_load.py with a long latency. "Slow" clients keep
+adding new words (every add waits for the stub), "fast" clients read the
+vocab and card lists, which never touch frag-caesar.de. Each worker mode
+runs for --duration seconds with the same workers and clients.
+
+    python benchmarks/bench_concurrency.py [--modes sync,gthread] [--workers 2] [--threads 8]
+                                           [--slow-clients 4] [--fast-clients 4] [--duration 10]
+                                           [--stub-latency-ms 2000] [--budget 3]
+
+With sync workers the slow adds occupy every worker and the list requests
+queue behind them; with gthread they only occupy threads. A stub latency
+above --budget (FRAGCAESAR_REQUEST_BUDGET) shows the per-request deadline:
+the adds come back as 202 (classified in the background) after the budget.
+Prints JSON.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import contextlib
+import subprocess
+import urllib.error
+import urllib.request
+from argparse import Namespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_load import StubHandler, percentile, seed, start_stub  # noqa: E402
+from bench_startup import free_port  # noqa: E402
+
+FAST_URLS = ("/api/vocab/?limit=50", "/api/cards/?limit=50")
+
+
+def call(base, method, path, body=None, timeout=60):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(base + path, data=data, method=method,
+                                 headers={"Content-Type": "application/json"} if data else {})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            r.read()
+            status = r.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = 599
+    return (time.perf_counter() - start) * 1000, status
+
+
+def start_gunicorn(env, timeout=60):
+    port = int(env["PORT"])
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if call(f"http://127.0.0.1:{port}", "GET", FAST_URLS[0], timeout=5)[1] == 200:
+            return proc
+        time.sleep(0.05)
+    proc.terminate()
+    raise RuntimeError("gunicorn did not come up")
+
+
+def run_mode(mode, args, env, run_no):
+    env = dict(env, PORT=str(free_port()), GUNICORN_WORKER_CLASS=mode, WEB_CONCURRENCY=str(args.workers),
+               GUNICORN_THREADS=str(args.threads))
+    proc = start_gunicorn(env)
+    base = f"http://127.0.0.1:{env['PORT']}"
+    samples = {"fast": [], "slow": []}
+    lock = threading.Lock()
+    stop = time.perf_counter() + args.duration
+    counter = iter(range(10 ** 9))
+
+    def slow_client():
+        while time.perf_counter() < stop:
+            with lock:
+                n = next(counter)
+            sample = call(base, "POST", "/api/vocab/",
+                          {"latin_word": f"lentum{run_no}x{n}", "german_translation": "langsam"})
+            with lock:
+                samples["slow"].append(sample)
+
+    def fast_client(rng):
+        while time.perf_counter() < stop:
+            sample = call(base, "GET", rng.choice(FAST_URLS))
+            with lock:
+                samples["fast"].append(sample)
+
+    stub_before = StubHandler.requests
+    threads = [threading.Thread(target=slow_client) for _ in range(args.slow_clients)]
+    threads += [threading.Thread(target=fast_client, args=(random.Random(i),)) for i in range(args.fast_clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(0.2)  # let the slow adds occupy the workers first
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+    proc.terminate()
+    proc.wait()
+
+    result = {"stub_requests": StubHandler.requests - stub_before}
+    for kind, rows in samples.items():
+        latencies = sorted(ms for ms, _ in rows)
+        result[kind] = {
+            "count": len(rows),
+            "rps": round(len(rows) / wall, 2),
+            "status": {str(s): sum(1 for _, st in rows if st == s) for s in sorted({st for _, st in rows})},
+            "p50_ms": round(percentile(latencies, 0.50), 1) if rows else None,
+            "p95_ms": round(percentile(latencies, 0.95), 1) if rows else None,
+            "max_ms": round(latencies[-1], 1) if rows else None,
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", default="sync,gthread", help="comma separated gunicorn worker classes")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=8, help="threads per gthread worker")
+    parser.add_argument("--slow-clients", type=int, default=4)
+    parser.add_argument("--fast-clients", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--stub-latency-ms", type=float, default=2000.0)
+    parser.add_argument("--budget", type=float, default=3.0, help="FRAGCAESAR_REQUEST_BUDGET in seconds")
+    parser.add_argument("--vocab", type=int, default=2000, help="seeded vocab entries")
+    args = parser.parse_args()
+
+    stub = start_stub(args.stub_latency_ms, 0)
+    tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp.name}",
+               FRAGCAESAR_BASE_URL=f"http://127.0.0.1:{stub.server_address[1]}", FRAGCAESAR_DELAY="0",
+               FRAGCAESAR_REQUEST_BUDGET=str(args.budget), CLASSIFIER_WORKERS="1",
+               GUNICORN_TIMEOUT=str(int(max(30, args.stub_latency_ms / 1000 * 3))), SLOW_REQUEST_MS="0")
+    env.pop("DATABASE_URL", None)
+    env.pop("DATABASE_REPLICA_URL", None)
+    os.environ.update(env)
+
+    with contextlib.redirect_stdout(sys.stderr):  # keep stdout pure JSON
+        from app import app
+        import migrations
+    with app.app_context():
+        migrations.bootstrap()
+        seed(Namespace(users=2, vocab=args.vocab, answers=args.vocab * 10), random.Random(1))
+
+    result = {"config": vars(args), "modes": {}}
+    for run_no, mode in enumerate(m.strip() for m in args.modes.split(",")):
+        result["modes"][mode] = run_mode(mode, args, env, run_no)
+    os.unlink(tmp.name)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
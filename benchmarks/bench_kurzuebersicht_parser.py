@@ -0,0 +1,94 @@
+"""
+Compare the targeted Kurzübersicht extractor (parse_kurzuebersicht) with the
+full-page reference parser (parse_kurzuebersicht_full) over a corpus of pages.
+
+For each page it reports CPU time and peak Python memory per parse and asserts
+that both parsers return identical rows.
+
+    python benchmarks/bench_kurzuebersicht_parser.py [--pages DIR] [--repeat N]
+    python benchmarks/bench_kurzuebersicht_parser.py --record petere templum ...
+
+pages/sample_petere.html is a synthetic page in frag-caesar.de's layout,
+the pages/edge_*.html pages hit the fallbacks of the region scan (no
+Kurzübersicht, nested table, several <h2>s, unclosed or stray table tags);
+--record downloads real pages into the corpus directory. The same identity
+check runs in tests/test_kurzuebersicht_parser.py.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import frag_caesar_crawl4ai  # noqa: E402
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+
+
+def measure(parse, html, word, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        rows = parse(html, word)
+    cpu_ms = (time.process_time() - start) * 1000 / repeat
+
+    tracemalloc.start()
+    parse(html, word)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, cpu_ms, peak / 1024
+
+
+def record(words, pages_dir):
+    os.makedirs(pages_dir, exist_ok=True)
+    client = frag_caesar_crawl4ai.get_client()
+    for word in words:
+        url = f"{frag_caesar_crawl4ai.BASE_URL}/lateinwoerterbuch/{word}-uebersetzung.html"
+        resp = client.get(url)
+        resp.raise_for_status()
+        with open(os.path.join(pages_dir, f"{word}.html"), "w", encoding="utf-8") as f:
+            f.write(resp.text)
+        print(f"recorded {word}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default=PAGES_DIR)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--record", nargs="+", metavar="WORD")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.pages)
+        return
+
+    results = []
+    for name in sorted(os.listdir(args.pages)):
+        if not name.endswith(".html"):
+            continue
+        with open(os.path.join(args.pages, name), encoding="utf-8") as f:
+            html = f.read()
+        word = name[:-len(".html")]
+
+        full_rows, full_ms, full_kb = measure(frag_caesar_crawl4ai.parse_kurzuebersicht_full, html, word, args.repeat)
+        fast_rows, fast_ms, fast_kb = measure(frag_caesar_crawl4ai.parse_kurzuebersicht, html, word, args.repeat)
+        assert fast_rows == full_rows, f"{name}: parsers disagree\n{fast_rows}\n{full_rows}"
+
+        results.append({
+            "page": name,
+            "bytes": len(html.encode("utf-8")),
+            "rows": len(full_rows),
+            "full_cpu_ms": round(full_ms, 3),
+            "fast_cpu_ms": round(fast_ms, 3),
+            "full_peak_kb": round(full_kb, 1),
+            "fast_peak_kb": round(fast_kb, 1),
+            "speedup": round(full_ms / fast_ms, 1) if fast_ms else None,
+        })
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
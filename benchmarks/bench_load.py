@@ -0,0 +1,363 @@
+"""
+End-to-end load benchmark: seeds a throwaway database with synthetic users,
+vocab, rounds and answers, points frag_caesar_crawl4ai at a local stub that
+serves the recorded pages in benchmarks/pages/ with configurable latency,
+and drives the vocab, quiz, sorting (verbs/nouns), cards and stats routes of
+create_app() from concurrent clients.
+
+    python benchmarks/bench_load.py [--vocab 10000] [--answers 1000000] [--clients 8] [--duration 30]
+                                    [--stub-latency-ms 150] [--stub-jitter-ms 50] [--db-url URL]
+
+Prints throughput, p50/p95/p99 latency and SQL queries per request for every
+endpoint as JSON, so runs can be diffed between commits.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import contextlib
+import tempfile
+import threading
+import statistics
+from collections import defaultdict
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES_DIR = os.path.join(ROOT, "benchmarks", "pages")
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import event, insert  # noqa: E402
+
+import migrations  # noqa: E402
+import search  # noqa: E402
+import stats  # noqa: E402
+from extensions import db  # noqa: E402
+from models import User, VocabEntry, QuizRound, QuizAnswer, Card, UserCard, ReviewSchedule  # noqa: E402
+
+VERB_TYPES = ["A-Konjugation", "E-Konjugation", "I-Konjugation", "konsonantische Konjugation"]
+NOUN_TYPES = ["A-Deklination", "O-Deklination", "konsonantische Deklination", "E-Deklination",
+              "I-Deklination", "U-Deklination", "gemischte Deklination"]
+ADJ_TYPES = ["a-/o-Deklination", "i-Deklination"]
+SYLLABLES = ["am", "ar", "ca", "lo", "mu", "ne", "po", "ri", "sa", "tu", "ve", "xi"]
+ANSWERS_PER_ROUND = 20
+
+
+# --- frag-caesar.de stub -------------------------------------------------------
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/lateinwoerterbuch/<word>-uebersetzung.html -> pages/<word>.html or the sample page; ignotum* -> 404."""
+    latency = 0.15
+    jitter = 0.05
+    requests = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with StubHandler.lock:
+            StubHandler.requests += 1
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+        word = self.path.rsplit("/", 1)[-1].replace("-uebersetzung.html", "")
+        if word.startswith("ignotum"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        path = os.path.join(PAGES_DIR, f"{word}.html")
+        if not os.path.isfile(path):
+            path = os.path.join(PAGES_DIR, "sample_petere.html")
+        with open(path, "rb") as fh:
+            body = fh.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub(latency_ms, jitter_ms):
+    StubHandler.latency = latency_ms / 1000
+    StubHandler.jitter = jitter_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# --- seeding -------------------------------------------------------------------
+
+def word(rng, i):
+    stem = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3)))
+    return f"{stem}{rng.choice(['re', 'us', 'um', 'a'])}{i}"
+
+
+def seed(args, rng):
+    now = datetime.utcnow()
+    db.session.execute(insert(User), [{"id": u, "username": f"bench{u}", "password_hash": "x"}
+                                      for u in range(2, args.users + 1)])
+
+    entries = []  # (id, user_id, latin, german, word_type, flexion_type)
+    for user_id in range(1, args.users + 1):
+        for i in range(args.vocab):
+            kind = rng.random()
+            if kind < 0.35:
+                word_type, flexion = "Verb", rng.choice(VERB_TYPES)
+            elif kind < 0.75:
+                word_type, flexion = "Nomen", rng.choice(NOUN_TYPES)
+            elif kind < 0.9:
+                word_type, flexion = "Adjektiv", rng.choice(ADJ_TYPES)
+            else:
+                word_type, flexion = "Konjunktion", None
+            entries.append((len(entries) + 1, user_id, word(rng, i), f"Wort {i} {rng.choice(SYLLABLES)}",
+                            word_type, flexion))
+
+    # answers in rounds of ANSWERS_PER_ROUND, spread over the last 180 days
+    per_user = defaultdict(list)
+    for e in entries:
+        per_user[e[1]].append(e[0])
+    skill = {e[0]: rng.uniform(0.3, 0.98) for e in entries}
+    totals = defaultdict(lambda: [0, 0])
+    rounds, answers = [], []
+    n_rounds = max(1, args.answers // ANSWERS_PER_ROUND)
+    for r in range(1, n_rounds + 1):
+        user_id = rng.randint(1, args.users)
+        started = now - timedelta(days=180) + timedelta(seconds=r * 180 * 86400 / n_rounds)
+        rounds.append({"id": r, "user_id": user_id, "started_at": started,
+                       "finished_at": started + timedelta(minutes=5)})
+        for j in range(ANSWERS_PER_ROUND):
+            entry_id = rng.choice(per_user[user_id])
+            correct = rng.random() < skill[entry_id]
+            totals[entry_id][0] += 1
+            totals[entry_id][1] += correct
+            answers.append({"quiz_round_id": r, "vocab_entry_id": entry_id, "was_correct": correct,
+                            "answered_at": started + timedelta(seconds=10 * j)})
+
+    vocab_rows, schedules, cards, user_cards = [], [], [], []
+    for entry_id, user_id, latin, german, word_type, flexion in entries:
+        n, k = totals[entry_id]
+        accuracy = k * 100.0 / n if n else 0.0
+        bronze = n > 0 and accuracy >= 90.0
+        vocab_rows.append({
+            "id": entry_id, "user_id": user_id, "latin_word": latin, "german_translation": german,
+            "total_answers": n, "correct_answers": k, "accuracy_percent": accuracy, "has_bronze_card": bronze,
+            "created_at": now - timedelta(minutes=entry_id), "word_type": word_type, "flexion_type": flexion,
+            "sample_key": rng.random(),
+        })
+        schedules.append({"vocab_entry_id": entry_id, "user_id": user_id, "ease": 2.5,
+                          "interval_days": 1.0, "repetitions": 1,
+                          "due_at": now + timedelta(hours=rng.uniform(-24 * 30, 24 * 30))})
+        if bronze:
+            cards.append({"id": len(cards) + 1, "vocab_entry_id": entry_id, "rarity": "bronze", "title": latin,
+                          "description": f"Bronze card for {latin}", "image_url": "https://placehold.co/240x320"})
+            user_cards.append({"user_id": user_id, "card_id": len(cards), "acquired_at": now})
+
+    chunk = 50000
+    for model, rows in ((VocabEntry, vocab_rows), (ReviewSchedule, schedules), (QuizRound, rounds),
+                        (QuizAnswer, answers), (Card, cards), (UserCard, user_cards)):
+        for start in range(0, len(rows), chunk):
+            db.session.execute(insert(model), rows[start:start + chunk])
+    search.index_entries([(e[0], e[1], e[2], e[3]) for e in entries])
+    db.session.commit()
+    with db.engine.begin() as conn:
+        stats.rebuild(conn)
+    return entries
+
+
+# --- load ----------------------------------------------------------------------
+
+class Recorder:
+    def __init__(self, engine):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)  # endpoint -> [(ms, queries, status)]
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def count(*_):
+            self.local.queries = getattr(self.local, "queries", 0) + 1
+
+    def call(self, client, endpoint, method, url, json_body=None):
+        self.local.queries = 0
+        start = time.perf_counter()
+        response = client.open(url, method=method, json=json_body)
+        elapsed = (time.perf_counter() - start) * 1000
+        body = response.get_json(silent=True)
+        with self.lock:
+            self.samples[endpoint].append((elapsed, self.local.queries, response.status_code))
+        return response.status_code, body
+
+
+def session(rec, client, rng, entries, counter):
+    """One user session touching every blueprint."""
+    own = [e for e in entries if e[1] == 1]
+
+    rec.call(client, "GET /api/vocab/?limit", "GET", "/api/vocab/?limit=100")
+    rec.call(client, "GET /api/vocab/?search", "GET", f"/api/vocab/?search={rng.choice(SYLLABLES)}")
+    status, body = rec.call(client, "GET /api/vocab/?limit", "GET", "/api/vocab/?limit=100")
+    if status == 200 and body.get("next_cursor"):
+        rec.call(client, "GET /api/vocab/?cursor", "GET", f"/api/vocab/?limit=100&cursor={body['next_cursor']}")
+
+    # multiple choice, one question at a time
+    status, body = rec.call(client, "POST /api/quiz/start", "POST", "/api/quiz/start", {})
+    if status == 200:
+        round_id = body["quiz_round_id"]
+        for _ in range(5):
+            status, questions = rec.call(client, "GET /api/quiz/next", "GET", f"/api/quiz/next?quizroundid={round_id}")
+            if status != 200:
+                break
+            q = questions[0]
+            rec.call(client, "POST /api/quiz/answer", "POST", "/api/quiz/answer", {
+                "quiz_round_id": round_id, "vocab_entry_id": q["id"], "selected_option": rng.choice(q["options"])})
+
+    # multiple choice, pre-generated round + batch answers
+    status, body = rec.call(client, "POST /api/quiz/start?size", "POST", "/api/quiz/start", {"size": 10})
+    if status == 200:
+        round_id, batch = body["quiz_round_id"], []
+        for position in range(body["size"]):
+            status, questions = rec.call(client, "GET /api/quiz/next?position", "GET",
+                                         f"/api/quiz/next?quizroundid={round_id}&position={position}")
+            if status == 200:
+                q = questions[0]
+                batch.append({"quiz_round_id": round_id, "vocab_entry_id": q["id"],
+                              "selected_option": rng.choice(q["options"])})
+        if batch:
+            rec.call(client, "POST /api/quiz/answers", "POST", "/api/quiz/answers", {"answers": batch})
+
+    # sorting quizzes: generic engine and the old verbs/nouns URLs
+    for quiz, categories in (("verbs", VERB_TYPES), ("nouns", NOUN_TYPES)):
+        status, body = rec.call(client, "POST /api/quiz/sorting/<quiz>/start", "POST",
+                                f"/api/quiz/sorting/{quiz}/start", {"size": 10})
+        if status != 200:
+            continue
+        token = body["round_token"]
+        status, page = rec.call(client, "GET /api/quiz/sorting/<quiz>/next", "GET",
+                                f"/api/quiz/sorting/{quiz}/next?round_token={token}&k=5")
+        if status == 200:
+            rec.call(client, "POST /api/quiz/sorting/<quiz>/answer", "POST", f"/api/quiz/sorting/{quiz}/answer", {
+                "round_token": token,
+                "answers": [{"position": item["position"], "category": rng.choice(categories)}
+                            for item in page["items"]]})
+        for _ in range(3):
+            status, item = rec.call(client, f"GET /api/quiz/{quiz}/next", "GET",
+                                    f"/api/quiz/{quiz}/next?round_token={token}")
+            if status != 200:
+                break
+            rec.call(client, f"POST /api/quiz/{quiz}/answer", "POST", f"/api/quiz/{quiz}/answer", {
+                "round_token": token, "position": item["position"], "category": rng.choice(categories)})
+
+    rec.call(client, "GET /api/cards/?limit", "GET", "/api/cards/?limit=100")
+    rec.call(client, "GET /api/stats/daily", "GET", "/api/stats/daily?days=30")
+    rec.call(client, "GET /api/stats/weakest", "GET", "/api/stats/weakest")
+    rec.call(client, "GET /api/stats/rounds", "GET", "/api/stats/rounds")
+
+    # writes: a new word (stub lookup; every tenth one unknown) and an edit
+    with counter["lock"]:
+        counter["n"] += 1
+        n = counter["n"]
+    latin = f"ignotum{n}" if n % 10 == 0 else f"novum{n}"
+    rec.call(client, "POST /api/vocab/", "POST", "/api/vocab/", {"latin_word": latin, "german_translation": "neu"})
+    entry = rng.choice(own)
+    rec.call(client, "PUT /api/vocab/<id>", "PUT", f"/api/vocab/{entry[0]}", {"german_translation": entry[3]})
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def summarize(samples, wall):
+    result = {}
+    for endpoint, rows in sorted(samples.items()):
+        latencies = sorted(r[0] for r in rows)
+        queries = [r[1] for r in rows]
+        result[endpoint] = {
+            "count": len(rows),
+            "errors": sum(1 for r in rows if r[2] >= 500),
+            "status": {str(s): sum(1 for r in rows if r[2] == s) for s in sorted({r[2] for r in rows})},
+            "rps": round(len(rows) / wall, 2),
+            "p50_ms": round(percentile(latencies, 0.50), 2),
+            "p95_ms": round(percentile(latencies, 0.95), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+            "queries_mean": round(statistics.mean(queries), 2),
+            "queries_max": max(queries),
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--vocab", type=int, default=10000, help="vocab entries per user")
+    parser.add_argument("--answers", type=int, default=1000000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--stub-latency-ms", type=float, default=150.0)
+    parser.add_argument("--stub-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--db-url", default=None)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    stub = start_stub(args.stub_latency_ms, args.stub_jitter_ms)
+    tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["SQLALCHEMY_DATABASE_URI"] = args.db_url or f"sqlite:///{tmp.name}"
+    os.environ["FRAGCAESAR_BASE_URL"] = f"http://127.0.0.1:{stub.server_address[1]}"
+    os.environ["FRAGCAESAR_DELAY"] = "0"
+    os.environ.pop("DATABASE_URL", None)
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):  # keep stdout pure JSON
+        from app import app  # create_app() runs at import and reads the env above
+
+    app.config["CLASSIFIER_ENABLED"] = False
+    rng = random.Random(args.seed)
+    with app.app_context():
+        migrations.bootstrap()
+        entries = seed(args, rng)
+        rec = Recorder(db.engine)
+    seed_seconds = time.perf_counter() - started
+
+    stub_before = StubHandler.requests
+    deadline = time.perf_counter() + args.duration
+    counter = {"n": 0, "lock": threading.Lock()}
+    failures = []
+
+    def client_loop(i):
+        client_rng = random.Random(args.seed * 1000 + i)
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            try:
+                session(rec, client, client_rng, entries, counter)
+            except Exception as e:  # keep the other clients running, report at the end
+                failures.append(repr(e))
+
+    load_start = time.perf_counter()
+    threads = [threading.Thread(target=client_loop, args=(i,)) for i in range(args.clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - load_start
+
+    total = sum(len(rows) for rows in rec.samples.values())
+    print(json.dumps({
+        "config": vars(args),
+        "seed_seconds": round(seed_seconds, 1),
+        "load_seconds": round(wall, 1),
+        "requests": total,
+        "throughput_rps": round(total / wall, 2),
+        "stub_requests": StubHandler.requests - stub_before,
+        "client_failures": failures[:10],
+        "endpoints": summarize(rec.samples, wall),
+    }, indent=2))
+
+    stub.shutdown()
+    if not args.db_url:
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+        os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    main()
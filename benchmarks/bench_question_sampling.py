@@ -0,0 +1,119 @@
+"""
+Question selection: ORDER BY random() + NOT IN (asked) versus the indexed
+sample_key draw in sampling.py, on a synthetic vocabulary.
+
+    python benchmarks/bench_question_sampling.py [--vocab 50000] [--answers 20000] [--questions 200]
+
+Uses a throwaway SQLite file (or --db-url) and prints per-question latency as JSON.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from sqlalchemy import func, insert, select  # noqa: E402
+
+import sampling  # noqa: E402
+from extensions import db  # noqa: E402
+from models import User, VocabEntry, QuizRound, QuizAnswer  # noqa: E402
+
+
+def seed(n_vocab, n_answers):
+    db.session.add(User(id=1, username="bench", password_hash="x"))
+    types = ["Verb", "Nomen", "Adjektiv", "Konjunktion"]
+    now = datetime.utcnow()
+    rows = []
+    for i in range(n_vocab):
+        total = random.randint(0, 150)
+        correct = random.randint(0, total)
+        rows.append({
+            "user_id": 1, "latin_word": f"verbum{i}", "german_translation": f"Wort {i}",
+            "total_answers": total, "correct_answers": correct,
+            "accuracy_percent": correct * 100.0 / total if total else 0.0,
+            "word_type": types[i % len(types)], "flexion_type": "A-Konjugation" if i % 4 == 0 else None,
+            "created_at": now, "has_bronze_card": False, "sample_key": random.random(),
+        })
+    db.session.execute(insert(VocabEntry), rows)
+    db.session.add(QuizRound(id=1, user_id=1))
+    db.session.flush()
+    db.session.execute(insert(QuizAnswer), [
+        {"quiz_round_id": 1, "vocab_entry_id": random.randint(1, n_vocab), "was_correct": True, "answered_at": now}
+        for _ in range(n_answers)
+    ])
+    db.session.commit()
+
+
+def old_next(round_id):
+    asked_ids = select(QuizAnswer.vocab_entry_id).where(QuizAnswer.quiz_round_id == round_id)
+    entry = VocabEntry.query.filter(
+        VocabEntry.user_id == 1,
+        (VocabEntry.accuracy_percent < 95) | (VocabEntry.total_answers < 100),
+        ~VocabEntry.id.in_(asked_ids),
+    ).order_by(func.random()).first()
+    # the old route asked each entry once per round via QuizAnswer rows
+    db.session.add(QuizAnswer(quiz_round_id=round_id, vocab_entry_id=entry.id, was_correct=True))
+    db.session.commit()
+    return entry
+
+
+def new_next(round_id):
+    return sampling.draw(round_id, "mc", sampling.mc_criteria(1))
+
+
+def timed(fn, round_id, n):
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        assert fn(round_id) is not None
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vocab", type=int, default=50000)
+    parser.add_argument("--answers", type=int, default=20000)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--db-url", default=None)
+    args = parser.parse_args()
+
+    tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = args.db_url or f"sqlite:///{tmp.name}"
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        seed(args.vocab, args.answers)
+        for round_id in (2, 3):
+            db.session.add(QuizRound(id=round_id, user_id=1))
+        db.session.commit()
+
+        result = {
+            "vocab": args.vocab,
+            "answers": args.answers,
+            "questions": args.questions,
+            "order_by_random": timed(old_next, 2, args.questions),
+            "sample_key": timed(new_next, 3, args.questions),
+        }
+        db.session.remove()
+        db.drop_all()
+    os.unlink(tmp.name)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
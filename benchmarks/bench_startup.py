@@ -0,0 +1,110 @@
+"""
+Worker cold start: how long `import app` takes in a fresh interpreter (what
+every non-preloaded gunicorn worker pays), whether the scraping stack
+(httpx, bs4) got imported, the first request after the import, and the time
+from launching gunicorn (gunicorn.conf.py, with and without preload_app)
+until its first HTTP response.
+
+    python benchmarks/bench_startup.py [--runs 5] [--workers 2] [--no-gunicorn]
+
+Uses a throwaway SQLite file prepared with `flask init-db` and prints JSON.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import statistics
+import subprocess
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+loaded = sorted(m for m in ("httpx", "bs4") if m in sys.modules)
+response = app.app.test_client().get("/api/vocab/?limit=1")
+t2 = time.perf_counter()
+print(json.dumps({"import_s": t1 - t0, "first_request_s": t2 - t1, "status": response.status_code,
+                  "scraping_stack_loaded": loaded}))
+"""
+
+
+def run_probe(env):
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=env, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def gunicorn_first_response(env, workers, preload, timeout=60):
+    port = free_port()
+    env = dict(env, PORT=str(port), WEB_CONCURRENCY=str(workers), GUNICORN_PRELOAD="1" if preload else "0")
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/vocab/?limit=1", timeout=5) as r:
+                    if r.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        return None
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def summary(values):
+    values = sorted(values)
+    return {"median_s": round(statistics.median(values), 4), "min_s": round(values[0], 4),
+            "max_s": round(values[-1], 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--no-gunicorn", action="store_true")
+    args = parser.parse_args()
+
+    tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp.name}")
+    env.pop("DATABASE_URL", None)
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "flask", "--app", "app", "init-db"], cwd=ROOT, env=env, check=True,
+                   capture_output=True)
+    init_db = time.perf_counter() - start
+
+    probes = [run_probe(env) for _ in range(args.runs)]
+    result = {
+        "init_db_s": round(init_db, 3),
+        "import_app": summary([p["import_s"] for p in probes]),
+        "first_request": summary([p["first_request_s"] for p in probes]),
+        "first_request_status": probes[-1]["status"],
+        "scraping_stack_loaded_at_import": probes[-1]["scraping_stack_loaded"],
+    }
+    if not args.no_gunicorn:
+        for preload in (False, True):
+            times = [gunicorn_first_response(env, args.workers, preload) for _ in range(args.runs)]
+            key = f"gunicorn_{args.workers}_workers_{'preload' if preload else 'no_preload'}_first_response"
+            result[key] = summary([t for t in times if t is not None]) if any(times) else None
+    os.unlink(tmp.name)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
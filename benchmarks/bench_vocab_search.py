@@ -0,0 +1,100 @@
+"""
+Vocabulary search: ilike('%term%') on both columns versus the full-text
+index in search.py, for growing vocabulary sizes.
+
+    python benchmarks/bench_vocab_search.py [--sizes 1000,10000,50000] [--queries 200]
+
+Uses a throwaway SQLite file and prints per-query latency as JSON.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from sqlalchemy import insert, or_, select  # noqa: E402
+
+import search  # noqa: E402
+from extensions import db  # noqa: E402
+from models import User, VocabEntry  # noqa: E402
+
+SYLLABLES = ["am", "ar", "ca", "lo", "mu", "ne", "po", "ri", "sa", "tu", "ve", "xi"]
+GERMAN = ["lieben", "Äpfel", "sehen", "hören", "Straße", "führen", "gehen", "Übung", "Ort", "Zeit"]
+
+
+def word(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) + rng.choice(["re", "us", "um", "a"])
+
+
+def seed(n, rng):
+    db.session.add(User(id=1, username="bench", password_hash="x"))
+    rows = [{"user_id": 1, "latin_word": f"{word(rng)}{i}",
+             "german_translation": f"{rng.choice(GERMAN)} {rng.choice(GERMAN)}"} for i in range(n)]
+    inserted = db.session.execute(
+        insert(VocabEntry).returning(VocabEntry.id, VocabEntry.latin_word, VocabEntry.german_translation), rows
+    ).all()
+    search.index_entries([(i, 1, latin, german) for i, latin, german in inserted])
+    db.session.commit()
+
+
+def old_search(term):
+    return db.session.execute(select(VocabEntry.id).where(
+        VocabEntry.user_id == 1,
+        or_(VocabEntry.latin_word.ilike(f"%{term}%"), VocabEntry.german_translation.ilike(f"%{term}%")),
+    )).scalars().all()
+
+
+def new_search(term):
+    return search.search(1, term)
+
+
+def timed(fn, terms):
+    latencies = []
+    for term in terms:
+        start = time.perf_counter()
+        fn(term)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 3),
+    }
+
+
+def run(size, n_queries):
+    rng = random.Random(size)
+    tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp.name}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as conn:
+            search.create_index(conn)
+        seed(size, rng)
+        # keystroke prefixes like the live search sends them
+        terms = [word(rng)[:rng.randint(2, 5)] for _ in range(n_queries)]
+        result = {"vocab": size, "ilike": timed(old_search, terms), "fulltext": timed(new_search, terms)}
+        db.session.remove()
+        db.engine.dispose()
+    os.unlink(tmp.name)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps([run(int(s), args.queries) for s in args.sizes.split(",")], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update, or_, and_
+
+import distractors
+import frag_caesar_crawl4ai
+import response_cache
+import stats
+from extensions import db
+from models import ClassificationJob, VocabEntry
+
+"""
+Background word classification: add_vocab can store an entry right away and
+leave word_type/flexion_type to a bounded thread pool. Jobs live in the
+classification_job table, so they survive worker restarts and every worker
+can pick them up; a job is claimed with a conditional UPDATE, so only one
+worker ever runs it. An idle dispatcher polls less and less often (up to
+MAX_POLL_SECONDS, so a Neon compute can suspend); notify() wakes it for
+new work right away.
+"""
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = int(os.getenv("CLASSIFIER_WORKERS", 2))
+MAX_ATTEMPTS = int(os.getenv("CLASSIFIER_MAX_ATTEMPTS", 5))
+BACKOFF_SECONDS = float(os.getenv("CLASSIFIER_BACKOFF", 5))       # doubled per failed attempt
+LEASE_SECONDS = int(os.getenv("CLASSIFIER_LEASE", 300))           # "running" jobs older than this are retried
+POLL_SECONDS = float(os.getenv("CLASSIFIER_POLL", 2))
+MAX_POLL_SECONDS = float(os.getenv("CLASSIFIER_POLL_MAX", 900))   # doubled per empty poll up to this
+
+_started = False
+_start_lock = threading.Lock()
+_wakeup = threading.Event()
+_slots = threading.Semaphore(MAX_WORKERS)
+
+
+def enqueue(entry: VocabEntry) -> ClassificationJob:
+    """Add a pending job for `entry` to the current session (committed by the caller)."""
+    job = ClassificationJob(vocab_entry_id=entry.id, status="pending")
+    db.session.add(job)
+    return job
+
+
+def notify():
+    """Wake the dispatcher after a commit instead of waiting for the next poll."""
+    _wakeup.set()
+
+
+def ensure_started(app):
+    """Start this process's dispatcher thread once (lazily, so it is never inherited by a fork)."""
+    global _started
+    if _started or app.config.get("CLASSIFIER_ENABLED") is False:
+        return
+    with _start_lock:
+        if _started:
+            return
+        pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="classifier")
+        threading.Thread(target=_dispatch_loop, args=(app, pool), name="classifier-dispatch", daemon=True).start()
+        _started = True
+
+
+def _next_poll(interval, idle):
+    """Poll interval after a poll: back off while the queue stays empty, reset on work."""
+    return min(interval * 2, MAX_POLL_SECONDS) if idle else POLL_SECONDS
+
+
+def _dispatch_loop(app, pool):
+    interval = POLL_SECONDS
+    while True:
+        woken = _wakeup.wait(interval)
+        _wakeup.clear()
+        due = []
+        try:
+            with app.app_context():
+                due = _due_job_ids(limit=MAX_WORKERS * 4)
+            for job_id in due:
+                if not _slots.acquire(blocking=False):
+                    break  # pool busy, the rest stays queued in the DB
+                pool.submit(_run_claimed, app, job_id)
+        except Exception as e:
+            logger.error("Classifier dispatch failed: %s", e)
+        interval = _next_poll(interval, idle=not woken and not due)
+
+
+def due_jobs_query(now, limit):
+    """Pending jobs that are due and "running" jobs whose lease expired."""
+    stale = now - timedelta(seconds=LEASE_SECONDS)
+    return (
+        select(ClassificationJob.id)
+        .where(or_(
+            and_(ClassificationJob.status == "pending", ClassificationJob.next_attempt_at <= now),
+            and_(ClassificationJob.status == "running", ClassificationJob.updated_at < stale),
+        ))
+        .order_by(ClassificationJob.next_attempt_at)
+        .limit(limit)
+    )
+
+
+def _due_job_ids(limit):
+    return db.session.execute(due_jobs_query(datetime.utcnow(), limit)).scalars().all()
+
+
+def _claim(job_id) -> bool:
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=LEASE_SECONDS)
+    vocab_entry_id = db.session.execute(
+        update(ClassificationJob)
+        .where(ClassificationJob.id == job_id,
+               or_(ClassificationJob.status == "pending",
+                   and_(ClassificationJob.status == "running", ClassificationJob.updated_at < stale)))
+        .values(status="running", updated_at=now)
+        .returning(ClassificationJob.vocab_entry_id)
+    ).scalar()
+    if vocab_entry_id is not None:
+        # list_vocab shows classification_status, so every status change is a data change
+        user_id = db.session.execute(
+            select(VocabEntry.user_id).where(VocabEntry.id == vocab_entry_id)
+        ).scalar()
+        if user_id is not None:
+            response_cache.bump(user_id)
+    db.session.commit()
+    return vocab_entry_id is not None
+
+
+def _run_claimed(app, job_id):
+    try:
+        with app.app_context():
+            if _claim(job_id):
+                run_job(job_id)
+    except Exception as e:
+        logger.error("Classification job %s crashed: %s", job_id, e)
+    finally:
+        _slots.release()
+        _wakeup.set()  # a slot is free again
+
+
+def run_job(job_id):
+    """Classify one claimed job; retries with exponential backoff on transient errors."""
+    job = db.session.get(ClassificationJob, job_id)
+    entry = db.session.get(VocabEntry, job.vocab_entry_id)
+    job.attempts = (job.attempts or 0) + 1
+    job.updated_at = datetime.utcnow()
+
+    try:
+        rows = frag_caesar_crawl4ai.get_kurzuebersicht(entry.latin_word)
+        old_type = entry.word_type
+        entry.word_type, entry.flexion_type = frag_caesar_crawl4ai.classify_rows(rows)
+        db.session.flush()
+        stats.retype(entry.user_id, entry.id, old_type, entry.word_type)  # answers so far count as the new type
+        job.status = "done"
+        job.last_error = None
+    except (frag_caesar_crawl4ai.WordNotFound, ValueError, KeyError, IndexError) as e:
+        # permanent: frag-caesar.de does not know the word, or its page does not parse
+        job.status = "failed"
+        job.last_error = f"{type(e).__name__}: {e}"
+    except Exception as e:
+        job.last_error = f"{type(e).__name__}: {e}"
+        if job.attempts >= MAX_ATTEMPTS:
+            job.status = "failed"
+        else:
+            job.status = "pending"
+            job.next_attempt_at = datetime.utcnow() + timedelta(seconds=BACKOFF_SECONDS * 2 ** (job.attempts - 1))
+        logger.warning("Classification of '%s' failed (attempt %s): %s", entry.latin_word, job.attempts, e)
+
+    response_cache.bump(entry.user_id)  # done, failed or back to pending: all visible in list_vocab
+    db.session.commit()
+    if job.status == "done":
+        distractors.index.upsert(entry.user_id, entry.id, entry.word_type, entry.german_translation)
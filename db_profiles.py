@@ -0,0 +1,191 @@
+import os
+import time
+import logging
+from functools import wraps
+from urllib.parse import urlsplit
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+"""
+Database profiles: the engine options that fit the database behind a URL,
+plus optional read-replica routing.
+
+- sqlite: WAL journal, synchronous=NORMAL, a busy timeout instead of
+  immediate "database is locked", bigger page cache, temp tables in memory.
+- postgres: pre-ping, LIFO pool with recycling, bounded pool + overflow,
+  connect timeout, TCP keepalives and a server-side statement_timeout.
+- neon: postgres + sslmode=require. Through Neon's PgBouncer endpoint
+  ("-pooler" host, or DB_PGBOUNCER=1) the statement timeout is set per
+  transaction (SET LOCAL), because PgBouncer rejects the startup "options".
+
+DB_PROFILE forces a profile; the DB_* variables below tune it.
+
+With DATABASE_REPLICA_URL, views marked @replica_reads (read-only GET list
+endpoints) query the replica. Every successful write request sets a short
+cookie, and while it lives that client reads from the primary, so it sees
+its own writes even if the replica lags. Locally this works with two SQLite
+files, e.g. DATABASE_REPLICA_URL=sqlite:////tmp/replica.db after
+`sqlite3 instance/latin_vocab.db ".backup /tmp/replica.db"`.
+"""
+
+logger = logging.getLogger(__name__)
+
+REPLICA = "replica"
+READ_YOUR_WRITES_COOKIE = "db_rw_until"
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 5))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))              # seconds waiting for a pooled connection
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 300))               # Neon suspends idle computes after 5 min
+CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", 10))          # seconds
+STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 15000))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", 5))
+
+
+def database_url() -> str:
+    """DATABASE_URL (Postgres/Neon on Render), else SQLALCHEMY_DATABASE_URI, else the local SQLite file."""
+    db_url = os.getenv("DATABASE_URL")
+    if db_url and db_url.startswith(("postgres://", "postgresql")):
+        return _normalize(db_url)
+    # SQLALCHEMY_DATABASE_URI: throwaway databases (benchmarks/bench_load.py)
+    return os.getenv("SQLALCHEMY_DATABASE_URI", "sqlite:///latin_vocab.db")
+
+
+def _normalize(url):
+    # SQLAlchemy 2 only knows the postgresql:// scheme
+    return "postgresql://" + url[len("postgres://"):] if url.startswith("postgres://") else url
+
+
+def profile_name(url) -> str:
+    forced = os.getenv("DB_PROFILE")
+    if forced:
+        return forced
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return "sqlite"
+    return "neon" if "neon.tech" in (url.host or "") else "postgres"
+
+
+def _uses_pgbouncer(url) -> bool:
+    return os.getenv("DB_PGBOUNCER") in ("1", "true") or "-pooler" in (make_url(url).host or "")
+
+
+def engine_options(url) -> dict:
+    """create_engine() keyword arguments for `url`."""
+    profile = profile_name(url)
+    if profile == "sqlite":
+        return {"connect_args": {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}}
+
+    connect_args = {
+        "connect_timeout": CONNECT_TIMEOUT,
+        "application_name": "aenigma-verborum",
+        "keepalives": 1,
+        "keepalives_idle": 30,
+    }
+    if STATEMENT_TIMEOUT_MS and not _uses_pgbouncer(url):
+        connect_args["options"] = f"-c statement_timeout={STATEMENT_TIMEOUT_MS}"
+    if profile == "neon" and "sslmode" not in make_url(url).query:
+        connect_args["sslmode"] = "require"
+    return {
+        "pool_pre_ping": True,
+        "pool_use_lifo": True,  # idle surplus connections age out via pool_recycle
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "connect_args": connect_args,
+    }
+
+
+def configure(app):
+    """Set the URI, engine options and (optional) replica bind before db.init_app(app)."""
+    url = database_url()
+    app.config["SQLALCHEMY_DATABASE_URI"] = url
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(url)
+    logger.info("✅ Database: %s (%s profile)", _describe(url), profile_name(url))
+
+    replica_url = os.getenv("DATABASE_REPLICA_URL")
+    if replica_url:
+        replica_url = _normalize(replica_url)
+        app.config["SQLALCHEMY_BINDS"] = {REPLICA: {"url": replica_url, **engine_options(replica_url)}}
+        logger.info("✅ Read replica: %s", _describe(replica_url))
+
+
+def _describe(url):
+    parts = urlsplit(url)
+    return parts.hostname or parts.path.rsplit("/", 1)[-1] or url.split(":", 1)[0]
+
+
+# --- per-connection setup ----------------------------------------------------------
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")     # readers never block the writer
+    cursor.execute("PRAGMA synchronous=NORMAL")   # safe with WAL, fsync at checkpoints only
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA cache_size=-20000")    # 20 MB page cache per connection
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def _set_local_statement_timeout(conn):
+    conn.exec_driver_sql(f"SET LOCAL statement_timeout = {STATEMENT_TIMEOUT_MS}")
+
+
+def init_app(app):
+    """Per-connection setup of every engine + the read-your-writes cookie (after db.init_app)."""
+    from extensions import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            url = engine.url.render_as_string(hide_password=False)
+            if profile_name(url) == "sqlite":
+                event.listen(engine, "connect", _sqlite_pragmas)
+            elif STATEMENT_TIMEOUT_MS and _uses_pgbouncer(url):
+                event.listen(engine, "begin", _set_local_statement_timeout)
+
+    if app.config.get("SQLALCHEMY_BINDS", {}).get(REPLICA):
+        app.after_request(_mark_write)
+
+
+# --- replica routing ---------------------------------------------------------------
+
+def _mark_write(response):
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        until = time.time() + READ_YOUR_WRITES_SECONDS
+        response.set_cookie(READ_YOUR_WRITES_COOKIE, f"{until:.3f}", max_age=int(READ_YOUR_WRITES_SECONDS) + 1,
+                            httponly=True, samesite="Lax")
+    return response
+
+
+def _recent_write() -> bool:
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def replica_reads(view):
+    """Route the (read-only) view's queries to the replica, unless the client just wrote."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_replica = (REPLICA in current_app.config.get("SQLALCHEMY_BINDS", {})
+                        and request.method in ("GET", "HEAD") and not _recent_write())
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+class RoutingSession(Session):
+    """Session that sends everything except flushes to the replica inside @replica_reads views."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context() and g.get("db_replica"):
+            engine = self._db.engines.get(REPLICA)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
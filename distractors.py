@@ -0,0 +1,214 @@
+import re
+import random
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List
+
+from extensions import db
+from models import VocabEntry
+
+"""
+Distractor index for multiple choice questions, built once per process.
+
+Wrong answers come from the static German word pools plus the translations
+of the user's own other vocab, bucketed by word_type so that verb questions
+get verb-like options. Everything is normalized when it enters the index,
+so a draw is a few random picks plus set lookups, without regex work.
+"""
+
+WRONG_VERBS = [
+    # VERBEN (90)
+    "laufen", "sehen", "hören", "sprechen", "essen", "trinken", "schlafen", "arbeiten", "spielen", "lesen",
+    "schreiben", "denken", "wissen", "gehen", "kommen", "sein", "haben", "tun", "machen", "geben",
+    "nehmen", "finden", "verlieren", "lieben", "hassen", "helfen", "fragen", "antworten", "erzählen", "sagen",
+    "rufen", "schreien", "flüstern", "tanzen", "springen", "sitzen", "stehen", "fallen", "steigen", "sinken",
+    "öffnen", "schließen", "beginnen", "enden", "warten", "suchen", "verstecken", "zeigen", "verbergen", "tragen",
+    "werfen", "fangen", "schneiden", "nähen", "kaufen", "verkaufen", "zahlen", "zählen", "rechnen", "erklären",
+    "verstehen", "vergessen", "erinnern", "wünschen", "hoffen", "fürchten", "wagen", "versuchen", "gelingen", "scheitern",
+    "regnen", "schneien", "wehen", "leuchten", "brennen", "erhitzen", "kühlen", "wachsen", "blühen", "welken",
+    "leben", "sterben", "atmen", "schlagen", "fühlen", "riechen", "schmecken", "berühren", "greifen", "halten",
+]
+
+WRONG_NOUNS = [
+    # NOMEN (80)
+    "Haus", "Tür", "Fenster", "Tisch", "Stuhl", "Bett", "Buch", "Stift", "Papier", "Lampe",
+    "Straße", "Stadt", "Land", "Welt", "Himmel", "Erde", "Wasser", "Feuer", "Luft", "Licht",
+    "Nacht", "Tag", "Morgen", "Abend", "Sonne", "Mond", "Stern", "Baum", "Blatt", "Blume",
+    "Mädchen", "Junge", "Mann", "Frau", "Kind", "Mutter", "Vater", "Freund", "Feind", "Lehrer",
+    "Schüler", "Arzt", "Kranke", "König", "Held", "Heldin", "Schwert", "Schild", "Pferd", "Weg",
+    "Wald", "Fluss", "Berg", "Tal", "See", "Meer", "Schiff", "Boot", "Fisch", "Vogel",
+    "Wolke", "Regen", "Schnee", "Wind", "Sturm", "Frieden", "Krieg", "Liebe", "Hass", "Freude",
+    "Trauer", "Angst", "Mut", "Zeit", "Jahr", "Monat", "Woche", "Brücke", "Stunde", "Minuten",
+]
+
+WRONG_ADJECTIVES = [
+    # ADJEKTIVE (80)
+    "groß", "klein", "hoch", "niedrig", "lang", "kurz", "breit", "schmal", "neu", "alt",
+    "jung", "reif", "schön", "hässlich", "gut", "schlecht", "stark", "schwach", "schnell", "langsam",
+    "warm", "kalt", "heiß", "kühl", "hell", "dunkel", "klar", "trüb", "reich", "arm",
+    "klug", "dumm", "freundlich", "böse", "froh", "traurig", "mutig", "feige", "edel", "gemein",
+    "einfach", "schwer", "leicht", "hart", "weich", "glatt", "rau", "sauber", "schmutzig", "gesund",
+    "krank", "tot", "lebendig", "leer", "voll", "nah", "fern", "oben", "unten", "links",
+    "rechts", "vor", "nach", "innen", "außen", "erste", "letzte", "ganze", "halbe", "viele",
+    "wenige", "alle", "kein", "einzeln", "gemeinsam", "öffentlich", "geheim", "wahr", "falsch", "möglich"
+]
+
+WRONG_TRANSLATIONS = WRONG_VERBS + WRONG_NOUNS + WRONG_ADJECTIVES
+
+STATIC_POOLS = {
+    "Verb": WRONG_VERBS,
+    "Nomen": WRONG_NOUNS,
+    "Adjektiv": WRONG_ADJECTIVES,
+}
+ALL_TYPES = "*"  # bucket with every candidate, used to fill up small type buckets
+USER_RELOAD_SECONDS = 300  # picks up vocab written by other workers
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[;.,!?:]+$")
+
+
+@lru_cache(maxsize=8192)
+def normalize_german_strict(s: str) -> str:
+    s = s.strip().lower()
+    s = _WHITESPACE_RE.sub(" ", s)
+    s = _TRAILING_PUNCT_RE.sub("", s)
+    return s
+
+
+class _Bucket:
+    """normalized -> display string with O(1) add, remove and random pick."""
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.pos: Dict[str, int] = {}
+        self.display: Dict[str, str] = {}
+        self.refs: Dict[str, int] = {}  # several entries may share one translation
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, norm: str, display: str):
+        if norm in self.refs:
+            self.refs[norm] += 1
+            return
+        self.refs[norm] = 1
+        self.display[norm] = display
+        self.pos[norm] = len(self.keys)
+        self.keys.append(norm)
+
+    def remove(self, norm: str):
+        if norm not in self.refs:
+            return
+        self.refs[norm] -= 1
+        if self.refs[norm]:
+            return
+        del self.refs[norm]
+        del self.display[norm]
+        # swap with the last key, then pop
+        i, last = self.pos.pop(norm), self.keys.pop()
+        if last != norm:
+            self.keys[i] = last
+            self.pos[last] = i
+
+    def pick(self) -> str:
+        return random.choice(self.keys)
+
+
+class DistractorIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._static: Dict[str, _Bucket] = {}
+        for word_type, words in STATIC_POOLS.items():
+            for w in words:
+                self._add(self._static, word_type, normalize_german_strict(w), w.strip())
+        # user_id -> {word_type: bucket}, entry_id -> (word_type, norm)
+        self._users: Dict[int, Dict[str, _Bucket]] = {}
+        self._entries: Dict[int, Dict[int, tuple]] = {}
+        self._loaded_at: Dict[int, float] = {}
+        self._generation: Dict[int, int] = {}  # user_id -> number of upserts/removes so far
+
+    @staticmethod
+    def _add(buckets, word_type, norm, display):
+        if not norm:
+            return
+        for key in (word_type, ALL_TYPES):
+            buckets.setdefault(key, _Bucket()).add(norm, display)
+
+    @staticmethod
+    def _remove(buckets, word_type, norm):
+        for key in (word_type, ALL_TYPES):
+            if key in buckets:
+                buckets[key].remove(norm)
+
+    def _ensure_user(self, user_id, attempts=3):
+        """Load the user's translations once (and again after USER_RELOAD_SECONDS)."""
+        for _ in range(attempts):
+            with self._lock:
+                loaded_at = self._loaded_at.get(user_id)
+                if loaded_at is not None and time.monotonic() - loaded_at < USER_RELOAD_SECONDS:
+                    return
+                generation = self._generation.get(user_id, 0)
+            # the query runs outside the lock, so draws for other users are not blocked by it
+            rows = db.session.query(VocabEntry.id, VocabEntry.word_type, VocabEntry.german_translation) \
+                .filter(VocabEntry.user_id == user_id).all()
+            buckets, entries = {}, {}
+            for entry_id, word_type, german in rows:
+                norm = normalize_german_strict(german or "")
+                self._add(buckets, word_type, norm, (german or "").strip())
+                entries[entry_id] = (word_type, norm)
+            with self._lock:
+                if self._generation.get(user_id, 0) != generation:
+                    continue  # an upsert/remove ran meanwhile and may be missing from `rows`: load again
+                self._users[user_id] = buckets
+                self._entries[user_id] = entries
+                self._loaded_at[user_id] = time.monotonic()
+                return
+
+    def upsert(self, user_id, entry_id, word_type, german):
+        """Incremental update after a vocab write (no-op until the user is loaded)."""
+        with self._lock:
+            self._generation[user_id] = self._generation.get(user_id, 0) + 1
+            if user_id not in self._users:
+                return
+            buckets, entries = self._users[user_id], self._entries[user_id]
+            if entry_id in entries:
+                self._remove(buckets, *entries.pop(entry_id))
+            norm = normalize_german_strict(german or "")
+            self._add(buckets, word_type, norm, (german or "").strip())
+            entries[entry_id] = (word_type, norm)
+
+    def remove(self, user_id, entry_id):
+        with self._lock:
+            self._generation[user_id] = self._generation.get(user_id, 0) + 1
+            if user_id not in self._users or entry_id not in self._entries[user_id]:
+                return
+            self._remove(self._users[user_id], *self._entries[user_id].pop(entry_id))
+
+    def draw(self, user_id, word_type, exclude: set, k: int = 3) -> List[str]:
+        """
+        k distinct wrong answers for a question about a `word_type` entry;
+        `exclude` holds the normalized true meanings.
+        """
+        self._ensure_user(user_id)
+        chosen: Dict[str, str] = {}
+        with self._lock:
+            user = self._users.get(user_id, {})
+            # same word type first, then anything
+            for key in (word_type, ALL_TYPES):
+                pools = [b for b in (user.get(key), self._static.get(key)) if b]
+                total = sum(len(b) for b in pools)
+                for _ in range(total * 2):
+                    if len(chosen) >= k:
+                        break
+                    i = random.randrange(total)
+                    bucket = pools[0] if i < len(pools[0]) else pools[1]
+                    norm = bucket.pick()
+                    if norm not in exclude and norm not in chosen:
+                        chosen[norm] = bucket.display[norm]
+                if len(chosen) >= k:
+                    break
+        return list(chosen.values())
+
+
+index = DistractorIndex()
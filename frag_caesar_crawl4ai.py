@@ -1,7 +1,30 @@
 # frag_caesar_bs4.py
-import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict
+import os
+import re
+import logging
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from urllib.parse import urlsplit
+from flask import current_app, g, has_app_context, has_request_context
+from typing import TYPE_CHECKING, List, Dict, NamedTuple, Optional, Iterable
+
+# httpx and bs4 are imported on first use, so booting a worker does not pay for the scraping stack
+if TYPE_CHECKING:
+    import httpx
+
+import lexicon
+import lookup_cache
+import metrics
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = os.getenv("FRAGCAESAR_BASE_URL", "https://www.frag-caesar.de").rstrip("/")
+REQUEST_TIMEOUT = float(os.getenv("FRAGCAESAR_TIMEOUT", 10))  # seconds
+MAX_CONCURRENCY = int(os.getenv("FRAGCAESAR_CONCURRENCY", 8))
+POLITENESS_DELAY = float(os.getenv("FRAGCAESAR_DELAY", 0.05))  # seconds between requests to one host
+REQUEST_BUDGET = float(os.getenv("FRAGCAESAR_REQUEST_BUDGET", 3))  # seconds of lookups per @lookup_deadline request
 
 ATTR_TRANSLATIONS = {
     "Latein": "latin",
@@ -11,22 +34,239 @@ ATTR_TRANSLATIONS = {
     "Deutsch": "german",
 }
 
-def get_kurzuebersicht(word: str) -> List[Dict[str, str]]:
+class WordNotFound(LookupError):
+    """frag-caesar.de has no dictionary page for this word (404, negatively cached)."""
+
+
+class LookupTimeout(TimeoutError):
+    """The request's lookup deadline passed before frag-caesar.de answered (not cached)."""
+
+
+class LookupResult(NamedTuple):
+    word: str
+    rows: Optional[List[Dict[str, str]]]
+    error: Optional[Exception]
+
+
+class _HostThrottle:
+    """Spaces out request starts per host by at least `delay` seconds."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._next_slot: Dict[str, float] = {}
+
+    def wait(self, host: str):
+        if self.delay <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+
+
+_throttle = _HostThrottle(POLITENESS_DELAY)
+_client: Optional["httpx.Client"] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> "httpx.Client":
+    """One pooled keep-alive client per process (created lazily, so it is never shared across a fork)."""
+    import httpx
+
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client(
+                timeout=REQUEST_TIMEOUT,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONCURRENCY,
+                    max_keepalive_connections=MAX_CONCURRENCY,
+                ),
+            )
+        return _client
+
+
+def lookup_deadline(view):
+    """
+    Give the view's frag-caesar.de lookups REQUEST_BUDGET seconds in total.
+    Fetches still running at the deadline time out, lookups not yet started
+    fail right away with LookupTimeout, so a slow site cannot hold the
+    worker thread much longer than the budget.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if REQUEST_BUDGET > 0:
+            g.fragcaesar_deadline = time.monotonic() + REQUEST_BUDGET
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+def request_deadline() -> Optional[float]:
+    """time.monotonic() deadline of the current @lookup_deadline request, else None."""
+    return g.get("fragcaesar_deadline") if has_request_context() else None
+
+
+def get_kurzuebersicht(word: str, allow_stale: bool = False, throttle: Optional[_HostThrottle] = None,
+                       deadline: Optional[float] = None) -> List[Dict[str, str]]:
+    """
+    Kurzübersicht rows for a word: offline lexicon snapshot first, then the
+    lookup cache; only a miss in both goes out to frag-caesar.de, within
+    `deadline` (default: the request's, see lookup_deadline).
+    """
+    offline = lexicon.lookup(word)
+    if offline is not None:
+        metrics.lookup("lexicon")
+        return offline
+
+    cached = lookup_cache.get(word, allow_stale=allow_stale)
+    metrics.lookup("fetch" if cached is None else "cache")
+    if cached is None:
+        import httpx
+
+        try:
+            rows = fetch_kurzuebersicht(word, throttle=throttle, deadline=deadline or request_deadline())
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                raise
+            lookup_cache.put(word, [], not_found=True)
+            raise WordNotFound(word) from e
+        lookup_cache.put(word, rows)
+        return rows
+
+    rows, not_found = cached
+    if not_found:
+        raise WordNotFound(word)
+    return rows
+
+
+def get_kurzuebersicht_many(words: Iterable[str], concurrency: Optional[int] = None,
+                            delay: Optional[float] = None) -> List[LookupResult]:
+    """
+    Look up many words concurrently over the pooled client.
+    Returns one LookupResult per input word, in input order; a failing word
+    carries its exception in `error` instead of aborting the batch.
+    """
+    words = list(words)
+    # never more threads than pooled connections
+    concurrency = max(1, min(concurrency or MAX_CONCURRENCY, MAX_CONCURRENCY))
+    throttle = _throttle if delay is None else _HostThrottle(delay)
+    app = current_app._get_current_object() if has_app_context() else None
+    deadline = request_deadline()  # the pool threads have no request context
+
+    def lookup(lemma: str):
+        try:
+            if app is None:
+                return get_kurzuebersicht(lemma, throttle=throttle, deadline=deadline), None
+            with app.app_context():  # gives worker threads the DB cache tier
+                return get_kurzuebersicht(lemma, throttle=throttle, deadline=deadline), None
+        except Exception as e:
+            return None, e
+
+    # same lemma in different spellings is fetched only once
+    lemmas = list(dict.fromkeys(lookup_cache.normalize_lemma(w) for w in words))
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(lemmas) or 1)) as pool:
+        by_lemma = dict(zip(lemmas, pool.map(lookup, lemmas)))
+
+    results = []
+    for w in words:
+        rows, error = by_lemma[lookup_cache.normalize_lemma(w)]
+        results.append(LookupResult(w, rows, error))
+    return results
+
+
+def _remaining(word: str, deadline: Optional[float]) -> float:
+    """Timeout for the next fetch: REQUEST_TIMEOUT, capped by what is left until `deadline`."""
+    if deadline is None:
+        return REQUEST_TIMEOUT
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise LookupTimeout(word)
+    return min(REQUEST_TIMEOUT, left)
+
+
+def fetch_kurzuebersicht(word: str, throttle: Optional[_HostThrottle] = None,
+                         deadline: Optional[float] = None) -> List[Dict[str, str]]:
     #variants = ["","-1","-2","-3"]
     #url_template
-    url = f"https://www.frag-caesar.de/lateinwoerterbuch/{word}-uebersetzung.html"
+    import httpx
+
+    word = word.strip()
+    url = f"{BASE_URL}/lateinwoerterbuch/{word}-uebersetzung.html"
 
-    resp = requests.get(url, timeout=10)
-    resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "html.parser")
+    _remaining(word, deadline)
+    (throttle or _throttle).wait(urlsplit(url).netloc)
+    with metrics.fetch_timer():
+        try:
+            resp = get_client().get(url, timeout=_remaining(word, deadline))
+        except httpx.TimeoutException as e:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise LookupTimeout(word) from e
+            raise
+        resp.raise_for_status()
+    return parse_kurzuebersicht(resp.text, word)
+
+
+_H2_RE = re.compile(r"<h2\b[^>]*>(.*?)</h2\s*>", re.IGNORECASE | re.DOTALL)
+_TABLE_TAG_RE = re.compile(r"<(/?)table\b[^>]*>", re.IGNORECASE)
+
+
+def _kurz_region(html: str) -> Optional[str]:
+    """
+    Slice of the page from the first <h2> mentioning "Kurz" up to the end of the
+    next (possibly nested) <table>, found by a plain text scan instead of a full parse.
+    """
+    for m in _H2_RE.finditer(html):
+        if "Kurz" not in m.group(1):
+            continue
+        depth = 0
+        for tag in _TABLE_TAG_RE.finditer(html, m.end()):
+            depth += -1 if tag.group(1) else 1
+            if depth == 0:
+                return html[m.start():tag.end()]
+            if depth < 0:
+                return None
+        return None
+    return None
+
+
+def parse_kurzuebersicht(html: str, word: str) -> List[Dict[str, str]]:
+    """
+    Fast path: parse only the Kurzübersicht region of the page.
+    Falls back to the full-page parser whenever the region scan is not conclusive,
+    so the rows are always identical to parse_kurzuebersicht_full.
+    """
+    region = _kurz_region(html)
+    if region is not None:
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(region, "html.parser")
+        headline = soup.find("h2", string=lambda s: s and "Kurz" in s)
+        table = headline.find_next("table") if headline else None
+        if table:
+            return _rows_from_table(table, word)
+    return parse_kurzuebersicht_full(html, word)
+
+
+def parse_kurzuebersicht_full(html: str, word: str) -> List[Dict[str, str]]:
+    """Reference parser over the whole page (see benchmarks/bench_kurzuebersicht_parser.py)."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
 
     # find the Kurzübersicht table
     headline = soup.find("h2", string=lambda s: s and "Kurz" in s)
     table = headline.find_next("table") if headline else None
     if not table:
-        print("No table")
+        logger.warning("No Kurzübersicht table for %s", word)
         return []
 
+    return _rows_from_table(table, word)
+
+
+def _rows_from_table(table, word: str) -> List[Dict[str, str]]:
     rows = table.find_all("tr")
     if len(rows) < 2:
         return []
@@ -52,12 +292,22 @@ def get_kurzuebersicht(word: str) -> List[Dict[str, str]]:
     return result
 
 
-def get_german_meanings(word: str) -> list[str]:
+def classify_rows(rows: List[Dict[str, str]]) -> tuple:
+    """(word_type, flexion_type) from the lemma row of a Kurzübersicht."""
+    if not rows:
+        raise ValueError("no Kurzübersicht table")
+    first = rows[0]  # lemma row: Infinitiv / Nominativ
+    word_type = first["type"]
+    flexion_type = first.get("flexion_type") if word_type in ["Verb", "Nomen", "Adjektiv"] else None
+    return word_type, flexion_type
+
+
+def get_german_meanings(word: str, allow_stale: bool = False) -> list[str]:
     """
     Return a list of German meaning strings for the lemma.
     For now: only the first Kurzübersicht row.
     """
-    rows = get_kurzuebersicht(word)
+    rows = get_kurzuebersicht(word, allow_stale=allow_stale)
     if not rows:
         return []
 
@@ -0,0 +1,38 @@
+import os
+
+"""
+gunicorn settings (Procfile: gunicorn -c gunicorn.conf.py app:app).
+
+With preload_app the master imports app.py once and forks the workers, so
+a worker is ready as soon as it is forked. app.py does not touch the
+database at import (the schema comes from `flask init-db` before gunicorn
+starts), and post_fork drops any pooled connection (primary and replica)
+a worker would otherwise share with the master. The httpx client, the
+classifier threads and the lookup caches are created lazily per worker.
+
+Workers are gthread workers: each serves GUNICORN_THREADS requests at once,
+so a request waiting on frag-caesar.de (add_vocab, quiz start/next) holds
+one thread, not the whole worker, and list/quiz requests of other users
+keep being served. Everything shared per worker (httpx client, SQLAlchemy
+pools, caches) is thread-safe; DB_POOL_SIZE + DB_MAX_OVERFLOW should stay
+>= the thread count. GUNICORN_WORKER_CLASS=sync restores the old behaviour
+(see benchmarks/bench_concurrency.py).
+"""
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", 1))
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") not in ("0", "false")
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+# gunicorn turns "sync" into gthread as soon as threads > 1
+threads = int(os.getenv("GUNICORN_THREADS", 8)) if worker_class == "gthread" else 1
+
+
+def post_fork(server, worker):
+    # close=False: leave the master's sockets alone, just forget them in this worker
+    from app import app
+    from extensions import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
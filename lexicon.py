@@ -0,0 +1,268 @@
+import os
+import csv
+import json
+import mmap
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import click
+from flask.cli import with_appcontext
+
+"""
+Offline lexicon: a compact, sorted, memory-mapped snapshot of
+lemma -> (type, flexion_type, German meanings).
+
+File layout (little endian):
+    header   MAGIC, record count (uint32)
+    index    count x uint32 record offsets, sorted by lemma bytes
+    records  uint16 lemma length, lemma, uint32 value length, value
+    value    type \\x1f flexion_type \\x1f meaning \\x1e meaning ...
+
+Lookups binary-search the index directly in the mapping, so a worker
+never loads the whole file and each lookup is O(log n).
+"""
+
+MAGIC = b"AVLEX001"
+_HEADER = struct.Struct("<8sI")
+_OFFSET = struct.Struct("<I")
+_KEY_LEN = struct.Struct("<H")
+_VALUE_LEN = struct.Struct("<I")
+FIELD_SEP = "\x1f"
+MEANING_SEP = "\x1e"
+
+DEFAULT_PATH = os.getenv(
+    "LEXICON_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance", "lexicon.bin"),
+)
+
+CHECK_INTERVAL = float(os.getenv("LEXICON_CHECK_SECONDS", 1))  # seconds between mtime checks of the file
+
+LexiconEntry = Tuple[str, Optional[str], List[str]]  # (type, flexion_type, German meanings)
+
+
+def normalize_lemma(word: str) -> str:
+    return (word or "").strip().lower()
+
+
+class Lexicon:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise
+        self._index_start = _HEADER.size
+        self._readers = 0  # lookups in flight, guarded by _lexicon_lock
+        try:
+            magic, self.count = _HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a lexicon snapshot")
+            self._check_complete()
+        except (ValueError, struct.error) as e:
+            self.close()
+            raise ValueError(f"{path} is not a complete lexicon snapshot: {e}") from e
+
+    def _check_complete(self):
+        # records are written in index order, so a truncated or partial copy cuts the last one
+        if len(self._mm) < self._index_start + self.count * _OFFSET.size:
+            raise ValueError("index truncated")
+        if self.count:
+            _, value_pos = self._key_at(self.count - 1)
+            (value_len,) = _VALUE_LEN.unpack_from(self._mm, value_pos)
+            if value_pos + _VALUE_LEN.size + value_len != len(self._mm):
+                raise ValueError("records truncated")
+
+    def __len__(self):
+        return self.count
+
+    def _key_at(self, i: int) -> Tuple[bytes, int]:
+        (offset,) = _OFFSET.unpack_from(self._mm, self._index_start + i * _OFFSET.size)
+        (key_len,) = _KEY_LEN.unpack_from(self._mm, offset)
+        start = offset + _KEY_LEN.size
+        return self._mm[start:start + key_len], start + key_len
+
+    def lookup(self, word: str) -> Optional[LexiconEntry]:
+        key = normalize_lemma(word).encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_key, value_pos = self._key_at(mid)
+            if mid_key < key:
+                lo = mid + 1
+            elif mid_key > key:
+                hi = mid
+            else:
+                (value_len,) = _VALUE_LEN.unpack_from(self._mm, value_pos)
+                start = value_pos + _VALUE_LEN.size
+                return _decode_value(self._mm[start:start + value_len])
+        return None
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+
+def _encode_value(word_type: str, flexion_type: Optional[str], meanings: List[str]) -> bytes:
+    return FIELD_SEP.join([
+        word_type or "",
+        flexion_type or "",
+        MEANING_SEP.join(m for m in meanings if m),
+    ]).encode("utf-8")
+
+
+def _decode_value(raw: bytes) -> LexiconEntry:
+    word_type, flexion_type, meanings = raw.decode("utf-8").split(FIELD_SEP)
+    return word_type, flexion_type or None, meanings.split(MEANING_SEP) if meanings else []
+
+
+def write_snapshot(entries: Iterable[Tuple[str, str, Optional[str], List[str]]], path: str) -> int:
+    """
+    Write (lemma, type, flexion_type, meanings) entries as a snapshot.
+    The file is replaced atomically, so running workers can keep their old mapping.
+    """
+    records: Dict[bytes, bytes] = {}
+    for lemma, word_type, flexion_type, meanings in entries:
+        key = normalize_lemma(lemma).encode("utf-8")
+        if key:
+            records[key] = _encode_value(word_type, flexion_type, meanings)
+
+    keys = sorted(records)
+    data = bytearray()
+    offsets = []
+    data_start = _HEADER.size + len(keys) * _OFFSET.size
+    for key in keys:
+        offsets.append(data_start + len(data))
+        data += _KEY_LEN.pack(len(key)) + key
+        data += _VALUE_LEN.pack(len(records[key])) + records[key]
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(keys)))
+        for offset in offsets:
+            f.write(_OFFSET.pack(offset))
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
+def entries_from_rows(lemma: str, rows: List[Dict[str, str]]):
+    """Snapshot entry from parsed Kurzübersicht rows (lemma row only)."""
+    if not rows:
+        return None
+    first = rows[0]
+    german = (first.get("german") or "").strip()
+    return lemma, first.get("type", ""), first.get("flexion_type") or None, [german] if german else []
+
+
+def entries_from_cache():
+    """Entries from the shared lookup cache table (needs an app context)."""
+    from extensions import db
+    from models import LookupCacheEntry
+
+    query = (db.session.query(LookupCacheEntry.lemma, LookupCacheEntry.rows_json)
+             .filter(LookupCacheEntry.not_found.isnot(True))
+             .yield_per(1000))
+    for lemma, rows_json in query:
+        entry = entries_from_rows(lemma, json.loads(rows_json))
+        if entry:
+            yield entry
+
+
+def entries_from_file(path: str):
+    """
+    Entries from an import file: NDJSON objects with latin/type/flexion_type/german
+    (german may be a string or a list), or CSV with the same columns.
+    """
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.endswith((".ndjson", ".jsonl")):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for row in rows:
+            german = row.get("german") or []
+            if isinstance(german, str):
+                german = [m.strip() for m in german.split("|")] if "|" in german else [german.strip()]
+            yield row["latin"], row.get("type", ""), row.get("flexion_type") or None, german
+
+
+_lexicon: Optional[Lexicon] = None
+_lexicon_mtime: Optional[float] = None
+_lexicon_checked: Tuple[Optional[str], float] = (None, 0.0)  # (path, monotonic time) of the last stat
+_lexicon_lock = threading.Lock()
+
+
+def _current(path: str) -> Optional[Lexicon]:
+    # caller holds _lexicon_lock; the file is stat()ed at most every CHECK_INTERVAL seconds
+    global _lexicon, _lexicon_mtime, _lexicon_checked
+    now = time.monotonic()
+    if _lexicon_checked[0] == path and now - _lexicon_checked[1] < CHECK_INTERVAL:
+        return _lexicon
+    _lexicon_checked = (path, now)
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        mtime = None
+    if _lexicon is None or _lexicon.path != path or _lexicon_mtime != mtime:
+        previous = _lexicon
+        _lexicon, _lexicon_mtime = None, mtime
+        if mtime is not None:
+            try:
+                _lexicon = Lexicon(path)
+            except (OSError, ValueError):
+                pass  # missing, truncated or still being copied: lookups go to the network
+        # the replaced mapping is closed now, or by the last lookup still reading it
+        if previous is not None and previous._readers == 0:
+            previous.close()
+    return _lexicon
+
+
+def get_lexicon(path: str = DEFAULT_PATH) -> Optional[Lexicon]:
+    """
+    Process-wide snapshot, mapped lazily on first use and remapped when the file is replaced.
+    A replaced snapshot is closed, so concurrent code looks words up through lookup().
+    """
+    with _lexicon_lock:
+        return _current(path)
+
+
+def lookup(word: str) -> Optional[List[Dict[str, str]]]:
+    """Kurzübersicht-shaped rows (lemma row only) for a word in the snapshot, or None on a miss."""
+    with _lexicon_lock:
+        lexicon = _current(DEFAULT_PATH)
+        if lexicon is None:
+            return None
+        lexicon._readers += 1
+    try:
+        entry = lexicon.lookup(word)
+    except (ValueError, struct.error):
+        entry = None  # damaged record: a miss, not an error
+    finally:
+        with _lexicon_lock:
+            lexicon._readers -= 1
+            if lexicon is not _lexicon and lexicon._readers == 0:
+                lexicon.close()
+    if entry is None:
+        return None
+    word_type, flexion_type, meanings = entry
+    return [{
+        "latin": word.strip(),
+        "type": word_type,
+        "flexion_type": flexion_type,
+        "german": " ".join(meanings),
+    }]
+
+
+@click.command("build-lexicon")
+@click.option("--input", "input_path", default=None, help="NDJSON/CSV import file instead of the lookup cache.")
+@click.option("--output", "output_path", default=DEFAULT_PATH, show_default=True)
+@with_appcontext
+def build_lexicon_command(input_path, output_path):
+    """Build the offline lexicon snapshot from cached lookups or an import file."""
+    entries = entries_from_file(input_path) if input_path else entries_from_cache()
+    count = write_snapshot(entries, output_path)
+    click.echo(f"✅ Lexicon snapshot with {count} lemmas written to {output_path}")
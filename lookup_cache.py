@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional
+
+from flask import has_app_context
+from sqlalchemy import select, update, insert
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+
+from extensions import db
+from models import LookupCacheEntry
+
+"""
+Two-tier cache for parsed FragCaesar Kurzübersicht rows:
+a bounded in-process LRU in front of the lookup_cache_entry table,
+which is shared by all gunicorn workers. An expired in-process entry is
+checked against the table before it counts as a miss, since another
+worker may have refreshed the lemma. Callers get copies of the rows.
+"""
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = int(os.getenv("FRAGCAESAR_CACHE_TTL", 30 * 24 * 3600))       # seconds
+NEGATIVE_TTL = int(os.getenv("FRAGCAESAR_NEGATIVE_TTL", 24 * 3600))      # seconds, for 404s
+MEMORY_SIZE = int(os.getenv("FRAGCAESAR_CACHE_SIZE", 2048))              # lemmas per process
+
+# lemma -> (rows, not_found, fetched_at as unix time)
+_memory: "OrderedDict[str, tuple]" = OrderedDict()
+_lock = threading.Lock()
+_counters = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stale_hits": 0}
+
+
+def normalize_lemma(word: str) -> str:
+    return (word or "").strip().lower()
+
+
+def _is_fresh(not_found: bool, fetched_at: float) -> bool:
+    ttl = NEGATIVE_TTL if not_found else CACHE_TTL
+    return time.time() - fetched_at < ttl
+
+
+def _count(name: str):
+    with _lock:
+        _counters[name] += 1
+
+
+def _copy(rows):
+    return [dict(row) for row in rows]
+
+
+def _remember(lemma: str, rows, not_found: bool, fetched_at: float):
+    with _lock:
+        _memory[lemma] = (rows, not_found, fetched_at)
+        _memory.move_to_end(lemma)
+        while len(_memory) > MEMORY_SIZE:
+            _memory.popitem(last=False)
+
+
+def _load_from_db(lemma: str) -> Optional[tuple]:
+    if not has_app_context():
+        return None
+    try:
+        with db.engine.connect() as conn:
+            row = conn.execute(
+                select(LookupCacheEntry.rows_json, LookupCacheEntry.not_found, LookupCacheEntry.fetched_at)
+                .where(LookupCacheEntry.lemma == lemma)
+            ).first()
+    except SQLAlchemyError as e:
+        logger.warning("Lookup cache read failed for %s: %s", lemma, e)
+        return None
+    if row is None:
+        return None
+    fetched_at = (row.fetched_at or datetime.utcnow()) - datetime(1970, 1, 1)
+    return json.loads(row.rows_json), bool(row.not_found), fetched_at.total_seconds()
+
+
+def _store_in_db(lemma: str, rows, not_found: bool, fetched_at: float):
+    if not has_app_context():
+        return
+    values = {
+        "rows_json": json.dumps(rows, ensure_ascii=False),
+        "not_found": not_found,
+        "fetched_at": datetime(1970, 1, 1) + timedelta(seconds=fetched_at),
+    }
+    # own connection + transaction, so the caller's session is never committed from here
+    try:
+        with db.engine.begin() as conn:
+            result = conn.execute(
+                update(LookupCacheEntry).where(LookupCacheEntry.lemma == lemma).values(**values)
+            )
+            if result.rowcount == 0:
+                conn.execute(insert(LookupCacheEntry).values(lemma=lemma, **values))
+    except IntegrityError:
+        pass  # another worker stored the same lemma concurrently
+    except SQLAlchemyError as e:
+        logger.warning("Lookup cache write failed for %s: %s", lemma, e)
+
+
+def get(word: str, allow_stale: bool = False) -> Optional[tuple]:
+    """
+    Return (rows, not_found) for a cached lemma, or None on a miss.
+    With allow_stale=True expired entries are returned instead of forcing a refetch.
+    """
+    lemma = normalize_lemma(word)
+
+    with _lock:
+        cached = _memory.get(lemma)
+        if cached is not None:
+            _memory.move_to_end(lemma)
+
+    source = "memory_hits"
+    if cached is None or not _is_fresh(cached[1], cached[2]):
+        stored = _load_from_db(lemma)
+        if stored is not None and (cached is None or stored[2] > cached[2]):
+            _remember(lemma, *stored)
+            cached, source = stored, "db_hits"
+    if cached is None:
+        _count("misses")
+        return None
+
+    rows, not_found, fetched_at = cached
+    if _is_fresh(not_found, fetched_at):
+        _count(source)
+        return _copy(rows), not_found
+    if allow_stale:
+        _count("stale_hits")
+        return _copy(rows), not_found
+    _count("misses")
+    return None
+
+
+def put(word: str, rows: List[Dict[str, str]], not_found: bool = False):
+    lemma = normalize_lemma(word)
+    fetched_at = time.time()
+    _remember(lemma, _copy(rows), not_found, fetched_at)
+    _store_in_db(lemma, rows, not_found, fetched_at)
+
+
+def stats() -> Dict[str, int]:
+    with _lock:
+        return dict(_counters, size=len(_memory), max_size=MEMORY_SIZE)
+
+
+def clear_memory():
+    """Drop the in-process tier only (the DB tier stays shared)."""
+    with _lock:
+        _memory.clear()
@@ -0,0 +1,278 @@
+import os
+import time
+import heapq
+import bisect
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+import lookup_cache
+from extensions import db
+
+"""
+Request-level instrumentation without extra dependencies: Flask request
+hooks time every request, SQLAlchemy engine events count and time its SQL
+statements, and frag_caesar_crawl4ai reports every Kurzübersicht lookup
+(lexicon / cache / fetch) and the latency of real fetches. Everything ends
+up in a few histograms and counters that /metrics serves in the Prometheus
+text format; each gunicorn worker keeps (and serves) its own. Fetches on
+the lookup pool's threads (get_kurzuebersicht_many) are counted globally,
+not per request.
+
+/metrics is off unless METRICS_TOKEN is set (scrapers send
+"Authorization: Bearer <token>"); METRICS_PUBLIC=1 serves it without a
+token, for local use only.
+
+Requests slower than SLOW_REQUEST_MS are logged with their N slowest SQL
+statements. The per-statement cost is two perf_counter() calls and a
+bounded heap push, so this stays on in production (METRICS_ENABLED=0 turns
+it off).
+"""
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("METRICS_ENABLED", "1") not in ("0", "false")
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", 1000))   # 0 disables the slow-request log
+SLOW_TOP_SQL = int(os.getenv("SLOW_REQUEST_TOP_SQL", 5))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")                   # bearer token required by /metrics
+METRICS_PUBLIC = os.getenv("METRICS_PUBLIC") in ("1", "true")  # serve /metrics without a token
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """Prometheus histogram with one series per label tuple."""
+
+    def __init__(self, name, help_text, labels, buckets=SECONDS_BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help_text, labels, buckets
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[i] += 1
+            series[-1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels(self.labels, labels, le=bound)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {values[-1]:.6f}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {cumulative}"
+
+
+class Counter:
+    def __init__(self, name, help_text, labels):
+        self.name, self.help, self.labels = name, help_text, labels
+        self._values = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, value=1):
+        with self._lock:
+            self._values[labels] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labels, labels)} {value}"
+
+
+def _labels(names, values, **extra):
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Wall time per request.", ("endpoint", "method"))
+REQUESTS = Counter("http_requests_total", "Requests by status.", ("endpoint", "method", "status"))
+REQUEST_QUERIES = Histogram("db_queries_per_request", "SQL statements per request.", ("endpoint",),
+                            buckets=QUERY_BUCKETS)
+REQUEST_DB_SECONDS = Histogram("db_time_per_request_seconds", "SQL time per request.", ("endpoint",))
+QUERY_SECONDS = Histogram("db_query_duration_seconds", "Duration of single SQL statements.", ("context",))
+LOOKUPS = Counter("fragcaesar_lookups_total", "Kurzübersicht lookups by source.", ("source",))
+FETCH_SECONDS = Histogram("fragcaesar_fetch_duration_seconds", "frag-caesar.de fetches by outcome.",
+                          ("outcome",))
+REQUEST_FETCHES = Histogram("fragcaesar_fetches_per_request", "frag-caesar.de fetches per request.",
+                            ("endpoint",), buckets=(0, 1, 2, 5, 10, 20, 50))
+METRICS = (REQUEST_SECONDS, REQUESTS, REQUEST_QUERIES, REQUEST_DB_SECONDS, QUERY_SECONDS, LOOKUPS,
+           FETCH_SECONDS, REQUEST_FETCHES)
+
+
+class _RequestStats:
+    __slots__ = ("start", "queries", "db_seconds", "fetches", "fetch_seconds", "slowest", "recorded")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.fetches = 0
+        self.fetch_seconds = 0.0
+        self.slowest = []  # min-heap of (seconds, statement), at most SLOW_TOP_SQL
+        self.recorded = False
+
+
+def _current():
+    return g.get("_metrics") if has_request_context() else None
+
+
+# --- hooks -----------------------------------------------------------------------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_metrics_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("_metrics_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats = _current()
+    QUERY_SECONDS.observe(elapsed, "request" if stats is not None else "background")
+    if stats is None:
+        return
+    stats.queries += 1
+    stats.db_seconds += elapsed
+    if SLOW_TOP_SQL:
+        entry = (elapsed, statement)
+        if len(stats.slowest) < SLOW_TOP_SQL:
+            heapq.heappush(stats.slowest, entry)
+        elif elapsed > stats.slowest[0][0]:
+            heapq.heapreplace(stats.slowest, entry)
+
+
+def _handle_error(exception_context):
+    # a failing statement never reaches after_cursor_execute: drop its start time, or every
+    # later statement on this pooled connection would be timed against the wrong start
+    conn = exception_context.connection
+    starts = conn.info.get("_metrics_start") if conn is not None else None
+    if starts:
+        starts.pop()
+
+
+def _before_request():
+    g._metrics = _RequestStats()
+
+
+def _endpoint():
+    return request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+
+
+def _record(status):
+    stats = _current()
+    if stats is None or stats.recorded:
+        return
+    stats.recorded = True
+    elapsed = time.perf_counter() - stats.start
+    endpoint, method = _endpoint(), request.method
+    REQUEST_SECONDS.observe(elapsed, endpoint, method)
+    REQUESTS.inc(endpoint, method, str(status))
+    REQUEST_QUERIES.observe(stats.queries, endpoint)
+    REQUEST_DB_SECONDS.observe(stats.db_seconds, endpoint)
+    REQUEST_FETCHES.observe(stats.fetches, endpoint)
+
+    if SLOW_REQUEST_MS and elapsed * 1000 >= SLOW_REQUEST_MS:
+        top = "".join(f"\n    {s * 1000:8.1f} ms  {' '.join(sql.split())[:300]}"
+                      for s, sql in sorted(stats.slowest, reverse=True))
+        logger.warning("Slow request %s %s -> %s: %.0f ms, %d queries (%.0f ms), %d fetches (%.0f ms)%s",
+                       method, request.full_path.rstrip("?"), status, elapsed * 1000, stats.queries,
+                       stats.db_seconds * 1000, stats.fetches, stats.fetch_seconds * 1000, top)
+
+
+def _after_request(response):
+    # streamed bodies are timed until the first byte only
+    _record(response.status_code)
+    return response
+
+
+def _teardown_request(exc):
+    if exc is not None:
+        _record(500)
+
+
+# --- outbound lookups (called by frag_caesar_crawl4ai) ---------------------------------
+
+def lookup(source):
+    """A Kurzübersicht lookup answered by "lexicon", "cache" or "fetch"."""
+    if ENABLED:
+        LOOKUPS.inc(source)
+
+
+@contextmanager
+def fetch_timer():
+    """with metrics.fetch_timer(): ...  around one frag-caesar.de request."""
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except Exception as e:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+        outcome = str(status) if status else type(e).__name__
+        raise
+    finally:
+        if ENABLED:
+            elapsed = time.perf_counter() - start
+            FETCH_SECONDS.observe(elapsed, outcome)
+            stats = _current()
+            if stats is not None:
+                stats.fetches += 1
+                stats.fetch_seconds += elapsed
+
+
+# --- /metrics --------------------------------------------------------------------
+
+def render() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    lines.append("# HELP lookup_cache_events_total Lookup cache events of this worker.")
+    lines.append("# TYPE lookup_cache_events_total counter")
+    cache = lookup_cache.stats()
+    for kind in ("memory_hits", "db_hits", "stale_hits", "misses"):
+        lines.append(f'lookup_cache_events_total{{kind="{kind}"}} {cache.get(kind, 0)}')
+    lines.append("# HELP lookup_cache_size Lemmas in the in-process lookup cache.")
+    lines.append("# TYPE lookup_cache_size gauge")
+    lines.append(f"lookup_cache_size {cache.get('size', 0)}")
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view():
+    if not METRICS_PUBLIC and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        return Response("unauthorized\n", status=401, mimetype="text/plain")
+    return Response(render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+
+def init_app(app):
+    """Register the request hooks and engine events; serve /metrics if METRICS_TOKEN or METRICS_PUBLIC is set."""
+    if not ENABLED:
+        return
+    with app.app_context():
+        engines = list(db.engines.values())  # primary + read replica
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    if METRICS_TOKEN or METRICS_PUBLIC:
+        app.add_url_rule("/metrics", "metrics", metrics_view)
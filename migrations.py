@@ -0,0 +1,224 @@
+from datetime import datetime
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import inspect, text
+
+import search
+from extensions import db
+
+"""
+Versioned schema migrations for SQLite and Neon Postgres.
+
+schema_version holds one row per applied migration. upgrade() runs every
+migration above the stored version in order, each in its own transaction
+(on Postgres behind an advisory lock, so several workers booting at once
+apply it only once). Migrations only add things (tables, columns, indexes,
+backfills) and are written to be idempotent, because the baseline
+create_all() already creates the latest model definitions on a fresh
+database. A new migration goes at the end of MIGRATIONS, never in between.
+"""
+
+ADVISORY_LOCK_ID = 7301  # arbitrary, unique to this app
+
+
+def _columns(conn, table):
+    return {c["name"] for c in inspect(conn).get_columns(table)}
+
+
+def add_column_if_missing(conn, table, column, ddl):
+    """ALTER TABLE ... ADD COLUMN for databases created before the column existed."""
+    if column not in _columns(conn, table):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def create_index(conn, name, table, columns, unique=False):
+    conn.execute(text(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+
+
+def _random_expr(conn):
+    return "(abs(random()) % 1000000) / 1000000.0" if conn.dialect.name == "sqlite" else "random()"
+
+
+# --- migrations --------------------------------------------------------------
+
+def m001_baseline(conn):
+    """All tables of models.py (no-op for tables that already exist)."""
+    db.metadata.create_all(bind=conn, checkfirst=True)
+
+
+def m002_sample_keys(conn):
+    """vocab_entry.sample_key for indexed question sampling, backfilled with random keys."""
+    add_column_if_missing(conn, "vocab_entry", "sample_key", "FLOAT")
+    create_index(conn, "ix_vocab_entry_user_sample_key", "vocab_entry", ["user_id", "sample_key"])
+    conn.execute(text(f"UPDATE vocab_entry SET sample_key = {_random_expr(conn)} WHERE sample_key IS NULL"))
+
+
+def m003_review_schedules(conn):
+    """A review_schedule row (due now) for every entry created before scheduling existed."""
+    conn.execute(text(
+        "INSERT INTO review_schedule (vocab_entry_id, user_id, ease, interval_days, repetitions, due_at) "
+        "SELECT v.id, v.user_id, 2.5, 0.0, 0, :now FROM vocab_entry v "
+        "WHERE NOT EXISTS (SELECT 1 FROM review_schedule r WHERE r.vocab_entry_id = v.id)"
+    ), {"now": datetime.utcnow()})
+
+
+def m004_hot_path_indexes(conn):
+    """Indexes for the filters of the vocab, quiz and cards routes."""
+    create_index(conn, "ix_vocab_entry_user_latin", "vocab_entry", ["user_id", "latin_word"])
+    create_index(conn, "ix_vocab_entry_user_type", "vocab_entry", ["user_id", "word_type"])
+    create_index(conn, "ix_quiz_round_user_finished", "quiz_round", ["user_id", "finished_at"])
+    create_index(conn, "ix_quiz_answer_round", "quiz_answer", ["quiz_round_id"])
+    create_index(conn, "ix_quiz_answer_vocab", "quiz_answer", ["vocab_entry_id"])
+    create_index(conn, "ix_card_vocab_rarity", "card", ["vocab_entry_id", "rarity"])
+    create_index(conn, "ix_user_card_user_card", "user_card", ["user_id", "card_id"])
+    create_index(conn, "ix_user_card_card", "user_card", ["card_id"])
+
+
+def m005_vocab_search(conn):
+    """Full-text search index (FTS5 / tsvector), backfilled from vocab_entry."""
+    search.create_index(conn)
+    search.rebuild(conn)
+
+
+def m006_keyset_pagination(conn):
+    """(user_id, timestamp, id) indexes for the paginated lists; keyset cursors need non-NULL timestamps."""
+    epoch = datetime(1970, 1, 1)
+    conn.execute(text("UPDATE vocab_entry SET created_at = :t WHERE created_at IS NULL"), {"t": epoch})
+    conn.execute(text("UPDATE user_card SET acquired_at = :t WHERE acquired_at IS NULL"), {"t": epoch})
+    create_index(conn, "ix_vocab_entry_user_created", "vocab_entry", ["user_id", "created_at", "id"])
+    create_index(conn, "ix_user_card_user_acquired", "user_card", ["user_id", "acquired_at", "id"])
+
+
+def m007_user_data_version(conn):
+    """Per-user data version counter for conditional GETs (see response_cache.py)."""
+    from models import UserDataVersion
+    db.metadata.create_all(bind=conn, tables=[UserDataVersion.__table__], checkfirst=True)
+
+
+def m008_round_state(conn):
+    """Token-addressed deck + progress of the sorting rounds (see round_state.py)."""
+    from models import RoundState
+    db.metadata.create_all(bind=conn, tables=[RoundState.__table__], checkfirst=True)
+
+
+def m009_stats_rollups(conn):
+    """Learning statistics rollups (see stats.py), backfilled by m010."""
+    from models import RoundSummary, UserDailyStats, VocabDailyStats
+    tables = [UserDailyStats.__table__, VocabDailyStats.__table__, RoundSummary.__table__]
+    db.metadata.create_all(bind=conn, tables=tables, checkfirst=True)
+
+
+def m010_answer_archive(conn):
+    """quiz_round.archived_at and the aggregate table of compacted answers (see archive.py); (re)builds the rollups."""
+    import stats
+    from models import ArchivedAnswerStats
+    add_column_if_missing(conn, "quiz_round", "archived_at", "TIMESTAMP")
+    create_index(conn, "ix_quiz_round_archived", "quiz_round", ["archived_at", "id"])
+    db.metadata.create_all(bind=conn, tables=[ArchivedAnswerStats.__table__], checkfirst=True)
+    stats.rebuild(conn)  # needs both tables, so the m009 backfill runs here
+
+
+def m011_search_without_owner(conn):
+    """Postgres: search documents without the owner token (search filters on user_id), reindexed."""
+    if conn.dialect.name == "postgresql":
+        search.create_index(conn)
+        search.rebuild(conn)
+
+
+MIGRATIONS = [
+    (1, "baseline", m001_baseline),
+    (2, "sample_keys", m002_sample_keys),
+    (3, "review_schedules", m003_review_schedules),
+    (4, "hot_path_indexes", m004_hot_path_indexes),
+    (5, "vocab_search", m005_vocab_search),
+    (6, "keyset_pagination", m006_keyset_pagination),
+    (7, "user_data_version", m007_user_data_version),
+    (8, "round_state", m008_round_state),
+    (9, "stats_rollups", m009_stats_rollups),
+    (10, "answer_archive", m010_answer_archive),
+    (11, "search_without_owner", m011_search_without_owner),
+]
+
+
+# --- runner ------------------------------------------------------------------
+
+def _ensure_version_table(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, applied_at TIMESTAMP NOT NULL)"))
+
+
+def current_version(conn=None) -> int:
+    def read(c):
+        _ensure_version_table(c)
+        return c.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version")).scalar()
+
+    if conn is not None:
+        return read(conn)
+    with db.engine.begin() as conn:
+        return read(conn)
+
+
+def pending():
+    version = current_version()
+    return [m for m in MIGRATIONS if m[0] > version]
+
+
+def upgrade(target=None) -> list:
+    """Apply all pending migrations (up to `target`); returns the applied versions."""
+    applied = []
+    for version, name, fn in MIGRATIONS:
+        if target is not None and version > target:
+            break
+        with db.engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+            if current_version(conn) >= version:
+                continue  # already applied (possibly by another worker meanwhile)
+            fn(conn)
+            conn.execute(text("INSERT INTO schema_version (version, name, applied_at) VALUES (:v, :n, :t)"),
+                         {"v": version, "n": name, "t": datetime.utcnow()})
+            applied.append(version)
+    return applied
+
+
+def bootstrap() -> list:
+    """Migrations + demo user; run once per deploy (`flask init-db`), not in every worker."""
+    from models import User
+    applied = upgrade()
+    # ✅ Merge statt add() - updated existierenden User oder insert mit Defaults
+    db.session.merge(User(id=1, username="demo", password_hash="demo_hash"))
+    db.session.commit()
+    return applied
+
+
+@click.command("init-db")
+@with_appcontext
+def init_db_command():
+    """Apply pending migrations and create the demo user (before the workers start)."""
+    applied = bootstrap()
+    click.echo(f"✅ Schema version {current_version()}"
+               f"{' (applied ' + ', '.join(map(str, applied)) + ')' if applied else ''}, demo user 1 merged")
+
+
+@click.command("db-upgrade")
+@click.option("--target", type=int, default=None, help="Stop after this migration version.")
+@with_appcontext
+def upgrade_command(target):
+    """Apply pending schema migrations."""
+    applied = upgrade(target)
+    if applied:
+        click.echo(f"✅ Applied migrations {', '.join(map(str, applied))}, schema version {current_version()}")
+    else:
+        click.echo(f"✅ Schema up to date (version {current_version()})")
+
+
+@click.command("db-status")
+@with_appcontext
+def status_command():
+    """Show the schema version and pending migrations."""
+    click.echo(f"Schema version: {current_version()}")
+    for version, name, _ in pending():
+        click.echo(f"  pending: {version:03d} {name}")
@@ -1,3 +1,4 @@
+import random
 from datetime import datetime
 from extensions import db
 
@@ -24,12 +25,26 @@ class VocabEntry(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     word_type = db.Column(db.String(20), default="unknown")  # "Noun", "Verb"
     flexion_type = db.Column(db.String(50), default=None, nullable=True)
+    sample_key = db.Column(db.Float, default=random.random)  # uniform random key, see sampling.py
+
+    __table_args__ = (
+        db.Index("ix_vocab_entry_user_sample_key", "user_id", "sample_key"),
+        db.Index("ix_vocab_entry_user_latin", "user_id", "latin_word"),
+        db.Index("ix_vocab_entry_user_type", "user_id", "word_type"),
+        db.Index("ix_vocab_entry_user_created", "user_id", "created_at", "id"),
+    )
 
 class QuizRound(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     started_at = db.Column(db.DateTime, default=datetime.utcnow)
     finished_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime)  # raw answers compacted into archived_answer_stats (see archive.py)
+
+    __table_args__ = (
+        db.Index("ix_quiz_round_user_finished", "user_id", "finished_at"),
+        db.Index("ix_quiz_round_archived", "archived_at", "id"),
+    )
 
 class QuizAnswer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -38,6 +53,11 @@ class QuizAnswer(db.Model):
     was_correct = db.Column(db.Boolean, default=False)
     answered_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index("ix_quiz_answer_round", "quiz_round_id"),
+        db.Index("ix_quiz_answer_vocab", "vocab_entry_id"),
+    )
+
 class Card(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     vocab_entry_id = db.Column(db.Integer, db.ForeignKey("vocab_entry.id"), nullable=False)
@@ -46,8 +66,125 @@ class Card(db.Model):
     description = db.Column(db.Text)
     image_url = db.Column(db.String(255))
 
+    __table_args__ = (
+        db.Index("ix_card_vocab_rarity", "vocab_entry_id", "rarity"),
+    )
+
 class UserCard(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     card_id = db.Column(db.Integer, db.ForeignKey("card.id"), nullable=False)
     acquired_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index("ix_user_card_user_card", "user_id", "card_id"),
+        db.Index("ix_user_card_card", "card_id"),
+        db.Index("ix_user_card_user_acquired", "user_id", "acquired_at", "id"),
+    )
+
+class LookupCacheEntry(db.Model):
+    # parsed Kurzübersicht rows from frag-caesar.de, shared by all workers
+    lemma = db.Column(db.String(120), primary_key=True)  # normalized, see lookup_cache.normalize_lemma
+    rows_json = db.Column(db.Text, nullable=False, default="[]")
+    not_found = db.Column(db.Boolean, default=False)  # negative cache entry (404)
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ClassificationJob(db.Model):
+    # background FragCaesar classification of a VocabEntry (see classifier.py)
+    id = db.Column(db.Integer, primary_key=True)
+    vocab_entry_id = db.Column(db.Integer, db.ForeignKey("vocab_entry.id"), nullable=False, unique=True)
+    status = db.Column(db.String(20), default="pending", index=True)  # pending, running, done, failed
+    attempts = db.Column(db.Integer, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class RoundAsked(db.Model):
+    # VocabEntry ids already drawn in one quiz round (see sampling.py)
+    quiz_round_id = db.Column(db.Integer, db.ForeignKey("quiz_round.id"), primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # "mc", "Verb", "Nomen"
+    asked = db.Column(db.Text, nullable=False, default="")  # comma-separated, in draw order
+    draws = db.Column(db.Integer, nullable=False, default=0)  # optimistic concurrency check
+
+class QuizQuestion(db.Model):
+    # pre-generated multiple choice question of a round, read by (round, position)
+    quiz_round_id = db.Column(db.Integer, db.ForeignKey("quiz_round.id"), primary_key=True)
+    position = db.Column(db.Integer, primary_key=True)
+    vocab_entry_id = db.Column(db.Integer, db.ForeignKey("vocab_entry.id"), nullable=False)
+    latin_word = db.Column(db.String(120), nullable=False)
+    options = db.Column(db.Text, nullable=False)  # JSON list of 4 strings
+    correct_index = db.Column(db.Integer, nullable=False)
+
+class ReviewSchedule(db.Model):
+    # spaced-repetition state of one VocabEntry (see scheduler.py)
+    vocab_entry_id = db.Column(db.Integer, db.ForeignKey("vocab_entry.id"), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    ease = db.Column(db.Float, nullable=False, default=2.5)
+    interval_days = db.Column(db.Float, nullable=False, default=0.0)
+    repetitions = db.Column(db.Integer, nullable=False, default=0)
+    due_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index("ix_review_schedule_user_due", "user_id", "due_at"),
+    )
+
+class UserDataVersion(db.Model):
+    # bumped by every write that changes a user's vocab list or cards (see response_cache.py)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class RoundState(db.Model):
+    # deck + progress of one sorting quiz round, addressed by its token (see round_state.py)
+    token = db.Column(db.String(32), primary_key=True)
+    quiz_round_id = db.Column(db.Integer, db.ForeignKey("quiz_round.id"), nullable=False, unique=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)  # word type of the deck: "Verb", "Nomen"
+    deck = db.Column(db.LargeBinary, nullable=False)  # packed uint32 VocabEntry ids, in play order
+    size = db.Column(db.Integer, nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)  # deck[:position] were asked
+    answered = db.Column(db.LargeBinary, nullable=False)  # bitset over deck positions
+    version = db.Column(db.Integer, nullable=False, default=0)  # optimistic concurrency check
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# --- learning statistics rollups, updated with every answer (see stats.py) ---
+
+class UserDailyStats(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    word_type = db.Column(db.String(50), primary_key=True)
+    answers = db.Column(db.Integer, nullable=False, default=0)
+    correct = db.Column(db.Integer, nullable=False, default=0)
+
+class VocabDailyStats(db.Model):
+    vocab_entry_id = db.Column(db.Integer, primary_key=True)  # no FK: outlives deleted vocab
+    day = db.Column(db.Date, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    answers = db.Column(db.Integer, nullable=False, default=0)
+    correct = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index("ix_vocab_daily_stats_user_day", "user_id", "day"),
+    )
+
+class RoundSummary(db.Model):
+    quiz_round_id = db.Column(db.Integer, db.ForeignKey("quiz_round.id"), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    answers = db.Column(db.Integer, nullable=False, default=0)
+    correct = db.Column(db.Integer, nullable=False, default=0)
+    first_answer_at = db.Column(db.DateTime, nullable=False)
+    last_answer_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_round_summary_user_last", "user_id", "last_answer_at"),
+    )
+
+class ArchivedAnswerStats(db.Model):
+    # per vocab x day totals of quiz_answer rows removed by archive.py
+    vocab_entry_id = db.Column(db.Integer, primary_key=True)  # no FK: outlives deleted vocab
+    day = db.Column(db.Date, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    word_type = db.Column(db.String(50), nullable=False)
+    answers = db.Column(db.Integer, nullable=False, default=0)
+    correct = db.Column(db.Integer, nullable=False, default=0)
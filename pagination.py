@@ -0,0 +1,87 @@
+import json
+import base64
+from datetime import datetime
+
+from flask import Response, stream_with_context
+from sqlalchemy import tuple_
+
+"""
+Keyset pagination for the list endpoints: pages are ordered newest first by
+(timestamp, id) and the cursor is the last row's (timestamp, id), so every
+page is an index range read no matter how deep the client pages (no OFFSET).
+
+    GET /api/vocab/?limit=100                 -> {"items": [...], "next_cursor": "..."}
+    GET /api/vocab/?limit=100&cursor=...      -> next page, next_cursor null at the end
+    GET /api/vocab/?stream=1                  -> the whole list as a streamed JSON array
+"""
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+STREAM_BATCH = 500  # rows fetched per round trip in streaming mode
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(ts: datetime, row_id: int) -> str:
+    raw = f"{ts.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"invalid cursor: {cursor!r}") from e
+
+
+def parse_limit(args, default=DEFAULT_LIMIT) -> int:
+    try:
+        limit = int(args.get("limit", default))
+    except ValueError:
+        limit = default
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def wants_page(args) -> bool:
+    return "limit" in args or "cursor" in args
+
+
+def after(ts_col, id_col, cursor):
+    """WHERE clause for the rows after `cursor` in (ts DESC, id DESC) order (a row-value range)."""
+    ts, row_id = decode_cursor(cursor)
+    return tuple_(ts_col, id_col) < tuple_(ts, row_id)
+
+
+def page_query(query, ts_col, id_col, cursor, limit):
+    """`query` narrowed to the page after `cursor` (None: the first), one row more than `limit`."""
+    if cursor:
+        query = query.filter(after(ts_col, id_col, cursor))
+    return query.order_by(ts_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def page(query, ts_col, id_col, args, key):
+    """
+    One page of `query` (already filtered by user) ordered by (ts, id) desc.
+    `key(row)` returns the row's (ts, id). Returns (rows, next_cursor).
+    """
+    limit = parse_limit(args)
+    rows = page_query(query, ts_col, id_col, args.get("cursor"), limit).all()
+    next_cursor = encode_cursor(*key(rows[limit - 1])) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def stream_json_array(rows, to_json):
+    """Stream rows (an iterator, e.g. with yield_per) as one JSON array."""
+    def generate():
+        yield "["
+        first = True
+        for row in rows:
+            yield ("" if first else ",") + json.dumps(to_json(row), ensure_ascii=False)
+            first = False
+        yield "]"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
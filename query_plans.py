@@ -0,0 +1,136 @@
+import re
+import sys
+import json
+from datetime import datetime
+
+import click
+from flask.cli import with_appcontext
+
+import archive
+import classifier
+import pagination
+import round_state
+import sampling
+import scheduler
+import scoring
+from extensions import db
+from models import UserCard, VocabEntry
+from routes import cards, quiz, stats, vocab
+
+"""
+Query-plan regression checks: every hot query of the routes runs through
+EXPLAIN QUERY PLAN (SQLite) or EXPLAIN (FORMAT JSON) (Postgres), and a plan
+that reads a whole table fails the check. On Postgres sequential scans are
+disabled for the check, so a "Seq Scan" means no usable index exists (the
+planner would otherwise pick one for small tables anyway).
+
+    flask check-query-plans          # exit code 1 on a full scan
+    python -m pytest tests/          # same check on a seeded fresh and an upgraded old database
+
+The statements come from the same query helpers the routes call, so the
+check follows every change to a route query. Queries that search text
+(LIKE '%x%') cannot use a b-tree index and are not listed here, nor are
+primary key lookups.
+"""
+
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?! USING (COVERING )?INDEX)")
+
+
+def _statement(query):
+    return getattr(query, "statement", query)  # ORM Query -> Select
+
+
+def hot_queries(user_id=1, round_id=1, entry_id=1, now=None):
+    """(name, statement) of the queries the routes run per request."""
+    now = now or datetime.utcnow()
+    since = now.date()
+    cursor = pagination.encode_cursor(now, 100)
+    exclude = [entry_id, entry_id + 1]
+    queries = [
+        ("vocab.list", vocab.vocab_query(user_id).order_by(*vocab.NEWEST_FIRST)),
+        ("vocab.list_by_type", vocab.vocab_query(user_id, "Verb").order_by(*vocab.NEWEST_FIRST)),
+        ("vocab.page", pagination.page_query(vocab.vocab_query(user_id), VocabEntry.created_at, VocabEntry.id,
+                                             cursor, pagination.DEFAULT_LIMIT)),
+        ("vocab.add_duplicate_check", vocab.find_latin(user_id, "amare").limit(1)),
+        ("vocab.classification_job", vocab.find_job(entry_id).limit(1)),
+        ("cards.list", cards.cards_query(user_id).order_by(*cards.NEWEST_FIRST)),
+        ("cards.page", pagination.page_query(cards.cards_query(user_id), UserCard.acquired_at, UserCard.id,
+                                             cursor, pagination.DEFAULT_LIMIT)),
+        ("classifier.due_jobs", classifier.due_jobs_query(now, classifier.MAX_WORKERS * 4)),
+        ("quiz.sample_draw", sampling.candidates(sampling.mc_criteria(user_id), exclude, at=0.5).limit(1)),
+        ("quiz.sample_wrap", sampling.candidates(sampling.mc_criteria(user_id), exclude).limit(1)),
+        ("quiz.due_draw", sampling.candidates([], exclude, due_user_id=user_id).limit(1)),
+        ("quiz.due_without_round", scheduler.due_query(user_id, now=now).limit(1)),
+        ("quiz.batch_entries", quiz.translations_query(user_id, [1, 2, 3])),
+        ("quiz.bronze_card", scoring.bronze_card_query(user_id, entry_id).limit(1)),
+        ("quiz.card_other_owners", scoring.other_owners_query(1, user_id)),
+        ("sorting.deck", round_state.deck_query(user_id, "Verb")),
+        ("sorting.due_first", round_state.due_deck_query(user_id, "Verb")),
+        ("stats.daily", stats.daily_query(user_id, since)),
+        ("stats.weakest", stats.weakest_query(user_id, since, 3, 10)),
+        ("stats.rounds", stats.rounds_query(user_id, 20)),
+        ("archive.eligible_rounds", archive.eligible_rounds_query(now, archive.ROUNDS_PER_BATCH)),
+    ]
+    return [(name, _statement(query)) for name, query in queries]
+
+
+def explain(conn, stmt):
+    """Plan lines (SQLite) or plan nodes (Postgres) of one statement."""
+    compiled = stmt.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+    params = (tuple(compiled.params[k] for k in compiled.positiontup)
+              if compiled.positional else compiled.params)
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + compiled.string, params).all()
+        return [row[-1] for row in rows]
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + compiled.string, params).scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    nodes, stack = [], [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        nodes.append(f"{node['Node Type']} {node.get('Relation Name', '')}".strip())
+        stack.extend(node.get("Plans", []))
+    return nodes
+
+
+def full_scans(plan_lines, dialect):
+    """Tables read completely according to a plan."""
+    if dialect == "sqlite":
+        return [m.group(1) for m in map(_SQLITE_SCAN.match, plan_lines) if m]
+    return [line.split(" ", 2)[-1] for line in plan_lines if line.startswith("Seq Scan")]
+
+
+def check(queries=None) -> list:
+    """(name, scanned tables, plan) for every query whose plan contains a full scan."""
+    failures = []
+    with db.engine.connect() as conn:
+        dialect = conn.dialect.name
+        if dialect == "postgresql":
+            conn.exec_driver_sql("SET enable_seqscan = off")
+        for name, stmt in queries or hot_queries():
+            plan = explain(conn, stmt)
+            scans = full_scans(plan, dialect)
+            if scans:
+                failures.append((name, scans, plan))
+        conn.rollback()
+    return failures
+
+
+@click.command("check-query-plans")
+@click.option("--verbose", is_flag=True, help="Print every plan, not only the failing ones.")
+@with_appcontext
+def check_query_plans_command(verbose):
+    """Fail if a hot query regressed to a full table scan."""
+    if verbose:
+        with db.engine.connect() as conn:
+            for name, stmt in hot_queries():
+                click.echo(f"{name}:")
+                for line in explain(conn, stmt):
+                    click.echo(f"    {line}")
+    failures = check()
+    for name, scans, plan in failures:
+        click.echo(f"❌ {name}: full scan of {', '.join(scans)}")
+        for line in plan:
+            click.echo(f"    {line}")
+    if failures:
+        sys.exit(1)
+    click.echo(f"✅ {len(hot_queries())} query plans use indexes")
@@ -0,0 +1,131 @@
+import os
+import zlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from functools import wraps
+
+from flask import Response, request
+from sqlalchemy import DateTime, bindparam, select, text
+
+from extensions import db
+from models import UserDataVersion
+
+"""
+Conditional GET for the per-user list endpoints.
+
+user_data_version holds one counter per user that every write to the
+user's vocab or cards bumps in the same transaction (bump()). A cached
+list response carries the counter in its ETag, so a client revalidating
+an unchanged list gets 304 after a single primary-key read, and repeat
+reads from other clients are served from a small in-process cache of
+serialized bodies. The counter lives in the database, so a write in one
+gunicorn worker invalidates the cached bodies of all others.
+
+Views whose window moves with the clock (the "last N days" statistics) use
+conditional(..., per_day=True): the current UTC date joins the ETag and the
+cache key, so a new day invalidates them even without a write, and they
+skip the If-Modified-Since fallback (updated_at knows nothing of dates).
+"""
+
+CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 256))  # bodies per process
+
+# (user_id, full path, UTC date or None) -> (version, body, mimetype)
+_bodies: "OrderedDict[tuple, tuple]" = OrderedDict()
+_lock = threading.Lock()
+
+
+# Last-Modified has whole seconds: updated_at is stored truncated and every bump moves it
+# at least one second past the previous value, so If-Modified-Since never hides a write
+_NEXT_SECOND = {
+    "sqlite": "strftime('%Y-%m-%d %H:%M:%S.000000', user_data_version.updated_at, '+1 second')",
+    "postgresql": "date_trunc('second', user_data_version.updated_at) + interval '1 second'",
+}
+
+
+def bump(user_id):
+    """Mark the user's lists as changed (caller commits)."""
+    next_second = _NEXT_SECOND[db.session.get_bind().dialect.name]
+    db.session.execute(text(
+        "INSERT INTO user_data_version (user_id, version, updated_at) VALUES (:u, 1, :now) "
+        "ON CONFLICT (user_id) DO UPDATE SET version = user_data_version.version + 1, "
+        f"updated_at = CASE WHEN user_data_version.updated_at < :now THEN :now ELSE {next_second} END"
+    ).bindparams(bindparam("now", type_=DateTime)), {"u": user_id, "now": datetime.utcnow().replace(microsecond=0)})
+
+
+def current(user_id):
+    """(version, updated_at) of the user's data; (0, None) before the first write."""
+    row = db.session.execute(
+        select(UserDataVersion.version, UserDataVersion.updated_at).where(UserDataVersion.user_id == user_id)
+    ).first()
+    return (row.version, row.updated_at) if row else (0, None)
+
+
+def _etag(user_id, version, path, day=None):
+    day = f"-d{day:%Y%m%d}" if day else ""
+    return f"u{user_id}-v{version}{day}-{zlib.crc32(path.encode()):08x}"
+
+
+def _cached(key, version):
+    with _lock:
+        hit = _bodies.get(key)
+        if hit is None or hit[0] != version:
+            return None
+        _bodies.move_to_end(key)
+        return hit
+
+
+def _store(key, version, body, mimetype):
+    with _lock:
+        _bodies[key] = (version, body, mimetype)
+        _bodies.move_to_end(key)
+        while len(_bodies) > CACHE_SIZE:
+            _bodies.popitem(last=False)
+
+
+def clear():
+    with _lock:
+        _bodies.clear()
+
+
+def conditional(get_user_id, per_day=False):
+    """Decorator for GET views whose body depends only on the user's data and the URL (and the UTC date)."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            user_id = get_user_id()
+            version, updated_at = current(user_id)
+            db.session.rollback()  # don't hold the read transaction while serving from cache
+            path = request.full_path
+            day = datetime.utcnow().date() if per_day else None
+            etag = _etag(user_id, version, path, day)
+
+            def finish(response):
+                response.set_etag(etag)
+                if updated_at is not None:
+                    response.last_modified = updated_at
+                response.cache_control.no_cache = True  # always revalidate
+                response.cache_control.private = True
+                return response
+
+            not_modified = Response(status=304)
+            if request.if_none_match:  # the ETag wins, If-Modified-Since is only the fallback
+                if request.if_none_match.contains(etag):
+                    return finish(not_modified)
+            elif request.if_modified_since and updated_at is not None and day is None \
+                    and updated_at.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None):
+                return finish(not_modified)
+
+            key = (user_id, path, day)
+            hit = _cached(key, version)
+            if hit is not None:
+                return finish(Response(hit[1], mimetype=hit[2]))
+
+            response = view(*args, **kwargs)
+            if not isinstance(response, Response) or response.status_code != 200:
+                return response
+            if not response.is_streamed:
+                _store(key, version, response.get_data(), response.mimetype)
+            return finish(response)
+        return wrapper
+    return decorator
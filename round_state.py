@@ -0,0 +1,226 @@
+import random
+import secrets
+import struct
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import Row, select, update, func
+
+import scheduler
+import sampling
+from extensions import db
+from models import QuizRound, RoundState, VocabEntry
+
+"""
+Round state of the sorting quizzes. /start shuffles the eligible entries
+once into a deck (packed uint32 ids, due reviews first on request) and
+stores it with a cursor and an answered bitset in round_state, addressed
+by a random token the client sends back. A step never rescans history:
+
+- next: the cursor moves from position to position + k with a conditional
+  UPDATE ... RETURNING the claimed ids (substr on the packed deck), so two
+  tabs playing the same round never get the same entry and separate
+  rounds never interfere;
+- answer: the client names the deck positions it was served; the entries
+  are read by primary key and the positions' bits are set with an
+  optimistic version check, so an answer counts once even if both tabs
+  send it.
+"""
+
+ID_SIZE = 4
+MAX_RETRIES = 5
+
+
+class RoundNotFound(LookupError):
+    pass
+
+
+class RoundComplete(Exception):
+    pass
+
+
+class InvalidAnswer(ValueError):
+    pass
+
+
+class RoundBusy(Exception):
+    """Too many concurrent requests on the same round; the client may retry."""
+
+
+def _pack(ids):
+    return struct.pack(f">{len(ids)}I", *ids)
+
+
+def _id_at(deck: bytes, position: int) -> int:
+    return struct.unpack_from(">I", deck, position * ID_SIZE)[0]
+
+
+def deck_query(user_id, word_type):
+    """Ids of the user's classified entries of `word_type`."""
+    return select(VocabEntry.id).where(*sampling.sorting_criteria(user_id, word_type))
+
+
+def due_deck_query(user_id, word_type):
+    """Ids of the deck entries due for review, earliest first."""
+    return scheduler.due_query(user_id, sampling.sorting_criteria(user_id, word_type)).with_entities(VocabEntry.id)
+
+
+def start(user_id, word_type, due_first=False, size=None) -> RoundState:
+    """New QuizRound + shuffled deck of the user's classified entries of `word_type` (caller commits)."""
+    ids = db.session.execute(deck_query(user_id, word_type)).scalars().all()
+    random.shuffle(ids)
+    if due_first:
+        due = due_deck_query(user_id, word_type).all()
+        due_ids = [i for (i,) in due]
+        due_set = set(due_ids)
+        ids = due_ids + [i for i in ids if i not in due_set]
+    if size:
+        ids = ids[:size]
+
+    qr = QuizRound(user_id=user_id)
+    db.session.add(qr)
+    db.session.flush()
+    state = RoundState(
+        token=secrets.token_urlsafe(16),
+        quiz_round_id=qr.id,
+        user_id=user_id,
+        kind=word_type,
+        deck=_pack(ids),
+        size=len(ids),
+        position=0,
+        answered=bytes((len(ids) + 7) // 8),
+        version=0,
+    )
+    db.session.add(state)
+    return state
+
+
+def next_entries(token, user_id, kind, k=1) -> List[Tuple[int, Row]]:
+    """
+    Up to k (deck position, entry) pairs of the round, in deck order; an entry
+    is a row of (id, latin_word, flexion_type), which the commit does not expire.
+    Raises RoundComplete at the end of the deck (and marks the round finished).
+    """
+    conflicts = 0
+    while True:
+        row = db.session.execute(
+            select(RoundState.position, RoundState.size)
+            .where(RoundState.token == token, RoundState.user_id == user_id, RoundState.kind == kind)
+        ).first()
+        if row is None:
+            raise RoundNotFound(token)
+        start, size = row
+        if start >= size:
+            _finish(token, user_id)
+            raise RoundComplete()
+
+        # claim deck[start:end] unless another tab moved the cursor meanwhile
+        end = min(start + k, size)
+        packed = db.session.execute(
+            update(RoundState)
+            .where(RoundState.token == token, RoundState.position == start)
+            .values(position=end)
+            .returning(func.substr(RoundState.deck, start * ID_SIZE + 1, (end - start) * ID_SIZE))
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        if packed is None:
+            db.session.rollback()
+            conflicts += 1
+            if conflicts >= MAX_RETRIES:
+                raise RoundBusy()
+            continue
+
+        ids = [_id_at(bytes(packed), i) for i in range(end - start)]
+        entries = {e.id: e for e in db.session.execute(
+            select(VocabEntry.id, VocabEntry.latin_word, VocabEntry.flexion_type).where(VocabEntry.id.in_(ids))
+        )}
+        db.session.commit()
+        items = [(start + i, entries[entry_id]) for i, entry_id in enumerate(ids) if entry_id in entries]
+        if items:
+            return items
+        # every claimed entry was deleted since /start: claim the next ones
+
+
+def find_token(user_id, kind, quiz_round_id=None):
+    """
+    Token of the user's round `quiz_round_id`, or without one of their newest
+    unfinished round of `kind` (old clients that only know quizroundid); None if there is none.
+    """
+    query = select(RoundState.token).where(RoundState.user_id == user_id, RoundState.kind == kind)
+    if quiz_round_id is not None:
+        query = query.where(RoundState.quiz_round_id == quiz_round_id)
+    else:
+        query = (query.join(QuizRound, QuizRound.id == RoundState.quiz_round_id)
+                 .where(QuizRound.finished_at.is_(None))
+                 .order_by(RoundState.quiz_round_id.desc()))
+    return db.session.execute(query.limit(1)).scalar()
+
+
+def served_position(token, user_id, kind, vocab_entry_id):
+    """First deck position that served `vocab_entry_id` and is not answered yet, else None."""
+    row = db.session.execute(
+        select(RoundState.deck, RoundState.position, RoundState.answered)
+        .where(RoundState.token == token, RoundState.user_id == user_id, RoundState.kind == kind)
+    ).first()
+    if row is None:
+        raise RoundNotFound(token)
+    deck, served, answered = bytes(row.deck), row.position, bytes(row.answered)
+    for position in range(served):
+        byte, bit = divmod(position, 8)
+        if _id_at(deck, position) == vocab_entry_id and not answered[byte] & (1 << bit):
+            return position
+    return None
+
+
+def _finish(token, user_id):
+    quiz_round_id = db.session.execute(
+        select(RoundState.quiz_round_id).where(RoundState.token == token, RoundState.user_id == user_id)
+    ).scalar()
+    if quiz_round_id is None:
+        raise RoundNotFound(token)
+    db.session.execute(
+        update(QuizRound).where(QuizRound.id == quiz_round_id, QuizRound.finished_at.is_(None))
+        .values(finished_at=datetime.utcnow())
+    )
+    db.session.commit()
+
+
+def mark_answered(token, user_id, kind, positions: List[int]) -> Tuple[int, Dict[int, VocabEntry]]:
+    """
+    Record that the served `positions` were answered; returns (quiz_round_id, position -> entry).
+    Raises InvalidAnswer (for the whole batch) if a position was not served yet or was
+    already answered. Entries deleted since /start are left out. Caller commits.
+    """
+    positions = list(positions)
+    if not positions or len(set(positions)) != len(positions):
+        raise InvalidAnswer("positions must be unique")
+    for _ in range(MAX_RETRIES):
+        row = db.session.execute(
+            select(RoundState.quiz_round_id, RoundState.position, RoundState.answered, RoundState.version,
+                   *[func.substr(RoundState.deck, p * ID_SIZE + 1, ID_SIZE) for p in positions])
+            .where(RoundState.token == token, RoundState.user_id == user_id, RoundState.kind == kind)
+        ).first()
+        if row is None:
+            raise RoundNotFound(token)
+        quiz_round_id, served, answered, version, *packed_ids = row
+        answered = bytearray(answered)
+        for position in positions:
+            if not 0 <= position < served:
+                raise InvalidAnswer("position was not served in this round")
+            byte, bit = divmod(position, 8)
+            if answered[byte] & (1 << bit):
+                raise InvalidAnswer("position already answered")
+            answered[byte] |= 1 << bit
+
+        result = db.session.execute(
+            update(RoundState)
+            .where(RoundState.token == token, RoundState.version == version)
+            .values(answered=bytes(answered), version=version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            ids = {position: _id_at(bytes(packed), 0) for position, packed in zip(positions, packed_ids)}
+            entries = {e.id: e for e in VocabEntry.query.filter(VocabEntry.id.in_(ids.values()))}
+            return quiz_round_id, {p: entries[i] for p, i in ids.items() if i in entries}
+        db.session.rollback()  # another answer of this round came first
+    raise RoundBusy()
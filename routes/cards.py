@@ -1,6 +1,10 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
+from sqlalchemy import select
 from extensions import db
 from models import UserCard, Card, VocabEntry
+import pagination
+import db_profiles
+import response_cache
 
 cards_bp = Blueprint("cards", __name__)
 
@@ -8,31 +12,58 @@ def get_current_user_id():
     # TODO: implement user management
     return 1
 
-# returns each card for current user
-@cards_bp.get("/")
-def list_cards():
-    user_id = get_current_user_id()
-    user_cards = (
+def _card_json(card, vocab):
+    return {
+        "card_id": card.id,
+        "rarity": card.rarity,
+        "title": card.title,
+        "description": card.description,
+        "image_url": card.image_url,
+        "latin_word": vocab.latin_word,
+        "german_translation": vocab.german_translation,
+        "accuracy_percent": vocab.accuracy_percent,
+    }
+
+CARD_FILTERS = (Card.rarity == "bronze",)
+NEWEST_FIRST = (UserCard.acquired_at.desc(), UserCard.id.desc())
+
+
+def cards_query(user_id):
+    """(UserCard, Card, VocabEntry) rows of list_cards, unordered."""
+    return (
         db.session.query(UserCard, Card, VocabEntry)
         .join(Card, UserCard.card_id == Card.id)
         .join(VocabEntry, Card.vocab_entry_id == VocabEntry.id)
-        .filter(
-            UserCard.user_id == user_id,
-            Card.rarity == "bronze",
-        )
-        .all()
+        .filter(UserCard.user_id == user_id, *CARD_FILTERS)
     )
 
-    result = []
-    for uc, card, vocab in user_cards:
-        result.append({
-            "card_id": card.id,
-            "rarity": card.rarity,
-            "title": card.title,
-            "description": card.description,
-            "image_url": card.image_url,
-            "latin_word": vocab.latin_word,
-            "german_translation": vocab.german_translation,
-            "accuracy_percent": vocab.accuracy_percent,
-        })
-    return jsonify(result)
+# returns each card for current user, newest first (?limit/&cursor: keyset pages, ?stream=1: streamed)
+@cards_bp.get("/")
+@db_profiles.replica_reads
+@response_cache.conditional(get_current_user_id)
+def list_cards():
+    user_id = get_current_user_id()
+
+    if request.args.get("stream") in ("1", "true"):
+        rows = db.session.execute(
+            select(Card.id, Card.rarity, Card.title, Card.description, Card.image_url,
+                   VocabEntry.latin_word, VocabEntry.german_translation, VocabEntry.accuracy_percent)
+            .select_from(UserCard)
+            .join(Card, UserCard.card_id == Card.id)
+            .join(VocabEntry, Card.vocab_entry_id == VocabEntry.id)
+            .where(UserCard.user_id == user_id, *CARD_FILTERS).order_by(*NEWEST_FIRST)
+            .execution_options(yield_per=pagination.STREAM_BATCH)
+        )
+        return pagination.stream_json_array(rows, lambda row: _card_json(row, row))
+
+    user_cards = cards_query(user_id)
+
+    if pagination.wants_page(request.args):
+        try:
+            rows, next_cursor = pagination.page(user_cards, UserCard.acquired_at, UserCard.id, request.args,
+                                                key=lambda row: (row[0].acquired_at, row[0].id))
+        except pagination.InvalidCursor as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"items": [_card_json(card, vocab) for _, card, vocab in rows], "next_cursor": next_cursor})
+
+    return jsonify([_card_json(card, vocab) for _, card, vocab in user_cards.order_by(*NEWEST_FIRST).all()])
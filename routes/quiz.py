@@ -1,56 +1,23 @@
 import os
 import json
-import re
 import random
 import logging
 from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime
-from sqlalchemy import func
+from sqlalchemy import inspect, select
 
+import distractors
 import frag_caesar_crawl4ai
+import sampling
+import scoring
+from distractors import normalize_german_strict
 from extensions import db
-from models import VocabEntry, QuizRound, QuizAnswer, Card, UserCard
+from models import VocabEntry, QuizRound, QuizQuestion
 
 logger = logging.getLogger(__name__)
 
-WRONG_TRANSLATIONS = [
-    # VERBEN (~170)
-    "laufen", "sehen", "hören", "sprechen", "essen", "trinken", "schlafen", "arbeiten", "spielen", "lesen",
-    "schreiben", "denken", "wissen", "gehen", "kommen", "sein", "haben", "tun", "machen", "geben",
-    "nehmen", "finden", "verlieren", "lieben", "hassen", "helfen", "fragen", "antworten", "erzählen", "sagen",
-    "rufen", "schreien", "flüstern", "tanzen", "springen", "sitzen", "stehen", "fallen", "steigen", "sinken",
-    "öffnen", "schließen", "beginnen", "enden", "warten", "suchen", "verstecken", "zeigen", "verbergen", "tragen",
-    "werfen", "fangen", "schneiden", "nähen", "kaufen", "verkaufen", "zahlen", "zählen", "rechnen", "erklären",
-    "verstehen", "vergessen", "erinnern", "wünschen", "hoffen", "fürchten", "wagen", "versuchen", "gelingen", "scheitern",
-    "regnen", "schneien", "wehen", "leuchten", "brennen", "erhitzen", "kühlen", "wachsen", "blühen", "welken",
-    "leben", "sterben", "atmen", "schlagen", "fühlen", "riechen", " schmecken", "berühren", "greifen", "halten",
-
-    # NOMEN (~200)
-    "Haus", "Tür", "Fenster", "Tisch", "Stuhl", "Bett", "Buch", "Stift", "Papier", "Lampe",
-    "Straße", "Stadt", "Land", "Welt", "Himmel", "Erde", "Wasser", "Feuer", "Luft", "Licht",
-    "Nacht", "Tag", "Morgen", "Abend", "Sonne", "Mond", "Stern", "Baum", "Blatt", "Blume",
-    "Mädchen", "Junge", "Mann", "Frau", "Kind", "Mutter", "Vater", "Freund", "Feind", "Lehrer",
-    "Schüler", "Arzt", "Kranke", "König", "Held", "Heldin", "Schwert", "Schild", "Pferd", "Weg",
-    "Wald", "Fluss", "Berg", "Tal", "See", "Meer", "Schiff", "Boot", "Fisch", "Vogel",
-    "Wolke", "Regen", "Schnee", "Wind", "Sturm", "Frieden", "Krieg", "Liebe", "Hass", "Freude",
-    "Trauer", "Angst", "Mut", "Zeit", "Jahr", "Monat", "Woche", "Tag", "Stunde", "Minuten",
-
-    # ADJEKTIVE (~130)
-    "groß", "klein", "hoch", "niedrig", "lang", "kurz", "breit", "schmal", "neu", "alt",
-    "jung", "reif", "schön", "hässlich", "gut", "schlecht", "stark", "schwach", "schnell", "langsam",
-    "warm", "kalt", "heiß", "kühl", "hell", "dunkel", "klar", "trüb", "reich", "arm",
-    "klug", "dumm", "freundlich", "böse", "froh", "traurig", "mutig", "feige", "edel", "gemein",
-    "einfach", "schwer", "leicht", "hart", "weich", "glatt", "rau", "sauber", "schmutzig", "gesund",
-    "krank", "tot", "lebendig", "leer", "voll", "nah", "fern", "oben", "unten", "links",
-    "rechts", "vor", "nach", "innen", "außen", "erste", "letzte", "ganze", "halbe", "viele",
-    "wenige", "alle", "kein", "einzeln", "gemeinsam", "öffentlich", "geheim", "wahr", "falsch", "möglich"
-]
-
-def normalize_german_strict(s: str) -> str:
-    s = s.strip().lower()
-    s = re.sub(r"\s+", " ", s)
-    s = re.sub(r"[;.,!?:]+$", "", s)
-    return s
+MAX_ROUND_SIZE = 50  # questions pre-generated by /start
+
 
 def build_true_meanings_set_from_frag_caesar_and_db(correct: str, latin_word: str) -> set[str]:
     """
@@ -62,7 +29,8 @@ def build_true_meanings_set_from_frag_caesar_and_db(correct: str, latin_word: st
         s.add(normalize_german_strict(correct))
 
     try:
-        extra_meanings = frag_caesar_crawl4ai.get_german_meanings(latin_word) or []
+        # stale cache entries are fine here, the quiz must not wait on frag-caesar.de
+        extra_meanings = frag_caesar_crawl4ai.get_german_meanings(latin_word, allow_stale=True) or []
     except Exception as ex:
         current_app.logger.error("FragCaesar error for %s: %s", latin_word, ex)
         extra_meanings = []
@@ -74,43 +42,8 @@ def build_true_meanings_set_from_frag_caesar_and_db(correct: str, latin_word: st
 
     return s
 
-quiz_bp = Blueprint("quiz", __name__)
-
-def get_current_user_id():
-    return 1
-
-@quiz_bp.post("/start")
-def start_quiz():
-    user_id = get_current_user_id()
-    qr = QuizRound(user_id=user_id)
-    db.session.add(qr)
-    db.session.commit()
-    return jsonify({"quiz_round_id": qr.id})
-
-@quiz_bp.get("/next")
-def next_questions():
-    user_id = get_current_user_id()
-    quiz_round_id = request.args.get('quizroundid')
-
-    # Get asked this round (optional uniqueness)
-    if quiz_round_id:
-        asked_ids = db.session.query(QuizAnswer.vocab_entry_id).filter(
-            QuizAnswer.quiz_round_id == quiz_round_id
-        ).subquery()
-
-    # Single weak vocab (randomized, exclude asked)
-    weak = VocabEntry.query.filter(
-        VocabEntry.user_id == user_id,
-        (VocabEntry.accuracy_percent < 95) | (VocabEntry.total_answers < 100)
-    )
-    if quiz_round_id:
-        weak = weak.filter(~VocabEntry.id.in_(asked_ids))
-    entry = weak.order_by(func.random()).first()
-
-    if not entry:
-        return jsonify({"error": "No weak vocabs available"}), 404
-
-    # Generate distractors for THIS vocab only (1x Gemini ~2s)
+def build_mc_question(entry: VocabEntry) -> dict:
+    """Options + correct_index for one multiple choice question about `entry`."""
     latin_word = entry.latin_word
     correct = entry.german_translation
 
@@ -120,83 +53,126 @@ def next_questions():
         latin_word=latin_word,
     )
 
-
-    wrong_options_raw: list[str] = []
-    max_wrong_responses = 3  # allow 3 "bad" attempts
-    attempts = 0
-
-
-    # After loop, ensure we have a list of strings in wrong_options_raw (possibly filtered)
-    if not wrong_options_raw:
-        # 3 zufällige echte deutsche Wörter!
-        wrong_options_raw = random.sample(WRONG_TRANSLATIONS, 3)
-
-    # Final filtering & padding to exactly 3
-    final_filtered = []
-    for w in wrong_options_raw:
-        if not isinstance(w, str):
-            continue
-        norm = normalize_german_strict(w)
-        if not norm or norm in true_meanings_set:
-            continue
-        final_filtered.append(w.strip())
-
-    wrong_options = final_filtered[:3]
-    while len(wrong_options) < 3:
-        wrong_options.append(f"Other wrong translation {len(wrong_options) + 1}")
+    # 3 wrong answers of the same word type, never a true meaning
+    wrong_options = distractors.index.draw(entry.user_id, entry.word_type, true_meanings_set, k=3)
 
     options = wrong_options + [correct]
     random.shuffle(options)
     correct_index = options.index(correct)
 
-    question = [{
+    return {
         "id": entry.id,
         "latin_word": latin_word,
         "options": options,
         "correct_index": correct_index
-    }]
+    }
+
 
-    current_app.logger.info(f"Single MC question: {latin_word}")
-    return jsonify(question)
+def question_to_json(q: QuizQuestion) -> dict:
+    return {
+        "id": q.vocab_entry_id,
+        "position": q.position,
+        "latin_word": q.latin_word,
+        "options": json.loads(q.options),
+        "correct_index": q.correct_index,
+    }
 
+def translations_query(user_id, entry_ids):
+    """(id, german_translation) of the user's entries among `entry_ids`."""
+    return (db.session.query(VocabEntry.id, VocabEntry.german_translation)
+            .filter(VocabEntry.user_id == user_id, VocabEntry.id.in_(entry_ids)))
 
+quiz_bp = Blueprint("quiz", __name__)
+
+def get_current_user_id():
+    return 1
 
-@quiz_bp.route('/verbs/next')
-def verbs_next():
+@quiz_bp.post("/start")
+@frag_caesar_crawl4ai.lookup_deadline
+def start_quiz():
+    """
+    Start a round. With {"size": N} the whole round is generated up front and
+    stored in quiz_question; {"include_questions": true} also returns it, so the
+    client can play without a request per question.
+    """
     user_id = get_current_user_id()
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON object required"}), 400
+    size = data.get("size") or 0
+    if type(size) is not int or not 0 <= size <= MAX_ROUND_SIZE:
+        return jsonify({"error": f"size must be an integer between 0 and {MAX_ROUND_SIZE}"}), 400
+
+    qr = QuizRound(user_id=user_id)
+    db.session.add(qr)
+    db.session.flush()
+    quiz_round_id = qr.id  # read before the commit expires qr
+    db.session.commit()
+    if not size:
+        return jsonify({"quiz_round_id": quiz_round_id})
+
+    entries = []
+    for _ in range(size):
+        entry = sampling.next_mc_entry(quiz_round_id, user_id)
+        if entry is None:
+            break
+        entries.append(entry)
+
+    # draw() commits per entry, which expires it: reload them all in one SELECT, not one each
+    if entries:
+        db.session.execute(
+            select(VocabEntry).where(VocabEntry.id.in_([inspect(e).identity[0] for e in entries]))
+        ).scalars().all()
+
+    # one concurrent batch instead of a FragCaesar round trip per question
+    frag_caesar_crawl4ai.get_kurzuebersicht_many(e.latin_word for e in entries)
+
+    questions = []
+    for position, entry in enumerate(entries):
+        q = build_mc_question(entry)
+        questions.append(QuizQuestion(
+            quiz_round_id=quiz_round_id,
+            position=position,
+            vocab_entry_id=entry.id,
+            latin_word=q["latin_word"],
+            options=json.dumps(q["options"], ensure_ascii=False),
+            correct_index=q["correct_index"],
+        ))
+    db.session.add_all(questions)
+
+    # serialize before the commit, which expires every QuizQuestion (one SELECT each)
+    result = {"quiz_round_id": quiz_round_id, "size": len(questions)}
+    if data.get("include_questions"):
+        result["questions"] = [question_to_json(q) for q in questions]
+    db.session.commit()
+    return jsonify(result)
+
+@quiz_bp.get("/next")
+@frag_caesar_crawl4ai.lookup_deadline
+def next_questions():
+    user_id = get_current_user_id()
+    quiz_round_id = request.args.get('quizroundid', type=int)
+
+    # Pre-generated round (see start_quiz): one primary-key read
+    position = request.args.get('position', type=int)
+    if quiz_round_id and position is not None:
+        q = db.session.get(QuizQuestion, (quiz_round_id, position))
+        if q is None:
+            return jsonify({"error": "No more questions in this round"}), 404
+        return jsonify([question_to_json(q)])
+
+    # Single vocab: due review first, else random weak one (never asked twice per round)
+    entry = sampling.next_mc_entry(quiz_round_id, user_id)
+
+    if not entry:
+        return jsonify({"error": "No weak vocabs available"}), 404
+
+    question = build_mc_question(entry)
+
+    logger.debug("Single MC question: %s", entry.latin_word)
+    return jsonify([question])
 
-    # Get current unfinished sorting round for user
-    current_round = (QuizRound.query
-                     .filter(QuizRound.user_id == user_id,
-                             QuizRound.finished_at.is_(None))
-                     .order_by(QuizRound.id.desc())
-                     .first())
-
-    if not current_round:
-        return jsonify({"error": "No active sorting quiz round"}), 404
-
-    # Asked verb IDs this round
-    asked_ids = (db.session.query(QuizAnswer.vocab_entry_id)
-                 .filter(QuizAnswer.quiz_round_id == current_round.id)
-                 .subquery())
-
-    verb = (VocabEntry.query
-            .filter(VocabEntry.user_id == user_id,
-                    VocabEntry.word_type == "Verb",
-                    VocabEntry.flexion_type.isnot(None),
-                    ~VocabEntry.id.in_(asked_ids))  # Exclude asked
-            .order_by(func.random())
-            .first())
-
-    if not verb:
-        current_round.finished_at = datetime.utcnow()
-        db.session.commit()
-        return jsonify({"error": "Quiz complete! All verbs asked once."}), 404
 
-    return jsonify({
-        'verb': verb.latin_word,
-        'correct_category': verb.flexion_type
-    })
 
 
 @quiz_bp.post("/answer")
@@ -218,249 +194,55 @@ def answer_question():
 
     is_correct = (selected_option == correct_translation)
 
-    # Creates a QuizAnswer row linking the quiz round and vocab entry
-    qa = QuizAnswer(
-        quiz_round_id=quiz_round_id,
-        vocab_entry_id=vocab_entry_id,
-        was_correct=is_correct,
-    )
-    db.session.add(qa)
-
-    # Updates the stats
-    entry.total_answers += 1
-    if is_correct:
-        entry.correct_answers += 1
-
-    entry.accuracy_percent = (entry.correct_answers * 100.0) / entry.total_answers
-
-    # 4) handle bronze card creation / removal
-    card_change = None  # "created", "removed" or None
-    card_id = None
-
-    # find existing bronze card for this user + vocab (if any)
-    bronze = (
-        db.session.query(Card, UserCard)
-        .join(UserCard, UserCard.card_id == Card.id)
-        .filter(
-            Card.vocab_entry_id == entry.id,
-            Card.rarity == "bronze",
-            UserCard.user_id == user_id,
-        )
-        .first()
-    )
-
-    # CREATE card if accuracy >= 90%, answer correct, enough attempts, and no card
-    if (
-        is_correct
-        and entry.accuracy_percent >= 90.0
-        and entry.total_answers >= 1
-        and bronze is None
-    ):
-        # placeholder AI content for Milestone 1
-        description = f"Bronze card for {entry.latin_word}"
-        image_url = "https://placehold.co/240x320?text=Bronze+Card"
-
-
-        card = Card(
-            vocab_entry_id=entry.id,
-            rarity="bronze",
-            title=entry.latin_word,
-            description=description,
-            image_url=image_url,
-        )
-        db.session.add(card)
-        db.session.flush()  # get card.id
-
-        user_card = UserCard(
-            user_id=user_id,
-            card_id=card.id,
-        )
-        db.session.add(user_card)
-
-        entry.has_bronze_card = True
-        card_change = "created"
-        card_id = card.id
-
-    # REMOVE card if accuracy < 90% and card exists
-    elif entry.accuracy_percent < 90.0 and bronze is not None:
-        card, user_card = bronze
-        db.session.delete(user_card)
-
-        # optionally delete Card if no other user owns it
-        others = UserCard.query.filter(
-            UserCard.card_id == card.id,
-            UserCard.user_id != user_id,
-        ).count()
-        if others == 0:
-            db.session.delete(card)
-
-        entry.has_bronze_card = False
-        card_change = "removed"
-        card_id = card.id
-
+    # QuizAnswer row + atomic stats update + bronze card creation / removal
+    result = scoring.record_answer(user_id, quiz_round_id, entry.id, is_correct)
     db.session.commit()
 
     return jsonify({
         "correct": is_correct,
-        "accuracy_percent": entry.accuracy_percent,
-        "card_change": card_change,
-        "card_id": card_id,
+        "accuracy_percent": result["accuracy_percent"],
+        "card_change": result["card_change"],
+        "card_id": result["card_id"],
     })
 
-@quiz_bp.route('/verbs/start', methods=['POST'])
-def verbs_start():
-    user_id = get_current_user_id()
-    qr = QuizRound(user_id=user_id)
-    db.session.add(qr)
-    db.session.commit()
-    return jsonify({"quizroundid": qr.id})
-
-
-@quiz_bp.route('/verbs/answer', methods=['POST'])
-def verbs_answer():
-    user_id = get_current_user_id()
-    data = request.get_json()
-    verb = data['verb']
-    category = data['category']
-
-    # Find vocab entry by latin word
-    entry = VocabEntry.query.filter_by(
-        user_id=user_id,
-        latin_word=verb
-    ).first()
-
-    if not entry:
-        return jsonify({"error": "Verb not found"}), 404
-
-    # Find active round
-    current_round = QuizRound.query.filter(
-        QuizRound.user_id == user_id,
-        QuizRound.finished_at.is_(None)
-    ).order_by(QuizRound.id.desc()).first()
-
-    if not current_round:
-        return jsonify({"error": "No active quiz round"}), 404
-
-    # Check answer
-    is_correct = (category == entry.flexion_type)
-
-    # Create QuizAnswer record (CRITICAL for tracking)
-    qa = QuizAnswer(
-        quiz_round_id=current_round.id,
-        vocab_entry_id=entry.id,
-        was_correct=is_correct
-    )
-    db.session.add(qa)
-
-    # Update vocab stats
-    entry.total_answers += 1
-    if is_correct:
-        entry.correct_answers += 1
-    entry.accuracy_percent = (entry.correct_answers / entry.total_answers) * 100
-
-    db.session.commit()
 
-    message = "Richtig!" if is_correct else "Falsch!"
-    return jsonify({
-        "correct": is_correct,
-        "score": entry.accuracy_percent,
-        "message": message
-    })
-
-    return jsonify({
-        "correct": is_correct,
-        "score": entry.accuracy_percent,
-        "message": "Richtig!" if is_correct else "Falsch!"
-    })
-
-@quiz_bp.route('/nouns/start', methods=['POST'])
-def nouns_start():  # Copy of verbs_start
+@quiz_bp.post("/answers")
+def answer_batch():
+    """
+    Many multiple choice answers in one request:
+    {"answers": [{"quiz_round_id", "vocab_entry_id", "selected_option"}, ...]}
+    One bulk insert, one atomic counter update and one card check per entry, one commit.
+    """
     user_id = get_current_user_id()
-    qr = QuizRound(user_id=user_id)
-    db.session.add(qr)
+    data = request.get_json(silent=True)
+    answers = data.get("answers") if isinstance(data, dict) else None
+    if not isinstance(answers, list) or not answers:
+        return jsonify({"error": "answers must be a non-empty list"}), 400
+    if any(not isinstance(a, dict)
+           or type(a.get("quiz_round_id")) is not int or type(a.get("vocab_entry_id")) is not int
+           or not isinstance(a.get("selected_option") or "", str) for a in answers):
+        return jsonify({"error": "answers need quiz_round_id and vocab_entry_id"}), 400
+
+    entry_ids = {a["vocab_entry_id"] for a in answers}
+    translations = dict(translations_query(user_id, entry_ids))
+    if len(translations) != len(entry_ids):
+        return jsonify({"error": "Unknown vocab_entry_id"}), 404
+
+    graded = [{
+        "quiz_round_id": a["quiz_round_id"],
+        "vocab_entry_id": a["vocab_entry_id"],
+        "was_correct": (a.get("selected_option") or "").strip().lower()
+                       == translations[a["vocab_entry_id"]].strip().lower(),
+    } for a in answers]
+
+    results = scoring.record_answers(user_id, graded)
     db.session.commit()
-    return jsonify({"quizroundid": qr.id})
-
-@quiz_bp.route('/nouns/next')
-def nouns_next():  # Copy of verbs_next → word_type="Noun"
-    user_id = get_current_user_id()
-    current_round = QuizRound.query.filter(
-        QuizRound.user_id == user_id, QuizRound.finished_at.is_(None)
-    ).order_by(QuizRound.id.desc()).first()
-    if not current_round:
-        return jsonify({"error": "No active sorting quiz round"}), 404
-
-    asked_ids = db.session.query(QuizAnswer.vocab_entry_id).filter(
-        QuizAnswer.quiz_round_id == current_round.id
-    ).subquery()
-
-    noun = VocabEntry.query.filter(
-        VocabEntry.user_id == user_id,
-        VocabEntry.word_type == "Nomen",
-        VocabEntry.flexion_type.isnot(None),
-        ~VocabEntry.id.in_(asked_ids)
-    ).order_by(func.random()).first()
-
-    if not noun:
-        current_round.finished_at = datetime.utcnow()
-        db.session.commit()
-        return jsonify({"error": "Quiz complete! All nouns covered."}), 404
-
-    return jsonify({'noun': noun.latin_word, 'correct_category': noun.flexion_type})
-
-@quiz_bp.route('/nouns/answer', methods=['POST'])
-def nouns_answer():  # Copy of verbs_answer → 'noun'
-    user_id = get_current_user_id()
-    data = request.get_json()
-    noun = data['noun']  # vs 'verb'
-    category = data['category']
-
-    # Find vocab entry by latin_word
-    entry = VocabEntry.query.filter_by(
-        user_id=user_id,
-        latin_word=noun
-    ).first()
 
-    if not entry:
-        return jsonify({"error": "Noun not found"}), 404
-
-    # Find active round
-    current_round = QuizRound.query.filter(
-        QuizRound.user_id == user_id,
-        QuizRound.finished_at.is_(None)
-    ).order_by(QuizRound.id.desc()).first()
-
-    if not current_round:
-        return jsonify({"error": "No active quiz round"}), 404
-
-    # Check answer
-    is_correct = (category == entry.flexion_type)
-
-    # Create QuizAnswer record
-    qa = QuizAnswer(
-        quiz_round_id=current_round.id,
-        vocab_entry_id=entry.id,
-        was_correct=is_correct
-    )
-    db.session.add(qa)
-
-    # Update vocab stats
-    entry.total_answers += 1
-    if is_correct:
-        entry.correct_answers += 1
-    entry.accuracy_percent = (entry.correct_answers / entry.total_answers) * 100
-
-    db.session.commit()
-
-    message = "Richtig!" if is_correct else "Falsch!"
     return jsonify({
-        "correct": is_correct,
-        "score": entry.accuracy_percent,
-        "message": message
+        "answers": [{"vocab_entry_id": g["vocab_entry_id"], "correct": g["was_correct"]} for g in graded],
+        "entries": {str(entry_id): r for entry_id, r in results.items()},
     })
 
-
-
 # lets the DB store complete round histories
 @quiz_bp.post("/finish")
 def finish_quiz():
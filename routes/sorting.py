@@ -0,0 +1,272 @@
+from dataclasses import dataclass
+from typing import Tuple
+
+from flask import Blueprint, request, jsonify
+from sqlalchemy import select
+
+import round_state
+import scoring
+from extensions import db
+from models import VocabEntry
+
+"""
+One sorting-quiz engine for every word type: drag the word to its
+flexion class. A quiz is a SORTING_QUIZZES entry and is played at
+
+    POST /api/quiz/sorting/<quiz>/start    {"size", "order": "due"} -> round_token, categories
+    GET  /api/quiz/sorting/<quiz>/next     ?round_token=&k=3        -> {"items": [...]}
+    POST /api/quiz/sorting/<quiz>/answer   {"round_token", "answers": [{"position", "category"}]}
+
+The deck is shuffled once per round (round_state.py); next and answer
+take up to MAX_BATCH items per request. /verbs/* and /nouns/* keep the
+old API: round id instead of token, the word instead of a position.
+"""
+
+sorting_bp = Blueprint("sorting", __name__)
+
+MAX_BATCH = 50
+
+
+@dataclass(frozen=True)
+class SortingQuiz:
+    word_type: str            # VocabEntry.word_type of the deck
+    item_key: str             # JSON key of the word in items ("verb", "noun", ...)
+    complete_message: str
+    categories: Tuple[str, ...] = ()  # drop targets; empty = the user's flexion types
+
+
+SORTING_QUIZZES = {
+    "verbs": SortingQuiz("Verb", "verb", "Quiz complete! All verbs asked once.", (
+        "A-Konjugation", "E-Konjugation", "I-Konjugation", "konsonantische Konjugation")),
+    "nouns": SortingQuiz("Nomen", "noun", "Quiz complete! All nouns covered.", (
+        "A-Deklination", "O-Deklination", "konsonantische Deklination", "E-Deklination",
+        "I-Deklination", "U-Deklination", "gemischte Deklination")),
+    "adjectives": SortingQuiz("Adjektiv", "adjective", "Quiz complete! All adjectives covered."),
+}
+
+
+def get_current_user_id():
+    return 1
+
+
+def _quiz_or_404(name):
+    quiz = SORTING_QUIZZES.get(name)
+    if quiz is None:
+        return None, (jsonify({"error": f"Unknown sorting quiz '{name}'"}), 404)
+    return quiz, None
+
+
+def _categories(quiz, user_id):
+    if quiz.categories:
+        return list(quiz.categories)
+    return sorted(c for (c,) in db.session.query(VocabEntry.flexion_type).filter(
+        VocabEntry.user_id == user_id, VocabEntry.word_type == quiz.word_type,
+        VocabEntry.flexion_type.isnot(None)).distinct())
+
+
+def _item_json(quiz, position, entry):
+    return {
+        quiz.item_key: entry.latin_word,
+        "latin_word": entry.latin_word,
+        "correct_category": entry.flexion_type,
+        "vocab_entry_id": entry.id,
+        "position": position,
+    }
+
+
+def _batch_size(value, default=1):
+    try:
+        return max(1, min(int(value), MAX_BATCH))
+    except (TypeError, ValueError):
+        return default
+
+
+@sorting_bp.post("/sorting/<quiz_name>/start")
+def sorting_start(quiz_name):
+    quiz, error = _quiz_or_404(quiz_name)
+    if error:
+        return error
+    user_id = get_current_user_id()
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON object required"}), 400
+    size = data.get("size")
+    if size is not None and (type(size) is not int or size < 0):
+        return jsonify({"error": "size must be a non-negative integer"}), 400
+    due_first = "due" in (data.get("order"), request.args.get("order"))
+    state = round_state.start(user_id, quiz.word_type, due_first=due_first, size=size)
+    db.session.commit()
+    return jsonify({
+        "quizroundid": state.quiz_round_id,
+        "round_token": state.token,
+        "size": state.size,
+        "categories": _categories(quiz, user_id),
+    })
+
+
+def _next_items(quiz, token, k):
+    """Up to k items of the round, or an error response."""
+    try:
+        items = round_state.next_entries(token, get_current_user_id(), quiz.word_type, k=k)
+    except round_state.RoundNotFound:
+        return None, (jsonify({"error": "No active sorting quiz round"}), 404)
+    except round_state.RoundComplete:
+        return None, (jsonify({"error": quiz.complete_message}), 404)
+    except round_state.RoundBusy:
+        return None, (jsonify({"error": "Round is busy, try again"}), 409)
+    return [_item_json(quiz, position, entry) for position, entry in items], None
+
+
+def _grade(quiz, user_id, token, answers, single):
+    """Record [{"position", "category"}, ...] of the round and build the answer response."""
+    try:
+        quiz_round_id, entries = round_state.mark_answered(
+            token, user_id, quiz.word_type, [a["position"] for a in answers])
+    except round_state.RoundNotFound:
+        return jsonify({"error": "No active quiz round"}), 404
+    except round_state.InvalidAnswer as e:
+        return jsonify({"error": str(e)}), 409
+    except round_state.RoundBusy:
+        return jsonify({"error": "Round is busy, try again"}), 409
+
+    graded = [{
+        "position": a["position"],
+        "quiz_round_id": quiz_round_id,
+        "vocab_entry_id": entries[a["position"]].id,
+        "was_correct": a.get("category") == entries[a["position"]].flexion_type,
+    } for a in answers if a["position"] in entries]
+    if single and not graded:
+        return jsonify({"error": "Vocab entry was deleted"}), 404
+
+    # QuizAnswer rows (CRITICAL for tracking) + atomic stats updates, one commit
+    stats = scoring.record_answers(user_id, graded, evaluate_cards=False)
+    db.session.commit()
+
+    results = [{
+        "position": g["position"],
+        "correct": g["was_correct"],
+        "score": stats[g["vocab_entry_id"]]["accuracy_percent"],
+        "message": "Richtig!" if g["was_correct"] else "Falsch!",
+    } for g in graded]
+    if single:
+        result = results[0]
+        return jsonify({"correct": result["correct"], "score": result["score"], "message": result["message"]})
+    return jsonify({"results": results})
+
+
+@sorting_bp.get("/sorting/<quiz_name>/next")
+def sorting_next(quiz_name):
+    quiz, error = _quiz_or_404(quiz_name)
+    if error:
+        return error
+    token = request.args.get("round_token")
+    if not token:
+        return jsonify({"error": "round_token required"}), 400
+    items, error = _next_items(quiz, token, _batch_size(request.args.get("k")))
+    if error:
+        return error
+    return jsonify({"items": items})
+
+
+@sorting_bp.post("/sorting/<quiz_name>/answer")
+def sorting_answer(quiz_name):
+    """{"round_token", "answers": [{"position", "category"}, ...]} or a single {"position", "category"}."""
+    quiz, error = _quiz_or_404(quiz_name)
+    if error:
+        return error
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON object required"}), 400
+    single = "answers" not in data
+    answers = [data] if single else data["answers"]
+    if (not data.get("round_token") or not isinstance(answers, list) or not answers
+            or len(answers) > MAX_BATCH
+            or any(not isinstance(a, dict) or type(a.get("position")) is not int for a in answers)):
+        return jsonify({"error": "round_token and position required"}), 400
+    return _grade(quiz, get_current_user_id(), data["round_token"], answers, single)
+
+
+# --- old URLs ----------------------------------------------------------------
+# Clients of the old /verbs/* and /nouns/* API know only the round id
+# (?quizroundid=, or none: the newest unfinished round) and answer with the
+# word itself ({"verb"|"noun", "category"}). Both are translated to the
+# round token and the deck position the word was served at.
+
+def _alias_token(quiz, user_id, quiz_round_id):
+    return round_state.find_token(user_id, quiz.word_type, quiz_round_id)
+
+
+def _alias_next(quiz_name):
+    quiz = SORTING_QUIZZES[quiz_name]
+    token = request.args.get("round_token") or _alias_token(
+        quiz, get_current_user_id(), request.args.get("quizroundid", type=int))
+    if not token:
+        return jsonify({"error": "No active sorting quiz round"}), 404
+    items, error = _next_items(quiz, token, 1)
+    if error:
+        return error
+    return jsonify(items[0])
+
+
+def _alias_answer(quiz_name):
+    quiz = SORTING_QUIZZES[quiz_name]
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON object required"}), 400
+    if "position" in data or "answers" in data:
+        return sorting_answer(quiz_name)  # new-style client on the old URL
+
+    user_id = get_current_user_id()
+    word = data.get(quiz.item_key)
+    if not isinstance(word, str) or not word:
+        return jsonify({"error": f"{quiz.item_key} and category required"}), 400
+    quiz_round_id = data.get("quizroundid")
+    if quiz_round_id is not None and type(quiz_round_id) is not int:
+        return jsonify({"error": "quizroundid must be an integer"}), 400
+
+    entry_ids = db.session.execute(
+        select(VocabEntry.id).where(VocabEntry.user_id == user_id, VocabEntry.latin_word == word)
+    ).scalars().all()
+    if not entry_ids:
+        return jsonify({"error": f"{quiz.item_key.capitalize()} not found"}), 404
+    token = data.get("round_token") or _alias_token(quiz, user_id, quiz_round_id)
+    if not token:
+        return jsonify({"error": "No active quiz round"}), 404
+    try:
+        position = next((p for p in (round_state.served_position(token, user_id, quiz.word_type, entry_id)
+                                     for entry_id in entry_ids) if p is not None), None)
+    except round_state.RoundNotFound:
+        return jsonify({"error": "No active quiz round"}), 404
+    if position is None:
+        return jsonify({"error": f"{quiz.item_key} was not served in this round or is already answered"}), 409
+    return _grade(quiz, user_id, token, [{"position": position, "category": data.get("category")}], single=True)
+
+
+@sorting_bp.post("/verbs/start")
+def verbs_start():
+    return sorting_start("verbs")
+
+
+@sorting_bp.get("/verbs/next")
+def verbs_next():
+    return _alias_next("verbs")
+
+
+@sorting_bp.post("/verbs/answer")
+def verbs_answer():
+    return _alias_answer("verbs")
+
+
+@sorting_bp.post("/nouns/start")
+def nouns_start():
+    return sorting_start("nouns")
+
+
+@sorting_bp.get("/nouns/next")
+def nouns_next():
+    return _alias_next("nouns")
+
+
+@sorting_bp.post("/nouns/answer")
+def nouns_answer():
+    return _alias_answer("nouns")
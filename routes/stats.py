@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy import func, select
+
+from extensions import db
+from models import RoundSummary, UserDailyStats, VocabDailyStats, VocabEntry
+import db_profiles
+import response_cache
+
+stats_bp = Blueprint("stats", __name__)
+
+# statistics read only the rollups of stats.py, never quiz_answer
+
+MAX_DAYS = 366
+MAX_LIMIT = 100
+
+def get_current_user_id():
+    # TODO: implement user management
+    return 1
+
+def _int_arg(name, default, maximum):
+    try:
+        value = int(request.args.get(name, default))
+    except ValueError:
+        value = default
+    return max(1, min(value, maximum))
+
+def _since():
+    """First day of the ?days= window (UTC, today included)."""
+    return datetime.utcnow().date() - timedelta(days=_int_arg("days", 30, MAX_DAYS) - 1)
+
+def _accuracy(answers, correct):
+    return round(correct * 100.0 / answers, 1) if answers else None
+
+def daily_query(user_id, since):
+    return (
+        select(UserDailyStats.day, UserDailyStats.word_type, UserDailyStats.answers, UserDailyStats.correct)
+        .where(UserDailyStats.user_id == user_id, UserDailyStats.day >= since)
+        .order_by(UserDailyStats.day)
+    )
+
+# answers and accuracy per day, with the split by word type (accuracy over time)
+@stats_bp.get("/daily")
+@db_profiles.replica_reads
+@response_cache.conditional(get_current_user_id, per_day=True)
+def daily():
+    rows = db.session.execute(daily_query(get_current_user_id(), _since())).all()
+
+    days = {}
+    for day, word_type, answers, correct in rows:
+        d = days.setdefault(day, {"day": day.isoformat(), "answers": 0, "correct": 0, "by_type": {}})
+        d["answers"] += answers
+        d["correct"] += correct
+        d["by_type"][word_type] = {"answers": answers, "correct": correct,
+                                   "accuracy_percent": _accuracy(answers, correct)}
+    for d in days.values():
+        d["accuracy_percent"] = _accuracy(d["answers"], d["correct"])
+    return jsonify(list(days.values()))
+
+def weakest_query(user_id, since, min_answers, limit):
+    """Weakest vocab of the window; the join drops deleted vocab before the limit."""
+    answers = func.sum(VocabDailyStats.answers)
+    correct = func.sum(VocabDailyStats.correct)
+    return (
+        select(VocabEntry.id, VocabEntry.latin_word, VocabEntry.german_translation, VocabEntry.word_type,
+               answers, correct)
+        .join(VocabEntry, VocabEntry.id == VocabDailyStats.vocab_entry_id)
+        .where(VocabDailyStats.user_id == user_id, VocabDailyStats.day >= since)
+        .group_by(VocabEntry.id)
+        .having(answers >= min_answers)
+        .order_by((correct * 1.0 / answers).asc(), answers.desc(), VocabEntry.id)
+        .limit(limit)
+    )
+
+# words with the lowest accuracy in the window (?days=30&limit=10&min_answers=3)
+@stats_bp.get("/weakest")
+@db_profiles.replica_reads
+@response_cache.conditional(get_current_user_id, per_day=True)
+def weakest():
+    rows = db.session.execute(weakest_query(
+        get_current_user_id(), _since(), _int_arg("min_answers", 3, 1000), _int_arg("limit", 10, MAX_LIMIT)
+    )).all()
+    return jsonify([{
+        "id": entry_id,
+        "latin_word": latin_word,
+        "german_translation": german_translation,
+        "word_type": word_type,
+        "answers": n,
+        "correct": k,
+        "accuracy_percent": _accuracy(n, k),
+    } for entry_id, latin_word, german_translation, word_type, n, k in rows])
+
+def rounds_query(user_id, limit):
+    return (
+        select(RoundSummary)
+        .where(RoundSummary.user_id == user_id)
+        .order_by(RoundSummary.last_answer_at.desc())
+        .limit(limit)
+    )
+
+# latest quiz rounds with their results
+@stats_bp.get("/rounds")
+@db_profiles.replica_reads
+@response_cache.conditional(get_current_user_id)
+def rounds():
+    rows = db.session.execute(rounds_query(get_current_user_id(), _int_arg("limit", 20, MAX_LIMIT))).scalars()
+    return jsonify([{
+        "quizroundid": r.quiz_round_id,
+        "answers": r.answers,
+        "correct": r.correct,
+        "accuracy_percent": _accuracy(r.answers, r.correct),
+        "first_answer_at": r.first_answer_at.isoformat(),
+        "last_answer_at": r.last_answer_at.isoformat(),
+    } for r in rows])
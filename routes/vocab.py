@@ -1,46 +1,137 @@
-from flask import Blueprint, request, jsonify, current_app
+import csv
+import io
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from extensions import db
-from models import VocabEntry
+from models import VocabEntry, ClassificationJob, ReviewSchedule
 import json
+import classifier
+import distractors
 import frag_caesar_crawl4ai
-from sqlalchemy import or_
+import scheduler
+import pagination
+import db_profiles
+import response_cache
+import search
+import stats
+from sqlalchemy import insert, select
 
 vocab_bp = Blueprint("vocab", __name__)
 
+IMPORT_CHUNK_SIZE = 100  # rows classified + inserted per transaction
+
 def get_current_user_id():
     # TODO: replace with real auth later
     return 1
 
-# read my vocab entries
+def _vocab_json(e, status):
+    return {
+        "id": e.id, "latin_word": e.latin_word, "german_translation": e.german_translation,
+        "accuracy_percent": e.accuracy_percent, "has_bronze_card": e.has_bronze_card,
+        "word_type": e.word_type,  # ✅ Already exposed
+        "classification_status": status or "done",
+    }
+
+
+# background classification progress (entries without a job were classified inline)
+JOB_JOIN = (ClassificationJob, ClassificationJob.vocab_entry_id == VocabEntry.id)
+NEWEST_FIRST = (VocabEntry.created_at.desc(), VocabEntry.id.desc())
+
+
+def vocab_filters(user_id, word_type=None, ids=None):
+    filters = [VocabEntry.user_id == user_id]
+    if word_type:
+        filters.append(VocabEntry.word_type == word_type)
+    if ids is not None:
+        filters.append(VocabEntry.id.in_(ids))
+    return filters
+
+
+def vocab_query(user_id, word_type=None, ids=None):
+    """(VocabEntry, classification status) rows of list_vocab, unordered."""
+    return (VocabEntry.query.filter(*vocab_filters(user_id, word_type, ids))
+            .outerjoin(*JOB_JOIN).add_columns(ClassificationJob.status))
+
+
+def find_latin(user_id, latin):
+    """The user's entry for a Latin word (duplicate check of add_vocab)."""
+    return VocabEntry.query.filter_by(user_id=user_id, latin_word=latin)
+
+
+def find_job(entry_id):
+    """The background classification job of an entry, if it has one."""
+    return ClassificationJob.query.filter_by(vocab_entry_id=entry_id)
+
+
+# read my vocab entries (?limit/&cursor: keyset pages, ?stream=1: streamed JSON array)
 @vocab_bp.get("/")
+@db_profiles.replica_reads
+@response_cache.conditional(get_current_user_id)
 def list_vocab():
     user_id = get_current_user_id()
-    query = VocabEntry.query.filter_by(user_id=user_id).order_by(VocabEntry.created_at.desc())
-
-    # Type filter
     word_type = request.args.get('type')
-    if word_type:
-        query = query.filter_by(word_type=word_type)
-
-    # Live search
-    search = request.args.get('search', '').strip()
-    if search:
-        query = query.filter(
-            or_(
-                VocabEntry.latin_word.ilike(f'%{search}%'),
-                VocabEntry.german_translation.ilike(f'%{search}%')
-            )
+
+    # Live search: full-text index, prefix + umlaut/macron folding, best match first
+    term = request.args.get('search', '').strip()
+    ranked_ids = None
+    if term:
+        ranked_ids = search.search(user_id, term, limit=pagination.parse_limit(request.args, search.DEFAULT_LIMIT))
+
+    if request.args.get("stream") in ("1", "true") and not term:
+        rows = db.session.execute(
+            select(VocabEntry.id, VocabEntry.latin_word, VocabEntry.german_translation,
+                   VocabEntry.accuracy_percent, VocabEntry.has_bronze_card, VocabEntry.word_type,
+                   ClassificationJob.status)
+            .outerjoin(*JOB_JOIN).where(*vocab_filters(user_id, word_type)).order_by(*NEWEST_FIRST)
+            .execution_options(yield_per=pagination.STREAM_BATCH)
         )
+        return pagination.stream_json_array(rows, lambda row: _vocab_json(row, row.status))
 
-    entries = query.all()
-    return jsonify([{
-        "id": e.id, "latin_word": e.latin_word, "german_translation": e.german_translation,
-        "accuracy_percent": e.accuracy_percent, "has_bronze_card": e.has_bronze_card,
-        "word_type": e.word_type,  # ✅ Already exposed
-    } for e in entries])
+    query = vocab_query(user_id, word_type, ranked_ids)
+
+    if term:
+        # ranked results are one (capped) page
+        rank = {entry_id: i for i, entry_id in enumerate(ranked_ids)}
+        entries = sorted(query.all(), key=lambda row: rank[row[0].id])
+        items = [_vocab_json(e, status) for e, status in entries]
+        return jsonify({"items": items, "next_cursor": None} if pagination.wants_page(request.args) else items)
+
+    if pagination.wants_page(request.args):
+        try:
+            entries, next_cursor = pagination.page(query, VocabEntry.created_at, VocabEntry.id, request.args,
+                                                   key=lambda row: (row[0].created_at, row[0].id))
+        except pagination.InvalidCursor as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"items": [_vocab_json(e, status) for e, status in entries], "next_cursor": next_cursor})
+
+    return jsonify([_vocab_json(e, status) for e, status in query.order_by(*NEWEST_FIRST).all()])
+
+def _add_pending(user_id, latin, german):
+    """Store the entry as "Unbekannt" and leave the classification to classifier.py (202)."""
+    entry = VocabEntry(
+        user_id=user_id,
+        latin_word=latin,
+        german_translation=german,
+        word_type="Unbekannt",
+        flexion_type=None
+    )
+    db.session.add(entry)
+    db.session.flush()  # get entry.id
+    classifier.enqueue(entry)
+    scheduler.schedule_new(user_id, [entry.id])
+    search.index_entry(entry)
+    response_cache.bump(user_id)
+    db.session.commit()
+    classifier.notify()
+    distractors.index.upsert(user_id, entry.id, entry.word_type, entry.german_translation)
+    return jsonify({
+        "id": entry.id,
+        "word_type": entry.word_type,
+        "classification_status": "pending",
+    }), 202
 
 # new VocabEntry-row for the current user
 @vocab_bp.post("/")
+@frag_caesar_crawl4ai.lookup_deadline
 def add_vocab():
     user_id = get_current_user_id()
     data = request.get_json()
@@ -51,16 +142,23 @@ def add_vocab():
         return jsonify({"error": "latin_word required"}), 400
 
     # Check if already exists
-    if VocabEntry.query.filter_by(user_id=user_id, latin_word=latin).first():
+    if find_latin(user_id, latin).first():
         return jsonify({"error": "Latin word already exists"}), 409
 
+    # Store now, classify in the background (?async=1 or {"async": true})
+    if request.args.get("async") in ("1", "true") or data.get("async") is True:
+        return _add_pending(user_id, latin, german)
+
     # Auto classify mit FragCaesar (FEHLER ABFANGEN!)
     word_type = "Unbekannt"
     flexion_type = None
 
     try:
-        word_type = frag_caesar_crawl4ai.get_word_type(latin)
-        flexion_type = frag_caesar_crawl4ai.get_flexion_type(latin) if word_type in ["Verb", "Nomen"] else None
+        word_type, flexion_type = frag_caesar_crawl4ai.classify_rows(frag_caesar_crawl4ai.get_kurzuebersicht(latin))
+    except frag_caesar_crawl4ai.LookupTimeout:
+        # frag-caesar.de is slow right now: don't hold the worker, classify in the background
+        current_app.logger.warning("FragCaesar too slow for '%s', classifying in the background", latin)
+        return _add_pending(user_id, latin, german)
     except Exception as e:
         current_app.logger.error(f"FragCaesar failed for '{latin}': {e}")
         return jsonify({
@@ -77,11 +175,32 @@ def add_vocab():
         flexion_type=flexion_type
     )
     db.session.add(entry)
+    db.session.flush()  # get entry.id
+    scheduler.schedule_new(user_id, [entry.id])
+    search.index_entry(entry)
+    response_cache.bump(user_id)
     db.session.commit()
+    distractors.index.upsert(user_id, entry.id, word_type, german)
 
     return jsonify({"id": entry.id, "word_type": word_type}), 201
 
 
+@vocab_bp.get("/<int:entry_id>/classification")
+def classification_status(entry_id):
+    """Progress of the background classification for one vocab entry."""
+    user_id = get_current_user_id()
+    entry = VocabEntry.query.filter_by(id=entry_id, user_id=user_id).first_or_404()
+    job = find_job(entry.id).first()
+
+    return jsonify({
+        "id": entry.id,
+        "status": job.status if job else "done",
+        "attempts": job.attempts if job else 0,
+        "last_error": job.last_error if job else None,
+        "word_type": entry.word_type,
+        "flexion_type": entry.flexion_type,
+    })
+
 @vocab_bp.put("/<int:entry_id>")
 def update_vocab(entry_id):
     """Update Latin and/or German for one vocab entry."""
@@ -98,7 +217,10 @@ def update_vocab(entry_id):
     if german is not None:
         entry.german_translation = german.strip()
 
+    search.index_entry(entry)
+    response_cache.bump(user_id)
     db.session.commit()
+    distractors.index.upsert(user_id, entry.id, entry.word_type, entry.german_translation)
     return jsonify({
         "id": entry.id,
         "latin_word": entry.latin_word,
@@ -113,6 +235,123 @@ def delete_vocab(entry_id):
     user_id = get_current_user_id()
     entry = VocabEntry.query.filter_by(id=entry_id, user_id=user_id).first_or_404()
 
+    find_job(entry.id).delete()
+    ReviewSchedule.query.filter_by(vocab_entry_id=entry.id).delete()
+    search.remove([entry.id])
     db.session.delete(entry)
+    db.session.flush()
+    stats.retype(user_id, entry_id, entry.word_type, stats.UNKNOWN_TYPE)  # as the rebuild counts deleted vocab
+    response_cache.bump(user_id)
     db.session.commit()
-    return jsonify({"status": "deleted"})
\ No newline at end of file
+    distractors.index.remove(user_id, entry_id)
+    return jsonify({"status": "deleted"})
+
+
+def _read_import_rows(stream, content_type):
+    """Yield (line_no, latin, german) from a CSV or NDJSON upload without buffering it."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig")
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        for line_no, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                yield line_no, None, None
+                continue
+            if not isinstance(obj, dict):  # valid JSON, but not a row object ([1, 2], "x", 3)
+                yield line_no, None, None
+                continue
+            yield line_no, str(obj.get("latin_word") or ""), str(obj.get("german_translation") or "")
+    else:
+        for line_no, cells in enumerate(csv.reader(text), start=1):
+            if not cells or not any(c.strip() for c in cells):
+                continue
+            if line_no == 1 and cells[0].strip().lower() == "latin_word":
+                continue  # header
+            yield line_no, cells[0], cells[1] if len(cells) > 1 else ""
+
+
+def _import_chunk(user_id, chunk):
+    """Classify one chunk in parallel, bulk insert the good rows, return per-row results."""
+    lookups = frag_caesar_crawl4ai.get_kurzuebersicht_many(latin for _, latin, _ in chunk)
+
+    results, new_rows = [], []
+    for (line_no, latin, german), lookup in zip(chunk, lookups):
+        try:
+            if lookup.error is not None:
+                raise lookup.error
+            word_type, flexion_type = frag_caesar_crawl4ai.classify_rows(lookup.rows)
+        except Exception as e:
+            current_app.logger.error(f"FragCaesar failed for '{latin}': {e}")
+            results.append({"line": line_no, "latin_word": latin, "status": "failed",
+                            "error": f"Word-Klassifikation fehlgeschlagen für '{latin}'."})
+            continue
+        new_rows.append({
+            "user_id": user_id, "latin_word": latin, "german_translation": german,
+            "word_type": word_type, "flexion_type": flexion_type,
+        })
+        results.append({"line": line_no, "latin_word": latin, "status": "created", "word_type": word_type})
+
+    if new_rows:
+        inserted = db.session.execute(
+            insert(VocabEntry).returning(VocabEntry.id, VocabEntry.latin_word), new_rows
+        ).all()
+        scheduler.schedule_new(user_id, [entry_id for entry_id, _ in inserted])
+        ids = {latin: entry_id for entry_id, latin in inserted}
+        search.index_entries([(ids[row["latin_word"]], user_id, row["latin_word"], row["german_translation"])
+                              for row in new_rows])
+        response_cache.bump(user_id)
+        db.session.commit()
+        for row in new_rows:
+            distractors.index.upsert(user_id, ids[row["latin_word"]], row["word_type"], row["german_translation"])
+        for r in results:
+            if r["status"] == "created":
+                r["id"] = ids.get(r["latin_word"])
+    return results
+
+
+# bulk import: CSV (latin_word,german_translation) or NDJSON body, streams one NDJSON result per row
+@vocab_bp.post("/import")
+def import_vocab():
+    user_id = get_current_user_id()
+    content_type = request.content_type or ""
+
+    # one set-based query for everything the user already has
+    existing = {
+        latin for (latin,) in
+        db.session.query(VocabEntry.latin_word).filter(VocabEntry.user_id == user_id)
+    }
+
+    def generate():
+        counts = {"created": 0, "duplicate": 0, "invalid": 0, "failed": 0}
+        chunk = []
+
+        def flush():
+            for r in _import_chunk(user_id, chunk):
+                counts[r["status"]] += 1
+                if r["status"] == "failed":
+                    existing.discard(r["latin_word"])  # a later row may retry it
+                yield json.dumps(r, ensure_ascii=False) + "\n"
+            chunk.clear()
+
+        for line_no, latin, german in _read_import_rows(request.stream, content_type):
+            latin = (latin or "").strip()
+            if not latin:
+                counts["invalid"] += 1
+                yield json.dumps({"line": line_no, "status": "invalid", "error": "latin_word required"}) + "\n"
+                continue
+            if latin in existing:
+                counts["duplicate"] += 1
+                yield json.dumps({"line": line_no, "latin_word": latin, "status": "duplicate"},
+                                 ensure_ascii=False) + "\n"
+                continue
+            existing.add(latin)  # also dedupes within the upload
+            chunk.append((line_no, latin, (german or "").strip()))
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                yield from flush()
+        if chunk:
+            yield from flush()
+        yield json.dumps({"summary": counts}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
@@ -0,0 +1,133 @@
+import os
+import random
+from typing import Optional
+
+from sqlalchemy import select, update, insert
+from sqlalchemy.exc import IntegrityError
+
+import scheduler
+from extensions import db
+from models import RoundAsked, VocabEntry
+
+"""
+Question sampling without ORDER BY random():
+every VocabEntry carries a uniform random sample_key, indexed together with
+user_id. A draw picks r in [0, 1) and takes the first eligible entry with
+sample_key >= r (wrapping around to the smallest key), which is an index
+range read instead of a full scan + sort. The drawn entry gets a fresh key,
+so no entry keeps a "large gap" advantage across draws.
+The ids already asked in a round are kept in round_asked (one PK read).
+
+With QUIZ_SELECTION=due (default) entries due for review in the spaced
+repetition schedule come first, earliest due_at first; the random draw
+only fills in when nothing is due.
+"""
+
+MAX_RETRIES = 5  # concurrent draws on the same round (several tabs)
+SELECTION = os.getenv("QUIZ_SELECTION", "due")  # "due" or "random"
+
+
+def mc_criteria(user_id):
+    """Eligibility of the multiple choice quiz: weak or rarely asked vocab."""
+    return [
+        VocabEntry.user_id == user_id,
+        (VocabEntry.accuracy_percent < 95) | (VocabEntry.total_answers < 100),
+    ]
+
+
+def sorting_criteria(user_id, word_type):
+    """Eligibility of the sorting quizzes: classified entries of one word type."""
+    return [
+        VocabEntry.user_id == user_id,
+        VocabEntry.word_type == word_type,
+        VocabEntry.flexion_type.isnot(None),
+    ]
+
+
+def _decode(asked: str):
+    return [int(i) for i in asked.split(",")] if asked else []
+
+
+def candidates(criteria, exclude=(), due_user_id=None, at=None):
+    """
+    Eligible entries not in `exclude`: due ones earliest first (with due_user_id),
+    else in sample_key order, from key `at` on (None: from the smallest key).
+    """
+    if due_user_id is not None:
+        query = scheduler.due_query(due_user_id, criteria)
+    else:
+        query = VocabEntry.query.filter(*criteria)
+        if at is not None:
+            query = query.filter(VocabEntry.sample_key >= at)
+        query = query.order_by(VocabEntry.sample_key)
+    if exclude:
+        query = query.filter(VocabEntry.id.notin_(exclude))
+    return query
+
+
+def _pick(criteria, exclude, due_user_id=None) -> Optional[VocabEntry]:
+    if due_user_id is not None:
+        return candidates(criteria, exclude, due_user_id=due_user_id).first()
+    return (candidates(criteria, exclude, at=random.random()).first()
+            or candidates(criteria, exclude).first())  # wrap around
+
+
+def random_entry(criteria) -> Optional[VocabEntry]:
+    """One random eligible entry, without round bookkeeping."""
+    entry = _pick(criteria, exclude=())
+    if entry is not None:
+        entry.sample_key = random.random()
+        db.session.commit()
+    return entry
+
+
+def next_mc_entry(quiz_round_id, user_id) -> Optional[VocabEntry]:
+    """Multiple choice: due reviews first, otherwise a random weak entry."""
+    if SELECTION == "due":
+        entry = (draw(quiz_round_id, "mc", [], due_user_id=user_id) if quiz_round_id
+                 else scheduler.due_query(user_id).first())
+        if entry is not None:
+            return entry
+    if quiz_round_id:
+        return draw(quiz_round_id, "mc", mc_criteria(user_id))
+    return random_entry(mc_criteria(user_id))
+
+
+def draw(quiz_round_id, kind: str, criteria, due_user_id=None) -> Optional[VocabEntry]:
+    """
+    Next random eligible entry of a round, never one already drawn in it
+    (with due_user_id: the earliest due one instead of a random one).
+    Returns None when the round has no candidates left.
+    """
+    for _ in range(MAX_RETRIES):
+        row = db.session.execute(
+            select(RoundAsked.asked, RoundAsked.draws).where(RoundAsked.quiz_round_id == quiz_round_id)
+        ).first()
+        asked, draws = (_decode(row.asked), row.draws) if row else ([], 0)
+
+        entry = _pick(criteria, exclude=asked, due_user_id=due_user_id)
+        if entry is None:
+            return None
+
+        entry.sample_key = random.random()
+        new_asked = ",".join(str(i) for i in asked + [entry.id])
+        try:
+            if row is None:
+                db.session.execute(insert(RoundAsked).values(
+                    quiz_round_id=quiz_round_id, kind=kind, asked=new_asked, draws=1))
+            else:
+                # only record the draw if no other request drew meanwhile
+                result = db.session.execute(
+                    update(RoundAsked)
+                    .where(RoundAsked.quiz_round_id == quiz_round_id, RoundAsked.draws == draws)
+                    .values(asked=new_asked, draws=draws + 1)
+                )
+                if result.rowcount != 1:
+                    db.session.rollback()
+                    continue
+            db.session.commit()
+            return entry
+        except IntegrityError:
+            db.session.rollback()  # another request created the row first
+    return None
+
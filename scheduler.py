@@ -0,0 +1,108 @@
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
+
+from sqlalchemy import select, insert
+
+from extensions import db
+from models import ReviewSchedule, VocabEntry
+
+"""
+Spaced repetition: every VocabEntry has a review_schedule row with ease,
+interval and due_at. The answer path (scoring.record_answers) feeds each
+answer into the configured scheduler, and question selection reads the
+(user_id, due_at) index instead of scanning for weak vocab.
+
+Schedulers are pluggable: register a class in SCHEDULERS and select it
+with REVIEW_SCHEDULER.
+"""
+
+
+@dataclass
+class ReviewState:
+    ease: float = 2.5
+    interval_days: float = 0.0
+    repetitions: int = 0
+    due_at: datetime = None
+
+
+class SM2Scheduler:
+    """SuperMemo-2 with binary answers: correct = quality 4, wrong = quality 1."""
+
+    MIN_EASE = 1.3
+    RELEARN_DELAY = timedelta(minutes=10)
+
+    def review(self, state: ReviewState, was_correct: bool, now: datetime) -> ReviewState:
+        quality = 4 if was_correct else 1
+        ease = max(self.MIN_EASE, state.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        if not was_correct:
+            return ReviewState(ease, 0.0, 0, now + self.RELEARN_DELAY)
+
+        repetitions = state.repetitions + 1
+        if repetitions == 1:
+            interval = 1.0
+        elif repetitions == 2:
+            interval = 6.0
+        else:
+            interval = round(state.interval_days * ease, 2)
+        return ReviewState(ease, interval, repetitions, now + timedelta(days=interval))
+
+
+SCHEDULERS = {
+    "sm2": SM2Scheduler,
+}
+
+_scheduler = SCHEDULERS[os.getenv("REVIEW_SCHEDULER", "sm2")]()
+
+
+def get_scheduler():
+    return _scheduler
+
+
+def schedule_new(user_id, entry_ids: Iterable[int]):
+    """review_schedule rows for freshly created entries: due right away (caller commits)."""
+    now = datetime.utcnow()
+    rows = [{"vocab_entry_id": i, "user_id": user_id, "due_at": now,
+             "ease": 2.5, "interval_days": 0.0, "repetitions": 0} for i in entry_ids]
+    if rows:
+        db.session.execute(insert(ReviewSchedule), rows)
+
+
+def record_reviews(outcomes: Dict[int, List[bool]]):
+    """
+    Apply answers (entry id -> results in answer order) to the schedules.
+    Rows are locked (FOR UPDATE on Postgres) so concurrent answers serialize.
+    """
+    if not outcomes:
+        return
+    now = datetime.utcnow()
+    schedules = {
+        s.vocab_entry_id: s for s in db.session.execute(
+            select(ReviewSchedule)
+            .where(ReviewSchedule.vocab_entry_id.in_(list(outcomes)))
+            .with_for_update()
+        ).scalars()
+    }
+    for entry_id, results in outcomes.items():
+        schedule = schedules.get(entry_id)
+        if schedule is None:
+            continue  # entry created before scheduling existed and not backfilled yet
+        state = ReviewState(schedule.ease, schedule.interval_days, schedule.repetitions, schedule.due_at)
+        for was_correct in results:
+            state = _scheduler.review(state, was_correct, now)
+        schedule.ease = state.ease
+        schedule.interval_days = state.interval_days
+        schedule.repetitions = state.repetitions
+        schedule.due_at = state.due_at
+
+
+def due_query(user_id, criteria=(), now=None):
+    """Entries due for review, earliest first: a range read on (user_id, due_at)."""
+    return (VocabEntry.query
+            .join(ReviewSchedule, ReviewSchedule.vocab_entry_id == VocabEntry.id)
+            .filter(ReviewSchedule.user_id == user_id,
+                    ReviewSchedule.due_at <= (now or datetime.utcnow()),
+                    *criteria)
+            .order_by(ReviewSchedule.due_at))
+
@@ -0,0 +1,167 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, update, func
+
+import response_cache
+import scheduler
+import stats
+from extensions import db
+from models import VocabEntry, QuizAnswer, Card, UserCard
+
+"""
+Answer bookkeeping shared by all quiz routes: QuizAnswer rows are written
+with one bulk insert and the per-entry counters with atomic SQL increments
+(total_answers = total_answers + n), so concurrent workers never lose an
+update. The bronze card rule runs once per affected entry, and every
+answer is fed into the spaced-repetition schedule and the statistics
+rollups (stats.py) in the same transaction.
+"""
+
+BRONZE_THRESHOLD = 90.0
+
+
+def record_answers(user_id, answers: List[dict], evaluate_cards: bool = True) -> Dict[int, dict]:
+    """
+    answers: dicts with quiz_round_id, vocab_entry_id, was_correct (in answer order).
+    Returns vocab_entry_id -> {"accuracy_percent", "total_answers", "card_change", "card_id"}.
+    The caller commits.
+    """
+    if not answers:
+        return {}
+
+    now = datetime.utcnow()
+    db.session.execute(insert(QuizAnswer), [{
+        "quiz_round_id": a["quiz_round_id"],
+        "vocab_entry_id": a["vocab_entry_id"],
+        "was_correct": bool(a["was_correct"]),
+        "answered_at": now,
+    } for a in answers])
+
+    # answers and correct answers per entry, plus the latest answer's result
+    grouped: "OrderedDict[int, list]" = OrderedDict()
+    outcomes: Dict[int, List[bool]] = {}
+    for a in answers:
+        n, k, _ = grouped.get(a["vocab_entry_id"], (0, 0, False))
+        grouped[a["vocab_entry_id"]] = [n + 1, k + int(bool(a["was_correct"])), bool(a["was_correct"])]
+        outcomes.setdefault(a["vocab_entry_id"], []).append(bool(a["was_correct"]))
+
+    results = {}
+    word_types = {}
+    # fixed lock order (by id) so concurrent batches cannot deadlock
+    for entry_id in sorted(grouped):
+        n, k, last_correct = grouped[entry_id]
+        total = func.coalesce(VocabEntry.total_answers, 0)
+        correct = func.coalesce(VocabEntry.correct_answers, 0)
+        row = db.session.execute(
+            update(VocabEntry)
+            .where(VocabEntry.id == entry_id, VocabEntry.user_id == user_id)
+            .values(
+                total_answers=total + n,
+                correct_answers=correct + k,
+                accuracy_percent=(correct + k) * 100.0 / (total + n),
+            )
+            .returning(VocabEntry.latin_word, VocabEntry.word_type, VocabEntry.total_answers,
+                       VocabEntry.accuracy_percent)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if row is None:
+            continue
+        word_types[entry_id] = row.word_type
+
+        card_change, card_id = None, None
+        if evaluate_cards:
+            card_change, card_id = evaluate_bronze_card(
+                user_id, entry_id, row.latin_word, row.accuracy_percent, row.total_answers, last_correct)
+        results[entry_id] = {
+            "accuracy_percent": float(row.accuracy_percent),
+            "total_answers": row.total_answers,
+            "card_change": card_change,  # "created", "removed" or None
+            "card_id": card_id,
+        }
+
+    scheduler.record_reviews({entry_id: outcomes[entry_id] for entry_id in results})
+    stats.record_answers(user_id, answers, word_types, now)
+    if results:
+        response_cache.bump(user_id)  # accuracy and cards changed
+    return results
+
+
+def bronze_card_query(user_id, entry_id):
+    """(Card, UserCard) of the user's bronze card for one entry."""
+    return (
+        db.session.query(Card, UserCard)
+        .join(UserCard, UserCard.card_id == Card.id)
+        .filter(
+            Card.vocab_entry_id == entry_id,
+            Card.rarity == "bronze",
+            UserCard.user_id == user_id,
+        )
+    )
+
+
+def other_owners_query(card_id, user_id):
+    """UserCards of a card held by users other than `user_id`."""
+    return UserCard.query.filter(
+        UserCard.card_id == card_id,
+        UserCard.user_id != user_id,
+    )
+
+
+def evaluate_bronze_card(user_id, entry_id, latin_word, accuracy_percent, total_answers,
+                         last_correct) -> tuple:
+    """Create or remove the user's bronze card for one entry; returns (card_change, card_id)."""
+    # find existing bronze card for this user + vocab (if any)
+    bronze = bronze_card_query(user_id, entry_id).first()
+
+    # CREATE card if accuracy >= 90%, answer correct, enough attempts, and no card
+    if (
+        last_correct
+        and accuracy_percent >= BRONZE_THRESHOLD
+        and total_answers >= 1
+        and bronze is None
+    ):
+        # placeholder AI content for Milestone 1
+        card = Card(
+            vocab_entry_id=entry_id,
+            rarity="bronze",
+            title=latin_word,
+            description=f"Bronze card for {latin_word}",
+            image_url="https://placehold.co/240x320?text=Bronze+Card",
+        )
+        db.session.add(card)
+        db.session.flush()  # get card.id
+        db.session.add(UserCard(user_id=user_id, card_id=card.id))
+        _set_has_bronze_card(entry_id, True)
+        return "created", card.id
+
+    # REMOVE card if accuracy < 90% and card exists
+    if accuracy_percent < BRONZE_THRESHOLD and bronze is not None:
+        card, user_card = bronze
+        db.session.delete(user_card)
+
+        # optionally delete Card if no other user owns it
+        others = other_owners_query(card.id, user_id).count()
+        if others == 0:
+            db.session.delete(card)
+
+        _set_has_bronze_card(entry_id, False)
+        return "removed", card.id
+
+    return None, None
+
+
+def _set_has_bronze_card(entry_id, value: bool):
+    db.session.execute(
+        update(VocabEntry).where(VocabEntry.id == entry_id).values(has_bronze_card=value)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def record_answer(user_id, quiz_round_id, entry_id, was_correct, evaluate_cards=True) -> Optional[dict]:
+    return record_answers(user_id, [{
+        "quiz_round_id": quiz_round_id,
+        "vocab_entry_id": entry_id,
+        "was_correct": was_correct,
+    }], evaluate_cards=evaluate_cards).get(entry_id)
@@ -0,0 +1,136 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Iterable, List
+
+from sqlalchemy import bindparam, text
+
+from extensions import db
+
+"""
+Vocabulary search behind one API: an FTS5 table on SQLite and a tsvector
+column with a GIN index on Postgres. Both hold folded text (lower case,
+ä→ae, ö→oe, ü→ue, ß→ss, ā→a, é→e). A query is "this user AND every term
+as a prefix of the Latin or German text", ranked by bm25 / ts_rank with
+Latin matches above German ones. The user is an owner token ("u<id>") in
+its own FTS5 column, which the terms never search, and a plain user_id
+column next to the tsvector on Postgres.
+
+The routes keep the index in the same transaction as the vocab change
+(index_entries / remove); migrations create it and backfill old rows.
+"""
+
+TABLE = "vocab_search"
+DEFAULT_LIMIT = 500
+
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+@lru_cache(maxsize=50000)
+def fold(value: str) -> str:
+    """Lower case, umlauts spelled out, all other diacritics (macrons, accents) dropped."""
+    value = (value or "").lower().translate(_UMLAUTS)
+    value = unicodedata.normalize("NFKD", value)
+    return "".join(c for c in value if not unicodedata.combining(c))
+
+
+def tokens(value: str) -> List[str]:
+    return _TOKEN_RE.findall(fold(value))
+
+
+def _owner(user_id) -> str:
+    return f"u{int(user_id)}"
+
+
+def _is_sqlite(conn) -> bool:
+    """conn: a Connection (migrations) or the Flask-SQLAlchemy session (routes)."""
+    dialect = conn.dialect if hasattr(conn, "dialect") else conn.get_bind().dialect
+    return dialect.name == "sqlite"
+
+
+def create_index(conn):
+    """Search table + index for the connection's dialect (idempotent)."""
+    if _is_sqlite(conn):
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+            "owner, latin, german, tokenize = 'unicode61 remove_diacritics 2')"))
+    else:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+            "vocab_entry_id INTEGER PRIMARY KEY REFERENCES vocab_entry(id) ON DELETE CASCADE, "
+            "user_id INTEGER NOT NULL, document tsvector NOT NULL)"))
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{TABLE}_document ON {TABLE} USING gin (document)"))
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{TABLE}_user ON {TABLE} (user_id)"))
+
+
+def _rows(entries):
+    return [{
+        "id": entry_id,
+        "owner": _owner(user_id),
+        "user_id": user_id,
+        "latin": " ".join(tokens(latin)),
+        "german": " ".join(tokens(german)),
+    } for entry_id, user_id, latin, german in entries]
+
+
+def index_entries(entries: Iterable[tuple], conn=None):
+    """(Re)index (id, user_id, latin_word, german_translation) tuples; the caller commits."""
+    rows = _rows(entries)
+    if not rows:
+        return
+    conn = conn or db.session
+    remove([r["id"] for r in rows], conn)
+    if _is_sqlite(conn):
+        conn.execute(text(f"INSERT INTO {TABLE} (rowid, owner, latin, german) "
+                          "VALUES (:id, :owner, :latin, :german)"), rows)
+    else:
+        conn.execute(text(
+            f"INSERT INTO {TABLE} (vocab_entry_id, user_id, document) VALUES (:id, :user_id, "
+            "setweight(to_tsvector('simple', :latin), 'A') || "
+            "setweight(to_tsvector('simple', :german), 'B'))"), rows)
+
+
+def index_entry(entry, conn=None):
+    index_entries([(entry.id, entry.user_id, entry.latin_word, entry.german_translation)], conn)
+
+
+def remove(entry_ids: Iterable[int], conn=None):
+    entry_ids = list(entry_ids)
+    if not entry_ids:
+        return
+    conn = conn or db.session
+    key = "rowid" if _is_sqlite(conn) else "vocab_entry_id"
+    conn.execute(text(f"DELETE FROM {TABLE} WHERE {key} IN :ids")
+                 .bindparams(bindparam("ids", expanding=True)), {"ids": entry_ids})
+
+
+def search(user_id, query: str, limit: int = DEFAULT_LIMIT) -> List[int]:
+    """Ids of the user's entries matching every term of `query` as a prefix, best match first."""
+    terms = tokens(query)
+    if not terms:
+        return []
+    if _is_sqlite(db.session):
+        # terms only search the text columns: "u"* must not match every row's owner token
+        match = f"owner : {_owner(user_id)} AND " + " AND ".join(f'{{latin german}} : "{t}"*' for t in terms)
+        sql = (f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH :match "
+               f"ORDER BY bm25({TABLE}, 0.0, 10.0, 5.0) LIMIT :limit")
+    else:
+        match = " & ".join(f"{t}:*" for t in terms)
+        sql = (f"SELECT vocab_entry_id FROM {TABLE} "
+               f"WHERE user_id = :user_id AND document @@ to_tsquery('simple', :match) "
+               f"ORDER BY ts_rank(document, to_tsquery('simple', :match)) DESC LIMIT :limit")
+    return db.session.execute(text(sql), {"match": match, "user_id": user_id, "limit": limit}).scalars().all()
+
+
+def rebuild(conn, chunk_size=1000):
+    """Index every vocab entry (migration backfill), in id order and in chunks."""
+    last_id = 0
+    while True:
+        chunk = conn.execute(text(
+            "SELECT id, user_id, latin_word, german_translation FROM vocab_entry "
+            "WHERE id > :last ORDER BY id LIMIT :n"), {"last": last_id, "n": chunk_size}).all()
+        if not chunk:
+            return
+        index_entries([tuple(r) for r in chunk], conn)
+        last_id = chunk[-1][0]
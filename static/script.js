@@ -3,13 +3,16 @@ console.log("script.js loaded");
 const API_BASE = window.location.origin + "/api";
 
 let quizRoundId = null;
+let mcQuestions = [];  // whole pre-generated round from /quiz/start
 let mcVerbCount = 0;
 let sortingVerbCount = 0;
-let nounsRoundId = null;
+let nounsRoundToken = null;
+let nounsQueue = [];
 let nounsCount = 0;
 let currentNounData = null;
 let currentVerbData = {};
-let sortingRoundId = null;
+let sortingRoundToken = null;
+let sortingQueue = [];  // items prefetched with one /next?k=3
 
 // Sections
 const vocabSection   = document.getElementById("vocabSection");
@@ -48,15 +51,31 @@ function showSection(name) {
 
 let currentSortCol = null;
 let currentSortDir = "asc";
+const PAGE_SIZE = 100;
+let vocabRows = [];         // pages loaded so far
+let vocabNextCursor = null; // null = everything loaded
 
 async function loadVocab() {
-  const res  = await fetch(`${API_BASE}/vocab/`);
-  const data = await res.json();
-  renderVocabTable(data);
+  vocabRows = [];
+  vocabNextCursor = null;
+  await loadMoreVocab();
   attachSortListeners();
   attachTypeFilters();
 }
 
+async function loadMoreVocab() {
+  const cursor = vocabNextCursor ? `&cursor=${encodeURIComponent(vocabNextCursor)}` : "";
+  const res  = await fetch(`${API_BASE}/vocab/?limit=${PAGE_SIZE}${cursor}`);
+  const page = await res.json();
+  vocabRows = vocabRows.concat(page.items);
+  vocabNextCursor = page.next_cursor;
+  renderVocabTable(vocabRows);
+  filterByType();
+  const moreBtn = document.getElementById("vocabLoadMore");
+  moreBtn.style.display = vocabNextCursor ? "" : "none";
+  moreBtn.onclick = loadMoreVocab;
+}
+
 function attachTypeFilters() {
   document.querySelectorAll(".type-radio").forEach(radio => {
     radio.onchange = filterByType;
@@ -126,7 +145,8 @@ function attachSortListeners() {
         .querySelectorAll(".sortable")
         .forEach(h => h.classList.remove("sort-asc", "sort-desc"));
       th.classList.add(`sort-${currentSortDir}`);
-      loadVocab();
+      renderVocabTable(vocabRows);
+      filterByType();
     };
   });
 }
@@ -217,9 +237,14 @@ document.getElementById("addVocabForm").onsubmit = async e => {
 
 async function startQuizFlow() {
   console.log("startQuizFlow called");
-  const startRes  = await fetch(`${API_BASE}/quiz/start`, { method: "POST" });
+  const startRes  = await fetch(`${API_BASE}/quiz/start`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ size: 3, include_questions: true })
+  });
   const startData = await startRes.json();
   quizRoundId     = startData.quiz_round_id;
+  mcQuestions     = startData.questions || [];
   mcVerbCount     = 0;
   document.getElementById("mcCounter").textContent = "";
   showSection("quiz");
@@ -272,14 +297,13 @@ async function loadNextMCQuestion() {
     return;
   }
 
-  const qRes         = await fetch(`${API_BASE}/quiz/next?quizroundid=${quizRoundId}`);
-  const newQuestions = await qRes.json();
-  if (!newQuestions || newQuestions.length === 0) {
+  // played locally from the pre-generated round, no request per question
+  const q = mcQuestions[mcVerbCount];
+  if (!q) {
     document.getElementById("quizFeedback").textContent = "No more questions.";
     return;
   }
 
-  const q = newQuestions[0];
   showCurrentQuestionStandalone(q);
   document.getElementById("quizFeedback").textContent =
     `Choose the right answer! (${mcVerbCount + 1}/3 words)`;
@@ -321,12 +345,25 @@ document.getElementById("btnNextQuestion").onclick = async () => {
 
 /* -------------------- Cards -------------------- */
 
+let cardsNextCursor = null;
+
 async function loadCards() {
-  const res   = await fetch(`${API_BASE}/cards/`);
-  const cards = await res.json();
+  document.getElementById("cardsGrid").innerHTML = "";
+  cardsNextCursor = null;
+  await loadMoreCards();
+  showSection("cards");
+}
+
+async function loadMoreCards() {
+  const cursor = cardsNextCursor ? `&cursor=${encodeURIComponent(cardsNextCursor)}` : "";
+  const res   = await fetch(`${API_BASE}/cards/?limit=${PAGE_SIZE}${cursor}`);
+  const page  = await res.json();
   const grid  = document.getElementById("cardsGrid");
-  grid.innerHTML = "";
-  cards.forEach(c => {
+  cardsNextCursor = page.next_cursor;
+  const moreBtn = document.getElementById("cardsLoadMore");
+  moreBtn.style.display = cardsNextCursor ? "" : "none";
+  moreBtn.onclick = loadMoreCards;
+  page.items.forEach(c => {
     const div = document.createElement("div");
     div.innerHTML = `
       <div>
@@ -336,14 +373,18 @@ async function loadCards() {
     `;
     grid.appendChild(div);
   });
-  showSection("cards");
 }
 
 /* -------------------- Verb Sorting Quiz -------------------- */
 
 async function startSortingQuiz() {
-  const res = await fetch(`${API_BASE}/quiz/verbs/start`, { method: "POST" });
-  sortingRoundId      = (await res.json()).quizroundid;
+  const res = await fetch(`${API_BASE}/quiz/sorting/verbs/start`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ size: 3 })
+  });
+  sortingRoundToken   = (await res.json()).round_token;
+  sortingQueue        = [];
   sortingVerbCount    = 0;
   document.getElementById("sortingCounter").textContent = "";
   await loadNextSortingVerb();
@@ -360,17 +401,21 @@ async function loadNextSortingVerb() {
     return;
   }
 
-  const res  = await fetch(
-    `${API_BASE}/quiz/verbs/next?quizroundid=${sortingRoundId}`
-  );
-  const data = await res.json();
-  if (data.error) {
-    document.getElementById("sortingFeedback").textContent = data.error;
-    alert("Sorting quiz complete! All verbs covered.");
-    loadVocab();
-    showSection("vocab");
-    return;
+  if (!sortingQueue.length) {
+    const res  = await fetch(
+      `${API_BASE}/quiz/sorting/verbs/next?k=3&round_token=${encodeURIComponent(sortingRoundToken)}`
+    );
+    const page = await res.json();
+    if (page.error) {
+      document.getElementById("sortingFeedback").textContent = page.error;
+      alert("Sorting quiz complete! All verbs covered.");
+      loadVocab();
+      showSection("vocab");
+      return;
+    }
+    sortingQueue = page.items;
   }
+  const data = sortingQueue.shift();
 
   sortingVerbCount++;
   currentVerbData = data;
@@ -395,12 +440,12 @@ async function handleVerbDrop(e) {
   const box      = e.currentTarget;
   const category = box.dataset.category;
 
-  const res    = await fetch(`${API_BASE}/quiz/verbs/answer`, {
+  const res    = await fetch(`${API_BASE}/quiz/sorting/verbs/answer`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify({
-      quizroundid: sortingRoundId,
-      verb: currentVerbData.verb,
+      round_token: sortingRoundToken,
+      position: currentVerbData.position,
       category
     })
   });
@@ -432,8 +477,13 @@ document.getElementById("btnNextVerb").onclick = () => {
 /* -------------------- Noun Sorting Quiz -------------------- */
 
 async function startNounsQuiz() {
-  const res = await fetch(`${API_BASE}/quiz/nouns/start`, { method: "POST" });
-  nounsRoundId = (await res.json()).quizroundid;
+  const res = await fetch(`${API_BASE}/quiz/sorting/nouns/start`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ size: 3 })
+  });
+  nounsRoundToken = (await res.json()).round_token;
+  nounsQueue   = [];
   nounsCount   = 0;
   await loadNextNounsNoun();
 }
@@ -449,14 +499,18 @@ async function loadNextNounsNoun() {
     return;
   }
 
-  const res  = await fetch(`${API_BASE}/quiz/nouns/next?quizroundid=${nounsRoundId}`);
-  const data = await res.json();
-  if (data.error) {
-    alert(data.error);
-    loadVocab();
-    showSection("vocab");
-    return;
+  if (!nounsQueue.length) {
+    const res  = await fetch(`${API_BASE}/quiz/sorting/nouns/next?k=3&round_token=${encodeURIComponent(nounsRoundToken)}`);
+    const page = await res.json();
+    if (page.error) {
+      alert(page.error);
+      loadVocab();
+      showSection("vocab");
+      return;
+    }
+    nounsQueue = page.items;
   }
+  const data = nounsQueue.shift();
 
   currentNounData = data;
   document.getElementById("nounCard").textContent = data.noun;
@@ -478,12 +532,12 @@ async function handleNounDrop(e) {
   const box      = e.currentTarget;
   const category = box.dataset.category;
 
-  const res    = await fetch(`${API_BASE}/quiz/nouns/answer`, {
+  const res    = await fetch(`${API_BASE}/quiz/sorting/nouns/answer`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify({
-      quizroundid: nounsRoundId,
-      noun: currentNounData.noun,
+      round_token: nounsRoundToken,
+      position: currentNounData.position,
       category
     })
   });
@@ -0,0 +1,240 @@
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, List
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import Date, DateTime, bindparam, delete, insert, select, text, update
+
+from extensions import db
+from models import (ArchivedAnswerStats, QuizAnswer, QuizRound, RoundSummary, UserDailyStats, VocabDailyStats,
+                    VocabEntry)
+
+"""
+Learning statistics rollups: answers and correct answers per
+user x day x word_type, per vocab x day and per quiz round. scoring.py
+adds every answer batch to them in the answer's own transaction (upserts
+with answers = answers + n), so the stats endpoints never aggregate
+quiz_answer.
+
+`flask rebuild-stats` recomputes all three from quiz_answer, reading it
+in id-ordered chunks, and replaces the tables; with --check it only
+reports differences. Answers compacted by archive.py come from
+archived_answer_stats instead, and the summaries of archived rounds are
+kept as they are.
+
+An answer counts under the vocab's current word_type, not the one it had
+when it was answered: a word first saved as "Unbekannt" belongs to the
+type the classifier finds. When the type changes, retype() moves the
+entry's per-day counts (vocab_daily_stats) between the user/day rows;
+deleting a vocab moves them to "Unbekannt". The rebuild joins the current
+type, for archived answers too, so both paths agree.
+"""
+
+REBUILD_CHUNK = 10000
+UNKNOWN_TYPE = "Unbekannt"
+
+_UPSERT_USER_DAY = text(
+    "INSERT INTO user_daily_stats (user_id, day, word_type, answers, correct) "
+    "VALUES (:user_id, :day, :word_type, :answers, :correct) "
+    "ON CONFLICT (user_id, day, word_type) DO UPDATE SET "
+    "answers = user_daily_stats.answers + excluded.answers, "
+    "correct = user_daily_stats.correct + excluded.correct"
+).bindparams(bindparam("day", type_=Date))
+
+_SUBTRACT_USER_DAY = text(
+    "UPDATE user_daily_stats SET answers = answers - :answers, correct = correct - :correct "
+    "WHERE user_id = :user_id AND day = :day AND word_type = :word_type"
+).bindparams(bindparam("day", type_=Date))
+
+_UPSERT_VOCAB_DAY = text(
+    "INSERT INTO vocab_daily_stats (vocab_entry_id, day, user_id, answers, correct) "
+    "VALUES (:vocab_entry_id, :day, :user_id, :answers, :correct) "
+    "ON CONFLICT (vocab_entry_id, day) DO UPDATE SET "
+    "answers = vocab_daily_stats.answers + excluded.answers, "
+    "correct = vocab_daily_stats.correct + excluded.correct"
+).bindparams(bindparam("day", type_=Date))
+
+_UPSERT_ROUND = text(
+    "INSERT INTO round_summary (quiz_round_id, user_id, answers, correct, first_answer_at, last_answer_at) "
+    "VALUES (:quiz_round_id, :user_id, :answers, :correct, :first_answer_at, :last_answer_at) "
+    "ON CONFLICT (quiz_round_id) DO UPDATE SET "
+    "answers = round_summary.answers + excluded.answers, "
+    "correct = round_summary.correct + excluded.correct, "
+    "last_answer_at = excluded.last_answer_at"
+).bindparams(bindparam("first_answer_at", type_=DateTime), bindparam("last_answer_at", type_=DateTime))
+
+
+class Rollup:
+    """In-memory counts for one batch of answers (or a whole rebuild)."""
+
+    def __init__(self):
+        self.user_day = defaultdict(lambda: [0, 0])      # (user_id, day, word_type)
+        self.vocab_day = defaultdict(lambda: [0, 0])     # (vocab_entry_id, day) -> + user_id below
+        self.vocab_user = {}
+        self.rounds = {}                                 # quiz_round_id -> [user, n, k, first, last]
+
+    def add(self, user_id, vocab_entry_id, quiz_round_id, word_type, was_correct, answered_at: datetime):
+        k = int(bool(was_correct))
+        self.add_counts(user_id, vocab_entry_id, answered_at.date(), word_type, 1, k)
+        if quiz_round_id is None:
+            return
+        r = self.rounds.setdefault(quiz_round_id, [user_id, 0, 0, answered_at, answered_at])
+        r[1] += 1
+        r[2] += k
+        r[3] = min(r[3], answered_at)
+        r[4] = max(r[4], answered_at)
+
+    def add_counts(self, user_id, vocab_entry_id, day: date, word_type, answers, correct):
+        counts = self.user_day[(user_id, day, word_type or UNKNOWN_TYPE)]
+        counts[0] += answers
+        counts[1] += correct
+        counts = self.vocab_day[(vocab_entry_id, day)]
+        counts[0] += answers
+        counts[1] += correct
+        self.vocab_user[vocab_entry_id] = user_id
+
+    def user_day_rows(self):
+        return [{"user_id": u, "day": d, "word_type": t, "answers": n, "correct": k}
+                for (u, d, t), (n, k) in sorted(self.user_day.items())]
+
+    def vocab_day_rows(self):
+        return [{"vocab_entry_id": v, "day": d, "user_id": self.vocab_user[v], "answers": n, "correct": k}
+                for (v, d), (n, k) in sorted(self.vocab_day.items())]
+
+    def round_rows(self):
+        return [{"quiz_round_id": r, "user_id": u, "answers": n, "correct": k,
+                 "first_answer_at": first, "last_answer_at": last}
+                for r, (u, n, k, first, last) in sorted(self.rounds.items())]
+
+
+def record_answers(user_id, answers: List[dict], word_types: Dict[int, str], answered_at: datetime):
+    """Add graded answers (see scoring.record_answers) to the rollups; sorted keys keep lock order fixed."""
+    rollup = Rollup()
+    for a in answers:
+        if a["vocab_entry_id"] in word_types:
+            rollup.add(user_id, a["vocab_entry_id"], a["quiz_round_id"], word_types[a["vocab_entry_id"]],
+                       a["was_correct"], answered_at)
+    if rollup.rounds:
+        db.session.execute(_UPSERT_USER_DAY, rollup.user_day_rows())
+        db.session.execute(_UPSERT_VOCAB_DAY, rollup.vocab_day_rows())
+        db.session.execute(_UPSERT_ROUND, rollup.round_rows())
+
+
+def retype(user_id, vocab_entry_id, old_type, new_type):
+    """
+    Move the entry's counts from old_type to new_type. Call it after flushing the
+    entry's new word_type, so concurrent answers (which lock the row) see the new one.
+    """
+    old_type, new_type = old_type or UNKNOWN_TYPE, new_type or UNKNOWN_TYPE
+    if old_type == new_type:
+        return
+    days = [{"user_id": user_id, "day": r.day, "answers": r.answers, "correct": r.correct}
+            for r in db.session.execute(select(VocabDailyStats.day, VocabDailyStats.answers, VocabDailyStats.correct)
+                                        .where(VocabDailyStats.vocab_entry_id == vocab_entry_id)
+                                        .order_by(VocabDailyStats.day))]
+    if days:
+        db.session.execute(_SUBTRACT_USER_DAY, [dict(d, word_type=old_type) for d in days])
+        db.session.execute(_UPSERT_USER_DAY, [dict(d, word_type=new_type) for d in days])
+        db.session.execute(delete(UserDailyStats).where(UserDailyStats.user_id == user_id,
+                                                        UserDailyStats.word_type == old_type,
+                                                        UserDailyStats.answers <= 0))
+    db.session.execute(update(ArchivedAnswerStats).where(ArchivedAnswerStats.vocab_entry_id == vocab_entry_id)
+                       .values(word_type=new_type))
+
+
+# --- rebuild -----------------------------------------------------------------
+
+def _as_date(d):
+    return d if isinstance(d, date) else date.fromisoformat(str(d))
+
+
+def compute(conn, chunk_size=REBUILD_CHUNK) -> Rollup:
+    """Rollups of the archived aggregates plus the whole quiz_answer table, read in id-ordered chunks."""
+    rollup = Rollup()
+    for r in conn.execute(select(ArchivedAnswerStats.user_id, ArchivedAnswerStats.vocab_entry_id,
+                                 ArchivedAnswerStats.day, VocabEntry.word_type, ArchivedAnswerStats.answers,
+                                 ArchivedAnswerStats.correct)
+                          .outerjoin(VocabEntry, VocabEntry.id == ArchivedAnswerStats.vocab_entry_id)):
+        rollup.add_counts(r.user_id, r.vocab_entry_id, _as_date(r.day), r.word_type, r.answers, r.correct)
+    archived_rounds = set()
+    for r in conn.execute(select(RoundSummary).join(QuizRound, QuizRound.id == RoundSummary.quiz_round_id)
+                          .where(QuizRound.archived_at.isnot(None))):
+        rollup.rounds[r.quiz_round_id] = [r.user_id, r.answers, r.correct, r.first_answer_at, r.last_answer_at]
+        archived_rounds.add(r.quiz_round_id)
+
+    last_id = 0
+    while True:
+        chunk = conn.execute(
+            select(QuizAnswer.id, QuizRound.user_id, QuizAnswer.vocab_entry_id, QuizAnswer.quiz_round_id,
+                   VocabEntry.word_type, QuizAnswer.was_correct, QuizAnswer.answered_at)
+            .join(QuizRound, QuizRound.id == QuizAnswer.quiz_round_id)
+            .outerjoin(VocabEntry, VocabEntry.id == QuizAnswer.vocab_entry_id)
+            .where(QuizAnswer.id > last_id)
+            .order_by(QuizAnswer.id)
+            .limit(chunk_size)
+        ).all()
+        if not chunk:
+            return rollup
+        for _, user_id, entry_id, round_id, word_type, was_correct, answered_at in chunk:
+            # a late answer to an archived round is already in its kept summary
+            rollup.add(user_id, entry_id, None if round_id in archived_rounds else round_id, word_type,
+                       was_correct, answered_at or datetime(1970, 1, 1))
+        last_id = chunk[-1][0]
+
+
+def _stored(conn):
+    return (
+        {(r.user_id, _as_date(r.day), r.word_type): (r.answers, r.correct)
+         for r in conn.execute(select(UserDailyStats))},
+        {(r.vocab_entry_id, _as_date(r.day)): (r.answers, r.correct)
+         for r in conn.execute(select(VocabDailyStats))},
+        {r.quiz_round_id: (r.answers, r.correct) for r in conn.execute(select(RoundSummary))},
+    )
+
+
+def differences(conn, rollup: Rollup) -> Dict[str, int]:
+    """Number of rollup rows that differ from a fresh computation, per table."""
+    user_day, vocab_day, rounds = _stored(conn)
+    expected = (
+        {k: tuple(v) for k, v in rollup.user_day.items()},
+        {k: tuple(v) for k, v in rollup.vocab_day.items()},
+        {r: (n, k) for r, (_, n, k, _, _) in rollup.rounds.items()},
+    )
+    return {
+        name: len(set(stored.items()) ^ set(fresh.items()))
+        for name, stored, fresh in zip(("user_daily_stats", "vocab_daily_stats", "round_summary"),
+                                       (user_day, vocab_day, rounds), expected)
+    }
+
+
+def rebuild(conn, chunk_size=REBUILD_CHUNK) -> Rollup:
+    """Replace all rollups with a fresh computation (in the caller's transaction)."""
+    rollup = compute(conn, chunk_size)
+    for model in (UserDailyStats, VocabDailyStats, RoundSummary):
+        conn.execute(delete(model))
+    for model, rows in ((UserDailyStats, rollup.user_day_rows()),
+                        (VocabDailyStats, rollup.vocab_day_rows()),
+                        (RoundSummary, rollup.round_rows())):
+        for start in range(0, len(rows), chunk_size):
+            conn.execute(insert(model), rows[start:start + chunk_size])
+    return rollup
+
+
+@click.command("rebuild-stats")
+@click.option("--check", is_flag=True, help="Only compare the rollups with quiz_answer.")
+@click.option("--chunk-size", type=int, default=REBUILD_CHUNK, show_default=True)
+@with_appcontext
+def rebuild_stats_command(check, chunk_size):
+    """Recompute the statistics rollups from quiz_answer."""
+    with db.engine.begin() as conn:
+        if check:
+            diff = differences(conn, compute(conn, chunk_size))
+            for table, count in diff.items():
+                click.echo(f"{'✅' if not count else '❌'} {table}: {count} differing rows")
+            if any(diff.values()):
+                raise SystemExit(1)
+            return
+        rollup = rebuild(conn, chunk_size)
+    click.echo(f"✅ Rebuilt {len(rollup.user_day)} user/day, {len(rollup.vocab_day)} vocab/day "
+               f"and {len(rollup.rounds)} round rows")
@@ -0,0 +1,101 @@
+"""
+Shared test setup: the repository on sys.path, and every app on its own
+migrated SQLite file under tmp_path. Classification reads an offline
+lexicon snapshot, and seeded answers go through POST /api/quiz/answers,
+so the rollups, schedules and cards are the ones the app itself writes.
+"""
+import os
+import sys
+import random
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# never the Neon database or the instance file, whatever the environment says
+os.environ["DATABASE_URL"] = ""
+os.environ.pop("DATABASE_REPLICA_URL", None)
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", "sqlite://")
+
+import app as app_module  # noqa: E402
+import lexicon  # noqa: E402
+import lookup_cache  # noqa: E402
+import migrations  # noqa: E402
+from extensions import db  # noqa: E402
+from models import User, VocabEntry  # noqa: E402
+
+# (latin, word_type, flexion_type, german meanings)
+LEXICON = [
+    ("amare", "Verb", "A-Konjugation", ["lieben"]),
+    ("videre", "Verb", "E-Konjugation", ["sehen"]),
+    ("petere", "Verb", "Konsonantische Konjugation", ["erstreben"]),
+    ("audire", "Verb", "I-Konjugation", ["hören"]),
+    ("templum", "Nomen", "O-Deklination", ["Tempel"]),
+    ("rosa", "Nomen", "A-Deklination", ["Rose"]),
+    ("urbs", "Nomen", "Konsonantische Deklination", ["Stadt"]),
+    ("bonus", "Adjektiv", "A-/O-Deklination", ["gut"]),
+    ("acer", "Adjektiv", "I-Deklination", ["scharf"]),
+    ("et", "Konjunktion", None, ["und"]),
+]
+ANSWERS_PER_ROUND = 10
+
+
+@pytest.fixture
+def lexicon_snapshot(tmp_path, monkeypatch):
+    """Classify from a snapshot of LEXICON, never from frag-caesar.de."""
+    path = str(tmp_path / "lexicon.bin")
+    lexicon.write_snapshot(LEXICON, path)
+    monkeypatch.setattr(lexicon, "DEFAULT_PATH", path)
+    return path
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """App factory on a SQLite file (default: tmp_path/app.db), not migrated yet."""
+    def make(path=None):
+        monkeypatch.setenv("SQLALCHEMY_DATABASE_URI", f"sqlite:///{path or tmp_path / 'app.db'}")
+        app = app_module.create_app()
+        app.config["CLASSIFIER_ENABLED"] = False
+        return app
+    return make
+
+
+@pytest.fixture
+def app(make_app, lexicon_snapshot):
+    app = make_app()
+    with app.app_context():
+        migrations.bootstrap()
+        lookup_cache.clear_memory()
+    yield app
+    lookup_cache.clear_memory()
+
+
+@pytest.fixture
+def seed(app):
+    """
+    seed(users, vocab, answers): `vocab` classified entries for each of `users`
+    users, and `answers` answers of user 1 (the routes' user), about 3 in 4 right.
+    """
+    def seed(users=2, vocab=30, answers=150, rng=None):
+        rng = rng or random.Random(1)
+        with app.app_context():
+            db.session.add_all(User(id=u, username=f"user{u}", password_hash="x") for u in range(2, users + 1))
+            for user_id in range(1, users + 1):
+                for i in range(vocab):
+                    latin, word_type, flexion, german = LEXICON[i % len(LEXICON)]
+                    db.session.add(VocabEntry(user_id=user_id, latin_word=f"{latin}{i}", german_translation=german[0],
+                                              word_type=word_type, flexion_type=flexion))
+            db.session.commit()
+            entries = db.session.query(VocabEntry.id, VocabEntry.german_translation) \
+                .filter(VocabEntry.user_id == 1).all()
+
+        client = app.test_client()
+        for start in range(0, answers, ANSWERS_PER_ROUND):
+            round_id = client.post("/api/quiz/start", json={}).get_json()["quiz_round_id"]
+            batch = [rng.choice(entries) for _ in range(min(ANSWERS_PER_ROUND, answers - start))]
+            response = client.post("/api/quiz/answers", json={"answers": [
+                {"quiz_round_id": round_id, "vocab_entry_id": entry_id,
+                 "selected_option": german if rng.random() < 0.75 else "x"} for entry_id, german in batch]})
+            assert response.status_code == 200, response.get_json()
+    return seed
@@ -0,0 +1,32 @@
+"""
+Background classification: a page that does not parse fails the job at
+once instead of being retried, and an idle dispatcher backs off its poll.
+"""
+import classifier
+import lookup_cache
+from extensions import db
+from models import ClassificationJob, VocabEntry
+
+
+def test_unparseable_page_fails_permanently(app):
+    with app.test_request_context():
+        # a cached Kurzübersicht whose lemma row has no type: classify_rows raises KeyError
+        lookup_cache.put("mirum", [{"latin": "mirum", "german": "Wunder"}])
+        entry = VocabEntry(user_id=1, latin_word="mirum", german_translation="Wunder", word_type="Unbekannt")
+        db.session.add(entry)
+        db.session.flush()
+        job = classifier.enqueue(entry)
+        db.session.commit()
+
+        classifier.run_job(job.id)
+        job = db.session.get(ClassificationJob, job.id)
+        assert (job.status, job.attempts) == ("failed", 1)
+        assert job.last_error.startswith("KeyError")
+
+
+def test_idle_poll_backs_off_and_resets_on_work():
+    interval = classifier.POLL_SECONDS
+    for _ in range(20):
+        interval = classifier._next_poll(interval, idle=True)
+    assert interval == classifier.MAX_POLL_SECONDS
+    assert classifier._next_poll(interval, idle=False) == classifier.POLL_SECONDS
@@ -0,0 +1,46 @@
+"""
+Distractor index: the static pools hold distinct words, and an upsert that
+lands while a user's buckets are being (re)loaded is not lost when the
+loaded buckets are installed.
+"""
+import pytest
+
+import distractors
+from extensions import db
+from models import VocabEntry
+
+
+@pytest.fixture
+def vocab(app):
+    with app.app_context():
+        db.session.add(VocabEntry(user_id=1, latin_word="amare", german_translation="lieben", word_type="Verb"))
+        db.session.commit()
+        yield
+
+
+@pytest.mark.parametrize("pool", ["WRONG_VERBS", "WRONG_NOUNS", "WRONG_ADJECTIVES"])
+def test_static_pools_are_distinct(pool):
+    words = getattr(distractors, pool)
+    assert len(words) == len(set(words))
+
+
+def test_upsert_during_load_survives(vocab, monkeypatch):
+    index = distractors.DistractorIndex()
+    normalize = distractors.normalize_german_strict
+    raced = []
+
+    def normalize_and_race(value):
+        if not raced:  # first row of the load: a classifier job finishes meanwhile
+            raced.append(True)
+            entry = VocabEntry(user_id=1, latin_word="videre", german_translation="erblicken", word_type="Verb")
+            db.session.add(entry)
+            db.session.commit()
+            index.upsert(1, entry.id, "Verb", "erblicken")
+        return normalize(value)
+
+    monkeypatch.setattr(distractors, "normalize_german_strict", normalize_and_race)
+    index._ensure_user(1)
+    monkeypatch.setattr(distractors, "normalize_german_strict", normalize)
+
+    assert raced
+    assert {"lieben", "erblicken"} <= set(index._users[1]["Verb"].keys)
@@ -0,0 +1,43 @@
+"""
+parse_kurzuebersicht (region scan) must return exactly the rows of the
+full-page reference parser on every page of benchmarks/pages/, including
+the edge_*.html pages that make the region scan give up or mislead it.
+"""
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES_DIR = os.path.join(ROOT, "benchmarks", "pages")
+
+import frag_caesar_crawl4ai
+
+PAGES = sorted(name for name in os.listdir(PAGES_DIR) if name.endswith(".html"))
+
+# page -> does _kurz_region find a slice (False: straight to the full parser)
+REGION_FOUND = {
+    "sample_petere.html": True,
+    "edge_nested_table.html": True,       # the nested </table> must not end the slice
+    "edge_several_h2.html": True,         # first "Kurz" <h2> has markup: slice found, fallback in the slice
+    "edge_no_kurzuebersicht.html": False,
+    "edge_kurz_without_table.html": False,
+    "edge_unclosed_table.html": False,
+    "edge_stray_close_tag.html": False,
+}
+
+
+def read(name):
+    with open(os.path.join(PAGES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("name", PAGES)
+def test_fast_parser_matches_full_parser(name):
+    html, word = read(name), name[:-len(".html")]
+    assert frag_caesar_crawl4ai.parse_kurzuebersicht(html, word) == \
+        frag_caesar_crawl4ai.parse_kurzuebersicht_full(html, word)
+
+
+@pytest.mark.parametrize("name", sorted(REGION_FOUND))
+def test_edge_pages_take_the_intended_path(name):
+    assert (frag_caesar_crawl4ai._kurz_region(read(name)) is not None) == REGION_FOUND[name]
@@ -0,0 +1,50 @@
+"""
+The offline lexicon snapshot: a damaged file is a miss (the lookup goes to
+the network), never an error, and a replaced snapshot is picked up within
+CHECK_INTERVAL and its predecessor closed.
+"""
+import os
+
+import pytest
+
+import lexicon
+
+ENTRIES = [("amare", "Verb", "A-Konjugation", ["lieben"]), ("templum", "Nomen", "O-Deklination", ["Tempel"])]
+
+
+@pytest.fixture
+def snapshot(tmp_path, monkeypatch):
+    path = str(tmp_path / "lexicon.bin")
+    monkeypatch.setattr(lexicon, "DEFAULT_PATH", path)
+    monkeypatch.setattr(lexicon, "CHECK_INTERVAL", 0)
+    lexicon.write_snapshot(ENTRIES, path)
+    return path
+
+
+def test_lookup(snapshot):
+    assert lexicon.lookup("Amare ")[0]["german"] == "lieben"
+    assert lexicon.lookup("videre") is None
+
+
+@pytest.mark.parametrize("keep", [0, 5, 12, 20, -3])
+def test_truncated_snapshot_is_a_miss(snapshot, keep):
+    with open(snapshot, "rb") as f:
+        data = f.read()
+    with open(snapshot, "wb") as f:
+        f.write(data[:keep])  # empty, inside the header, inside the index, inside the last record
+
+    with pytest.raises(ValueError):
+        lexicon.Lexicon(snapshot)
+    assert lexicon.lookup("amare") is None
+
+
+def test_replaced_snapshot_is_remapped_and_the_old_one_closed(snapshot, monkeypatch):
+    old = lexicon.get_lexicon(snapshot)
+    monkeypatch.setattr(lexicon, "CHECK_INTERVAL", 3600)
+    lexicon.write_snapshot([("amare", "Verb", "A-Konjugation", ["verliebt sein"])], snapshot)
+    os.utime(snapshot, (1, 1))
+    assert lexicon.lookup("amare")[0]["german"] == "lieben"  # not stat()ed again yet
+
+    monkeypatch.setattr(lexicon, "CHECK_INTERVAL", 0)
+    assert lexicon.lookup("amare")[0]["german"] == "verliebt sein"
+    assert old._mm.closed
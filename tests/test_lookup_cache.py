@@ -0,0 +1,42 @@
+"""
+lookup_cache: an expired in-process entry is refreshed from the shared table
+(another worker's fetch) before it counts as a miss, and callers only ever
+get copies of the cached rows.
+"""
+import time
+
+import pytest
+
+import lookup_cache
+
+ROWS = [{"latin": "amare", "type": "Verb", "flexion_type": "A-Konjugation", "german": "lieben"}]
+
+
+@pytest.fixture
+def app(app):
+    with app.app_context():
+        yield app
+
+
+def test_expired_memory_entry_is_refreshed_from_the_shared_table(app):
+    expired = time.time() - lookup_cache.CACHE_TTL - 60
+    lookup_cache._remember("amare", [{"german": "alt"}], False, expired)
+    assert lookup_cache.get("amare") is None  # nothing fresher in the table yet
+
+    lookup_cache._store_in_db("amare", ROWS, False, time.time())  # another worker refetched it
+    before = lookup_cache.stats()["db_hits"]
+    assert lookup_cache.get("amare") == (ROWS, False)
+    assert lookup_cache.stats()["db_hits"] == before + 1
+    assert lookup_cache.get("amare") == (ROWS, False)  # and it is in memory again
+    assert lookup_cache.stats()["db_hits"] == before + 1
+
+
+def test_callers_get_copies(app):
+    rows = [dict(r) for r in ROWS]
+    lookup_cache.put("amare", rows)
+    rows[0]["german"] = "changed by the caller after put"
+
+    got, _ = lookup_cache.get("amare")
+    got[0]["german"] = "changed by the caller after get"
+    got.append({})
+    assert lookup_cache.get("amare") == (ROWS, False)
@@ -0,0 +1,102 @@
+"""
+Query-plan regression tests (see query_plans.py): the hot queries of the
+routes must not read whole tables, neither on a database created by the
+current migrations nor on one created with the original schema (the six
+tables of the first release) and upgraded in place.
+
+    python -m pytest tests/
+"""
+import sqlite3
+
+import pytest
+from sqlalchemy import func, inspect, select
+
+import migrations
+import query_plans
+from extensions import db
+from models import QuizAnswer, ReviewSchedule, UserDailyStats, VocabEntry
+
+# schema of the first release, as its create_all() made it
+BASELINE_SCHEMA = """
+CREATE TABLE user (
+    id INTEGER NOT NULL, username VARCHAR(80) NOT NULL, password_hash VARCHAR(200) NOT NULL,
+    PRIMARY KEY (id), UNIQUE (username));
+CREATE TABLE vocab_entry (
+    id INTEGER NOT NULL, user_id INTEGER NOT NULL, latin_word VARCHAR(120) NOT NULL,
+    german_translation VARCHAR(255) NOT NULL, total_answers INTEGER, correct_answers INTEGER,
+    accuracy_percent FLOAT, has_bronze_card BOOLEAN, created_at DATETIME, word_type VARCHAR(20),
+    flexion_type VARCHAR(50), PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES user (id));
+CREATE TABLE quiz_round (
+    id INTEGER NOT NULL, user_id INTEGER NOT NULL, started_at DATETIME, finished_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES user (id));
+CREATE TABLE quiz_answer (
+    id INTEGER NOT NULL, quiz_round_id INTEGER NOT NULL, vocab_entry_id INTEGER NOT NULL,
+    was_correct BOOLEAN, answered_at DATETIME, PRIMARY KEY (id),
+    FOREIGN KEY(quiz_round_id) REFERENCES quiz_round (id), FOREIGN KEY(vocab_entry_id) REFERENCES vocab_entry (id));
+CREATE TABLE card (
+    id INTEGER NOT NULL, vocab_entry_id INTEGER NOT NULL, rarity VARCHAR(20), title VARCHAR(120),
+    description TEXT, image_url VARCHAR(255), PRIMARY KEY (id), FOREIGN KEY(vocab_entry_id) REFERENCES vocab_entry (id));
+CREATE TABLE user_card (
+    id INTEGER NOT NULL, user_id INTEGER NOT NULL, card_id INTEGER NOT NULL, acquired_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES user (id), FOREIGN KEY(card_id) REFERENCES card (id));
+
+INSERT INTO user VALUES (1, 'demo', 'demo_hash');
+INSERT INTO vocab_entry VALUES
+    (1, 1, 'amare', 'lieben', 2, 1, 50.0, 0, '2024-01-10 10:00:00.000000', 'Verb', 'A-Konjugation'),
+    (2, 1, 'templum', 'Tempel', 1, 1, 100.0, 1, '2024-01-11 10:00:00.000000', 'Nomen', 'O-Deklination'),
+    (3, 1, 'bonus', 'gut', 0, 0, 0.0, 0, '2024-01-12 10:00:00.000000', 'Adjektiv', NULL);
+INSERT INTO quiz_round VALUES (1, 1, '2024-01-13 10:00:00.000000', '2024-01-13 10:05:00.000000'),
+                              (2, 1, '2024-01-14 10:00:00.000000', NULL);
+INSERT INTO quiz_answer VALUES (1, 1, 1, 1, '2024-01-13 10:01:00.000000'),
+                               (2, 1, 1, 0, '2024-01-13 10:02:00.000000'),
+                               (3, 2, 2, 1, '2024-01-14 10:01:00.000000');
+INSERT INTO card VALUES (1, 2, 'bronze', 'templum', 'Bronze card for templum', NULL);
+INSERT INTO user_card VALUES (1, 1, 1, '2024-01-14 10:02:00.000000');
+"""
+
+
+def assert_indexed():
+    failures = query_plans.check()
+    assert failures == [], "\n".join(
+        f"{name}: full scan of {', '.join(scans)}\n    " + "\n    ".join(plan) for name, scans, plan in failures)
+
+
+def indexes():
+    inspector = inspect(db.engine)
+    return {(table, ix["name"]) for table in inspector.get_table_names() for ix in inspector.get_indexes(table)}
+
+
+@pytest.fixture
+def fresh_app(app, seed):
+    seed(users=3, vocab=100, answers=300)
+    return app
+
+
+def test_fresh_database_has_no_full_scans(fresh_app):
+    with fresh_app.app_context():
+        assert len(query_plans.hot_queries()) > 0
+        assert_indexed()
+
+
+def test_upgraded_baseline_database_has_no_full_scans(fresh_app, make_app, tmp_path):
+    path = tmp_path / "baseline.db"
+    with sqlite3.connect(path) as conn:
+        conn.executescript(BASELINE_SCHEMA)
+
+    app = make_app(path)
+    with app.app_context():
+        assert migrations.upgrade() == [version for version, _, _ in migrations.MIGRATIONS]
+        assert migrations.current_version() == migrations.MIGRATIONS[-1][0]
+        assert_indexed()
+
+        # the backfills saw the old rows
+        assert db.session.scalar(select(func.count()).select_from(ReviewSchedule)) == 3
+        assert db.session.scalar(select(func.count()).where(VocabEntry.sample_key.is_(None))) == 0
+        assert db.session.scalar(select(func.sum(UserDailyStats.answers))) == \
+            db.session.scalar(select(func.count()).select_from(QuizAnswer))
+        upgraded = indexes()
+        assert migrations.upgrade() == []  # idempotent
+
+    with fresh_app.app_context():
+        missing = indexes() - upgraded
+    assert not missing, f"indexes of a fresh database missing after the upgrade: {sorted(missing)}"
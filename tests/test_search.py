@@ -0,0 +1,40 @@
+"""
+search.search() matches the user's terms against the Latin and German text
+only: a term that matches nothing but the owner token ("u<id>") finds nothing.
+"""
+import pytest
+
+import search
+from extensions import db
+from models import User, VocabEntry
+
+WORDS = [(1, "amare", "lieben"), (1, "videre", "sehen"), (1, "laudare", "loben"), (2, "urbs", "Stadt")]
+
+
+@pytest.fixture
+def app(app):
+    with app.app_context():
+        db.session.add(User(id=2, username="other", password_hash="x"))
+        entries = [VocabEntry(user_id=u, latin_word=latin, german_translation=german) for u, latin, german in WORDS]
+        db.session.add_all(entries)
+        db.session.flush()
+        for entry in entries:
+            search.index_entry(entry)
+        db.session.commit()
+    return app
+
+
+@pytest.mark.parametrize("term", ["u", "u1", "u2"])
+def test_owner_token_is_not_searchable(app, term):
+    with app.app_context():
+        assert search.search(1, term) == []
+    assert app.test_client().get(f"/api/vocab/?search={term}").get_json() == []
+
+
+def test_terms_match_latin_and_german(app):
+    with app.app_context():
+        ids = dict(db.session.query(VocabEntry.latin_word, VocabEntry.id))
+        assert search.search(1, "lieb") == [ids["amare"]]
+        assert search.search(1, "vid") == [ids["videre"]]
+        assert search.search(1, "urb") == []  # user 2's word
+        assert search.search(2, "urb") == [ids["urbs"]]
@@ -0,0 +1,88 @@
+"""
+The live rollups (stats.record_answers + stats.retype) and `flask
+rebuild-stats` must attribute answers to the same word_type: a word answered
+while still "Unbekannt", partly archived, then classified as a verb, and a
+deleted word must not make `rebuild-stats --check` report differences.
+The windowed stats endpoints fill their limit past deleted vocab and
+revalidate once the UTC day changes.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+
+import archive
+import classifier
+from extensions import db
+from models import QuizRound, VocabEntry
+
+
+@pytest.fixture
+def app(app, seed):
+    seed(users=2, vocab=30, answers=150)
+    return app
+
+
+def answer(client, entry_ids):
+    round_id = client.post("/api/quiz/start", json={}).get_json()["quiz_round_id"]
+    response = client.post("/api/quiz/answers", json={"answers": [
+        {"quiz_round_id": round_id, "vocab_entry_id": entry_id, "selected_option": "x"} for entry_id in entry_ids]})
+    assert response.status_code == 200, response.get_json()
+    return round_id
+
+
+def assert_consistent(app):
+    result = app.test_cli_runner().invoke(args=["rebuild-stats", "--check"])
+    assert result.exit_code == 0, result.output
+
+
+def test_reclassified_and_deleted_vocab_match_the_rebuild(app):
+    client = app.test_client()
+    with app.app_context():
+        entry = VocabEntry(user_id=1, latin_word="petere", german_translation="erstreben", word_type="Unbekannt")
+        db.session.add(entry)
+        db.session.flush()
+        job = classifier.enqueue(entry)
+        db.session.commit()
+        entry_id, job_id = entry.id, job.id
+        answered = db.session.query(VocabEntry.id).filter(VocabEntry.user_id == 1, VocabEntry.total_answers > 0)
+        deleted_id = answered.first()[0]
+
+    old_round = answer(client, [entry_id, entry_id])
+    answer(client, [entry_id])
+    with app.app_context():
+        db.session.execute(update(QuizRound).where(QuizRound.id == old_round).values(finished_at=QuizRound.started_at))
+        db.session.commit()
+        with db.engine.begin() as conn:
+            assert archive.archive_rounds(conn, [old_round]) == (1, 2)
+    assert_consistent(app)
+
+    with app.test_request_context():
+        classifier.run_job(job_id)
+        assert db.session.get(VocabEntry, entry_id).word_type == "Verb"
+    assert_consistent(app)
+
+    answer(client, [entry_id])
+    assert client.delete(f"/api/vocab/{deleted_id}").status_code == 200
+    assert_consistent(app)
+
+
+def test_weakest_fills_the_limit_past_deleted_vocab(app):
+    client = app.test_client()
+    first = client.get("/api/stats/weakest?limit=5&min_answers=1").get_json()
+    assert len(first) == 5
+    assert client.delete(f"/api/vocab/{first[0]['id']}").status_code == 200
+
+    second = client.get("/api/stats/weakest?limit=5&min_answers=1").get_json()
+    assert len(second) == 5 and first[0]["id"] not in {r["id"] for r in second}
+
+
+def test_windowed_stats_revalidate_per_day(app):
+    client = app.test_client()
+    response = client.get("/api/stats/daily")
+    assert f"-d{datetime.utcnow():%Y%m%d}-" in response.headers["ETag"]
+    # Last-Modified knows nothing of the window: only the dated ETag may answer 304
+    assert client.get("/api/stats/daily", headers={
+        "If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}).status_code == 200
+    assert client.get("/api/stats/daily", headers={
+        "If-None-Match": response.headers["ETag"]}).status_code == 304
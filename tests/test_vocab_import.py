@@ -0,0 +1,27 @@
+"""
+POST /api/vocab/import reports bad NDJSON rows (unparseable, or valid JSON
+that is not an object) as invalid and still imports the rest of the batch.
+"""
+import json
+
+from extensions import db
+from models import VocabEntry
+
+
+def test_non_object_rows_are_invalid_and_the_batch_goes_on(app):
+    body = "\n".join([
+        json.dumps({"latin_word": "amare", "german_translation": "lieben"}),
+        "[1, 2]",
+        '"x"',
+        "3",
+        "{not json",
+        json.dumps({"latin_word": "videre", "german_translation": "sehen"}),
+    ]) + "\n"
+    response = app.test_client().post("/api/vocab/import", data=body, content_type="application/x-ndjson")
+    assert response.status_code == 200
+    results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert results[-1] == {"summary": {"created": 2, "duplicate": 0, "invalid": 4, "failed": 0}}
+    assert sorted(r["line"] for r in results[:-1] if r["status"] == "invalid") == [2, 3, 4, 5]
+    with app.app_context():
+        assert sorted(w for (w,) in db.session.query(VocabEntry.latin_word)) == ["amare", "videre"]